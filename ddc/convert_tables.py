@@ -1,31 +1,55 @@
-from bs4 import BeautifulSoup
-import json
+from lxml import etree
+
+_PARSER = etree.HTMLParser()
+
+
+def _cell_text(cell):
+    # Same as BeautifulSoup's get_text(strip=True): every text node stripped,
+    # comments left out. Most cells have no children and skip itertext.
+    if not len(cell):
+        return cell.text.strip() if cell.text else ''
+    return ''.join(text.strip() for text in cell.itertext())
+
 
 def convert_table(html):
-    soup = BeautifulSoup(html, 'html.parser')
+    """
+    Turns the tbody of a DLE conjugation table into Yomitan structured
+    content: rows of td/th cells holding their text, with colSpan and rowSpan
+    where the cell spans.
+    """
+    root = etree.fromstring(html, _PARSER)
 
     json_table = {
         "type": "structured-content",
         "content": []
     }
 
-    tbody = soup.find("tbody")
+    tbody = root.find(".//tbody")
     json_tbody = {"tag": "tbody", "content": []}
 
-    for tr in tbody.find_all("tr"):
+    for tr in tbody.iter("tr"):
         json_tr = {"tag": "tr", "content": []}
-        for td in tr.find_all(["td", "th"]):
+        for td in tr.iter("td", "th"):
             cell = {
-                "tag": "td" if td.name == "td" else "th",
-                "content": td.get_text(strip=True)
+                "tag": td.tag,
+                "content": _cell_text(td)
             }
-            if td.has_attr("colspan"):
-                cell["colSpan"] = int(td["colspan"])
-            if td.has_attr("rowspan"):
-                cell["rowSpan"] = int(td["rowspan"])
+            colspan = td.get("colspan")
+            if colspan is not None:
+                cell["colSpan"] = int(colspan)
+            rowspan = td.get("rowspan")
+            if rowspan is not None:
+                cell["rowSpan"] = int(rowspan)
             json_tr["content"].append(cell)
         json_tbody["content"].append(json_tr)
 
     json_table["content"].append(json_tbody)
-    
-    return json_table
\ No newline at end of file
+
+    return json_table
+
+
+def convert_tables(tables):
+    """
+    Converts a batch of tables, so a worker process is handed many at once.
+    """
+    return [convert_table(html) for html in tables]
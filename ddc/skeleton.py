@@ -0,0 +1,41 @@
+"""
+Skeletons of the conjugation tables.
+
+Every DLE conjugation table has the same layout (rows of td/th cells with
+the same colSpan/rowSpan) and most of the same text: headers, tense labels,
+pronouns and empty cells. A skeleton is such a table with null in the cells
+that vary from verb to verb, its slots; `fill_skeleton` fills them with one
+verb's cells, giving the table exactly as `convert_table` would have
+produced it. `table_layout` and `cell_contents` let tables be compared
+cell by cell.
+"""
+
+
+def _rows(table):
+    return table["content"][0]["content"]
+
+
+def table_layout(table):
+    """
+    The rows of (tag, colSpan, rowSpan) of a converted table.
+    """
+    return tuple(tuple((cell["tag"], cell.get("colSpan"), cell.get("rowSpan")) for cell in tr["content"])
+                 for tr in _rows(table))
+
+
+def cell_contents(table):
+    return [cell["content"] for tr in _rows(table) for cell in tr["content"]]
+
+
+def fill_skeleton(skeleton, values):
+    """
+    The table of `skeleton` with its slots (null cells) filled from `values`
+    in order. The other cells are shared with the skeleton, so the table is
+    meant to be serialized, not modified.
+    """
+    values = iter(values)
+    rows = []
+    for tr in _rows(skeleton):
+        cells = [cell if cell["content"] is not None else {**cell, "content": next(values)} for cell in tr["content"]]
+        rows.append({"tag": "tr", "content": cells})
+    return {"type": "structured-content", "content": [{"tag": "tbody", "content": rows}]}
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Generates the DDC conjugation tables offline from the DLE conjugation models
+instead of scraping one table per verb.
+
+`build` reads the verbs of DDE (scraped JSONL, term bank directory or
+dictionary zip) with their model and irregular participles, conjugates each
+with `conjugation.conjugate` and writes a term bank whose tables have the
+layout and cell texts that `convert_table` produces from a DLE table.
+Pronominal headwords (arrepentirse) get the table of their base verb. Only
+the scraped JSONL records the model of every verb, so it is the one source
+whose tables match the scraped ones with no network access; built term
+banks may record no model at all. Verbs without a recorded model are
+skipped unless --guess-models asks for their own model or that of their
+verb family (see `conjugation.guess_model`).
+`validate` compares generated tables cell by cell with scraped ones, `check`
+checks the cells of irregular model verbs and participles against the DLE
+forms, and `table` prints the generated table of one verb.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from convert_tables import convert_table
+from skeleton import cell_contents, fill_skeleton, table_layout
+from yomitan import make_term
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'dde'))
+from conjugation import PERSONS, conjugate, conjugate_compound, guess_model, irregular_participles
+from entries import base_infinitive, collect_verbs
+
+# (pronoun cell, person of the forms)
+PERSON_ROWS = (
+    ('yo', '1s'),
+    ('tú / vos', '2s'),
+    ('usted', '3s'),
+    ('él, ella', '3s'),
+    ('nosotros, nosotras', '1p'),
+    ('vosotros, vosotras', '2p'),
+    ('ustedes', '3p'),
+    ('ellos, ellas', '3p'),
+)
+IMPERATIVE_ROWS = (
+    ('tú / vos', '2s'),
+    ('usted', '3s'),
+    ('vosotros, vosotras', '2p'),
+    ('ustedes', '3p'),
+)
+
+# (simple tense, compound tense, their headers) of the indicative.
+INDICATIVE_TENSES = (
+    ('presente', 'preterito_perfecto_compuesto',
+     'Presente', 'Pretérito perfecto compuesto / Antepresente'),
+    ('preterito_imperfecto', 'preterito_pluscuamperfecto',
+     'Pretérito imperfecto / Copretérito', 'Pretérito pluscuamperfecto / Antecopretérito'),
+    ('preterito_perfecto_simple', 'preterito_anterior',
+     'Pretérito perfecto simple / Pretérito', 'Pretérito anterior / Antepretérito'),
+    ('futuro', 'futuro_compuesto',
+     'Futuro simple / Futuro', 'Futuro compuesto / Antefuturo'),
+    ('condicional', 'condicional_compuesto',
+     'Condicional simple / Pospretérito', 'Condicional compuesto / Antepospretérito'),
+)
+
+
+def _cell(tag, content='', colspan=None):
+    cell = {"tag": tag, "content": content}
+    if colspan is not None:
+        cell["colSpan"] = colspan
+    return cell
+
+
+def _row(tag, *cells):
+    """
+    A row after the three leading columns (número, persona, pronombre),
+    empty cells of `tag`; `cells` are (content, colspan) pairs or texts.
+    """
+    content = [_cell(tag) for _ in range(3)]
+    for cell in cells:
+        content.append(_cell(tag, *cell) if isinstance(cell, tuple) else _cell(tag, cell))
+    return {"tag": "tr", "content": content}
+
+
+def _person_row(pronoun, *cells):
+    row = _row("td", *cells)
+    row["content"][2]["content"] = pronoun
+    return row
+
+
+def _column_headers(*headers):
+    return {"tag": "tr", "content": [_cell("th", "Número"), _cell("th", "Personas del discurso"),
+                                     _cell("th", "Pronombres personales")] + [_cell("th", h) for h in headers]}
+
+
+def _alternatives(*forms):
+    # A DLE cell giving "aplastara <span>o</span> aplastase" reads
+    # "aplastaraoaplastase" once convert_table has stripped each text node.
+    return 'o'.join(forms)
+
+
+def _with_vos(form, vos):
+    return form if vos is None or vos == form else f'{form} / {vos}'
+
+
+def table_cells(forms):
+    """
+    The texts of the form cells of a DLE table, by cell name, from `forms`
+    (a paradigm from `conjugation.conjugate` plus
+    `conjugation.conjugate_compound`): the vos form joins the tú form, and
+    the -ra and -se subjunctive imperfects share a cell.
+    """
+    cells = dict(forms)
+    cells['presente.2s'] = _with_vos(forms['presente.2s'], forms.get('presente.2s_vos'))
+    cells['imperativo.2s'] = _with_vos(forms['imperativo.2s'], forms.get('imperativo.2s_vos'))
+    for person in PERSONS:
+        cells[f'subjuntivo_preterito_imperfecto.{person}'] = _alternatives(
+            forms[f'subjuntivo_preterito_imperfecto_ra.{person}'], forms[f'subjuntivo_preterito_imperfecto_se.{person}'])
+        # Only the auxiliary alternates: "hubiera o hubiese aplastado".
+        cells[f'subjuntivo_preterito_pluscuamperfecto.{person}'] = _alternatives(
+            forms[f'subjuntivo_preterito_pluscuamperfecto_ra.{person}'].split(' ', 1)[0],
+            forms[f'subjuntivo_preterito_pluscuamperfecto_se.{person}'])
+    return cells
+
+
+def dle_table(cells):
+    """
+    The structured content table holding `cells` (see `table_cells`), laid
+    out as a DLE conjugation table after `convert_table`.
+    """
+    rows = [
+        _row("th", ("Formas no personales", 2)),
+        _row("th", "Infinitivo", "Gerundio"),
+        _row("td", cells['infinitivo'], cells['gerundio']),
+        _row("th", "Infinitivo compuesto", "Gerundio compuesto"),
+        _row("td", cells['infinitivo_compuesto'], cells['gerundio_compuesto']),
+        _row("th", ("Participio", 2)),
+        _row("td", (cells['participio'], 2)),
+        _row("th", ("Indicativo", 2)),
+    ]
+    for index, (simple, compound, simple_header, compound_header) in enumerate(INDICATIVE_TENSES):
+        rows.append(_column_headers(simple_header, compound_header) if index == 0
+                    else _row("th", simple_header, compound_header))
+        for pronoun, person in PERSON_ROWS:
+            rows.append(_person_row(pronoun, cells[f'{simple}.{person}'], cells[f'{compound}.{person}']))
+
+    rows.append(_row("th", ("Subjuntivo", 2)))
+    rows.append(_column_headers('Presente', 'Pretérito perfecto compuesto / Antepresente'))
+    for pronoun, person in PERSON_ROWS:
+        rows.append(_person_row(pronoun, cells[f'subjuntivo_presente.{person}'],
+                                cells[f'subjuntivo_preterito_perfecto.{person}']))
+    rows.append(_row("th", ("Pretérito imperfecto / Pretérito", 2)))
+    for pronoun, person in PERSON_ROWS:
+        rows.append(_person_row(pronoun, (cells[f'subjuntivo_preterito_imperfecto.{person}'], 2)))
+    rows.append(_row("th", ("Pretérito pluscuamperfecto / Antepretérito", 2)))
+    for pronoun, person in PERSON_ROWS:
+        rows.append(_person_row(pronoun, (cells[f'subjuntivo_preterito_pluscuamperfecto.{person}'], 2)))
+    rows.append(_row("th", "Futuro simple / Futuro", "Futuro compuesto / Antefuturo"))
+    for pronoun, person in PERSON_ROWS:
+        rows.append(_person_row(pronoun, cells[f'subjuntivo_futuro.{person}'],
+                                cells[f'subjuntivo_futuro_compuesto.{person}']))
+
+    rows.append(_row("th", ("Imperativo", 2)))
+    rows.append(_column_headers('', ''))
+    for pronoun, person in IMPERATIVE_ROWS:
+        rows.append(_person_row(pronoun, (cells[f'imperativo.{person}'], 2)))
+
+    return {"type": "structured-content", "content": [{"tag": "tbody", "content": rows}]}
+
+
+class _SlotNames(dict):
+    """
+    Stands in for the cells while the layout is built, noting the order in
+    which they are placed and leaving them empty (null).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.order = []
+
+    def __missing__(self, name):
+        self.order.append(name)
+        return None
+
+
+def _dle_skeleton():
+    names = _SlotNames()
+    return dle_table(names), names.order
+
+
+# The layout is the same for every verb: built once as a skeleton (see
+# skeleton.py) and filled with each verb's cells.
+DLE_SKELETON, DLE_SLOTS = _dle_skeleton()
+
+
+def synthesize_cells(verb, model=None, participles=()):
+    """
+    The texts of the form cells of the table of `verb` (see `table_cells`)
+    following DLE model `model` (number or model verb; when None, the verb's
+    own model or that of its family, see `conjugation.guess_model`, and a
+    ValueError if neither is known). Irregular `participles` recorded by
+    DDE, or else those of the verb's family (escribir: escrito), replace the
+    model's participle; several are given as alternatives and the first
+    builds the compound tenses.
+    """
+    if model is None:
+        model = guess_model(verb)
+        if model is None:
+            raise ValueError(f"No conjugation model recorded or known for {verb!r}")
+    forms = conjugate(verb, model)
+    participles = list(participles) or irregular_participles(verb) or [forms['participio']]
+    forms.update(conjugate_compound(participles[0]))
+    forms['participio'] = _alternatives(*participles)
+    return table_cells(forms)
+
+
+def synthesize_table(verb, model=None, participles=()):
+    """
+    The conjugation table of `verb`, see `synthesize_cells`.
+    """
+    cells = synthesize_cells(verb, model, participles)
+    return fill_skeleton(DLE_SKELETON, [cells[name] for name in DLE_SLOTS])
+
+
+def iter_synthesized(source, guess=False, stats=None):
+    """
+    Yields (verb, table) for each distinct verb of the DDE `source`, in
+    source order. A verb listed several times keeps the first model and
+    participles given for it. Verbs the source records no model for are
+    skipped, since a wrong guess invents forms (penso for pienso); with
+    `guess` set they get the model `conjugation.guess_model` finds, if any.
+    `stats`, a dict, receives the number of verbs and of verbs skipped.
+    """
+    verbs = {}
+    for word, (model, participles) in collect_verbs(source).items():
+        verb = base_infinitive(word)
+        if verb is None:
+            continue
+        known_model, known_participles = verbs.get(verb, (None, []))
+        verbs[verb] = (known_model if known_model is not None else model, known_participles or participles)
+    skipped = 0
+    for verb, (model, participles) in verbs.items():
+        if model is None:
+            model = guess_model(verb) if guess else None
+            if model is None:
+                skipped += 1
+                continue
+        yield verb, synthesize_table(verb, model, participles)
+    if stats is not None:
+        stats.update(verbs=len(verbs), skipped=skipped)
+
+
+def _td_texts(table):
+    return [cell["content"] for tr in table["content"][0]["content"] for cell in tr["content"]
+            if cell["tag"] == "td" and cell["content"]]
+
+
+def iter_scraped_tables(path):
+    """
+    Yields (verb, converted table) for a scraped conjugation JSON array of
+    {"word", "table"} entries or a single DLE table saved as HTML, whose verb
+    is read from its infinitive cell.
+    """
+    if path.endswith('.json'):
+        for entry in json_codec.iter_json_array(path):
+            yield entry['word'], convert_table(entry['table'])
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            table = convert_table(f.read())
+        yield _td_texts(table)[0], table
+
+
+def compare_tables(expected, generated):
+    """
+    Cell-by-cell differences as (position, expected, generated) tuples.
+    Tables of the same layout are compared cell by cell; otherwise (e.g.
+    tables cleaned by utils/clean_table.py) their non-empty td cells are
+    compared in order.
+    """
+    if table_layout(expected) == table_layout(generated):
+        pairs = zip(cell_contents(expected), cell_contents(generated))
+    else:
+        expected_cells, generated_cells = _td_texts(expected), _td_texts(generated)
+        pairs = zip(expected_cells + [None] * (len(generated_cells) - len(expected_cells)),
+                    generated_cells + [None] * (len(expected_cells) - len(generated_cells)))
+    return [(position, want, got) for position, (want, got) in enumerate(pairs) if want != got]
+
+
+# (verb, model, cell, form as the DLE tables give it): cells of irregular
+# model verbs, of verbs with irregular or double participles and of spelling
+# rules, which a verb must get even when its source names no model (None) or
+# participles.
+KNOWN_CELLS = (
+    ('ser', None, 'presente.1s', 'soy'),
+    ('ser', None, 'presente.2s', 'eres / sos'),
+    ('ser', None, 'preterito_perfecto_simple.1s', 'fui'),
+    ('ir', None, 'presente.1s', 'voy'),
+    ('ir', None, 'gerundio', 'yendo'),
+    ('estar', None, 'presente.1s', 'estoy'),
+    ('haber', None, 'presente.3s', 'ha'),
+    ('dar', None, 'presente.1s', 'doy'),
+    ('saber', None, 'presente.1s', 'sé'),
+    ('caber', None, 'presente.1s', 'quepo'),
+    ('andar', None, 'preterito_perfecto_simple.1s', 'anduve'),
+    ('poder', None, 'presente.1s', 'puedo'),
+    ('jugar', None, 'presente.1s', 'juego'),
+    ('oler', None, 'presente.1s', 'huelo'),
+    ('errar', None, 'presente.1s', 'yerro'),
+    ('podrir', None, 'futuro.1s', 'pudriré'),
+    ('ver', None, 'participio', 'visto'),
+    ('prever', None, 'participio', 'previsto'),
+    ('abrir', None, 'participio', 'abierto'),
+    ('abrir', None, 'preterito_perfecto_compuesto.1s', 'he abierto'),
+    ('romper', None, 'participio', 'roto'),
+    ('escribir', None, 'participio', 'escrito'),
+    ('morir', None, 'participio', 'muerto'),
+    ('resolver', None, 'participio', 'resuelto'),
+    ('freír', None, 'participio', _alternatives('frito', 'freído')),
+    ('imprimir', None, 'participio', _alternatives('impreso', 'imprimido')),
+    ('proveer', None, 'participio', _alternatives('provisto', 'proveído')),
+    ('pensar', 'acertar', 'presente.1s', 'pienso'),
+    ('elegir', 'pedir', 'presente.1s', 'elijo'),
+    ('avergonzar', 'contar', 'presente.1s', 'avergüenzo'),
+    ('agorar', 'contar', 'presente.3s', 'agüera'),
+    ('rehacer', None, 'preterito_perfecto_simple.1s', 'rehíce'),
+    ('rehacer', None, 'preterito_perfecto_simple.3s', 'rehízo'),
+)
+
+
+def check_known_cells():
+    """
+    Generates KNOWN_CELLS with no participles given and prints the cells
+    that differ; returns their number.
+    """
+    wrong = 0
+    for verb, model, name, expected in KNOWN_CELLS:
+        generated = synthesize_cells(verb, model)[name]
+        if generated != expected:
+            wrong += 1
+            print(f'{verb}: {name}: expected {expected!r}, generated {generated!r}')
+    print(f'{len(KNOWN_CELLS) - wrong} of {len(KNOWN_CELLS)} known cells of irregular verbs match')
+    return wrong
+
+
+def validate(paths, models, show=20):
+    """
+    Compares the generated table of every scraped verb in `paths` with the
+    scraped one and prints the differences; returns the number of verbs
+    whose tables differ.
+    """
+    verbs = cells = wrong_cells = wrong_verbs = 0
+    for path in paths:
+        for verb, expected in iter_scraped_tables(path):
+            base = base_infinitive(verb)
+            if base is None:
+                continue
+            verbs += 1
+            try:
+                generated = synthesize_table(base, *models.get(verb, models.get(base, (None, []))))
+            except ValueError as e:
+                wrong_verbs += 1
+                print(f'{verb}: {e}')
+                continue
+            differences = compare_tables(expected, generated)
+            cells += max(len(cell_contents(expected)), len(cell_contents(generated)))
+            wrong_cells += len(differences)
+            if differences:
+                wrong_verbs += 1
+                for position, want, got in differences[:show]:
+                    print(f'{verb}: cell {position}: scraped {want!r}, generated {got!r}')
+    print(f'{verbs - wrong_verbs} of {verbs} verbs match; {cells - wrong_cells} of {cells} cells match')
+    return wrong_verbs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate DDC conjugation tables from the DLE conjugation models.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='write a term bank of generated tables for the verbs of DDE')
+    build_parser.add_argument('source', help='DDE scraped JSONL (the source whose tables match scraped ones), '
+                                             'term bank directory or dictionary zip')
+    build_parser.add_argument('--output', default='term_bank_1.json', help='term bank to write')
+    build_parser.add_argument('--indent', type=int, default=None,
+                              help='indent the term bank by this many spaces (default: compact)')
+    build_parser.add_argument('--guess-models', action='store_true',
+                              help='also generate tables for verbs the source records no model for, by their own '
+                                   'model or verb family (verbs neither tells are still skipped); only the scraped '
+                                   'JSONL records every model, built term banks may record none')
+
+    validate_parser = subparsers.add_parser('validate', help='compare generated tables with scraped ones')
+    validate_parser.add_argument('tables', nargs='+',
+                                 help='scraped conjugation JSON array (conjugation_filtered.json) or DLE table HTML files')
+    validate_parser.add_argument('--models', metavar='SOURCE',
+                                 help='DDE scraped JSONL, term bank directory or zip with the verbs\' models')
+    validate_parser.add_argument('--show', type=int, default=20, help='differences printed per verb')
+
+    subparsers.add_parser('check', help='check the generated cells of irregular model verbs and participles')
+
+    table_parser = subparsers.add_parser('table', help='print the generated table of a verb')
+    table_parser.add_argument('verb')
+    table_parser.add_argument('--model', help='DLE model number or model verb (default: its own or its family\'s)')
+    table_parser.add_argument('--participle', action='append', default=[], help='irregular participle')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        stats = {}
+        terms = (make_term(verb, table) for verb, table in iter_synthesized(args.source, args.guess_models, stats))
+        count = json_codec.write_json_array(terms, args.output, indent=args.indent)
+        print(f"Generated {count} conjugation tables in {time.perf_counter() - start:.1f}s, "
+              f"output written to file: {args.output}")
+        if stats['skipped']:
+            hint = '' if args.guess_models else ' (--guess-models generates those whose model their spelling tells)'
+            print(f"Warning: skipped {stats['skipped']} of {stats['verbs']} verbs that {args.source} records no "
+                  f"conjugation model for{hint}")
+    elif args.command == 'validate':
+        models = collect_verbs(args.models) if args.models else {}
+        wrong_verbs = validate(args.tables, models, args.show)
+        sys.exit(1 if check_known_cells() or wrong_verbs else 0)
+    elif args.command == 'check':
+        sys.exit(1 if check_known_cells() else 0)
+    else:
+        try:
+            table = synthesize_table(args.verb, args.model, args.participle)
+        except ValueError as e:
+            parser.error(str(e))
+        print(json_codec.dumps(table, 2).decode('utf-8'))
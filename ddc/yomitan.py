@@ -1,40 +1,81 @@
-import json
-from convert_tables import convert_table
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
-def convert_json_entry(entry):
-    word = entry['word']
-    table_html = entry['table']
-    print(f"Processing word: {word}")
-    
-    converted_table = convert_table(table_html)
-    
-    output = [
-        word,           
-        "",            
-        "",            
-        "v",           
-        0,             
+from convert_tables import convert_table, convert_tables
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+
+def make_term(word, converted_table):
+    return [
+        word,
+        "",
+        "",
+        "v",
+        0,
         [converted_table],
-        0,             
-        ""            
+        0,
+        ""
     ]
-    
-    print(f"Processed word: {word}")
-    return output
-
-with open('conjugation_filtered.json', 'r', encoding='utf-8') as f:
-    input_data = json.load(f)
-    print("Loaded JSON data")
-    
-    if isinstance(input_data, list):
-        results = [convert_json_entry(entry) for entry in input_data]
-    else:
-        raise TypeError("Expected JSON data to be a list of entries.")
-
-output_path = 'term_bank_1.json'
-try:
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-    print(f"Output written to file: {output_path}")
-except Exception as e:
-    print(f"Error: {e}")
+
+
+def convert_json_entry(entry):
+    return make_term(entry['word'], convert_table(entry['table']))
+
+
+def iter_batches(entries, batch_size):
+    entries = iter(entries)
+    while batch := list(islice(entries, batch_size)):
+        yield batch
+
+
+def iter_converted(entries, workers=None, batch_size=256, window=None):
+    """
+    Converts the tables of `entries` in batches across a process pool and
+    yields the term bank entries in input order. Only the words stay in this
+    process; at most `window` batches are in flight at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for entry in entries:
+            yield convert_json_entry(entry)
+        return
+    window = window or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+
+        def finish():
+            words, future = in_flight.popleft()
+            for word, converted_table in zip(words, future.result()):
+                yield make_term(word, converted_table)
+
+        for batch in iter_batches(entries, batch_size):
+            future = pool.submit(convert_tables, [entry['table'] for entry in batch])
+            in_flight.append(([entry['word'] for entry in batch], future))
+            if len(in_flight) >= window:
+                yield from finish()
+        while in_flight:
+            yield from finish()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert scraped DLE conjugation tables to a Yomitan term bank.')
+    parser.add_argument('--input', default='conjugation_filtered.json',
+                        help='JSON array of {"word": ..., "table": ...} entries')
+    parser.add_argument('--output', default='term_bank_1.json', help='term bank to write')
+    parser.add_argument('--workers', type=int, default=None, help='conversion processes (default: all cores)')
+    parser.add_argument('--batch-size', type=int, default=256, help='tables per batch handed to a process')
+    parser.add_argument('--indent', type=int, default=None,
+                        help='indent the term bank by this many spaces (default: compact, the smallest term bank)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    terms = iter_converted(json_codec.iter_json_array(args.input), args.workers, args.batch_size)
+    count = json_codec.write_json_array(terms, args.output, indent=args.indent)
+    print(f"Converted {count} verbs in {time.perf_counter() - start:.1f}s, output written to file: {args.output}")
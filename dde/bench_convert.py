@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the JSONL to term bank conversion at several worker counts and
+checks that every sharded run writes exactly the same banks as the serial
+one, and that an incremental update writes the same rows as a full
+conversion. Without --input, a JSONL is synthesized from the stand-in server's
+pages.
+"""
+
+import argparse
+import glob
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from dde_scrape import extract_page
+from stand_in_server import DEFAULT_WORDS, make_page
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+from manifest import BuildManifest
+from yomitan import convert_to_yomitan_format, update_term_banks
+
+BASE_URL = 'https://rae.es/diccionario-estudiante/'
+
+
+def synthesize_jsonl(path, copies):
+    with redirect_stdout(io.StringIO()):
+        entries = ''.join(extract_page(make_page(word, DEFAULT_WORDS), BASE_URL + word, word)['entries']
+                          for word in DEFAULT_WORDS)
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(copies):
+            f.write(entries)
+
+
+def read_banks(output_dir):
+    banks = sorted(glob.glob(os.path.join(output_dir, 'term_bank_*.json')))
+    contents = []
+    for bank in banks:
+        with open(bank, 'rb') as f:
+            contents.append(f.read())
+    return contents
+
+
+def read_rows(output_dir):
+    rows = []
+    for index in range(1, len(glob.glob(os.path.join(output_dir, 'term_bank_*.json'))) + 1):
+        with open(os.path.join(output_dir, f'term_bank_{index}.json'), 'rb') as f:
+            rows.extend(json_codec.loads(f.read()))
+    return rows
+
+
+def check_incremental(tmp, max_entries=4):
+    """
+    Converts the stand-in pages into small banks, so some record's rows are
+    split across two banks, revises that record and one other in its first
+    bank, and checks that an incremental update yields the same rows as a
+    full conversion of the revised JSONL.
+    """
+    original = os.path.join(tmp, 'incremental_0.jsonl')
+    revised = os.path.join(tmp, 'incremental_1.jsonl')
+    synthesize_jsonl(original, 1)
+    updated_dir = os.path.join(tmp, 'incremental_updated')
+    manifest_path = os.path.join(tmp, 'incremental.manifest.json')
+    convert_to_yomitan_format(original, updated_dir, max_entries=max_entries, manifest_path=manifest_path)
+
+    bank_of = BuildManifest.load(manifest_path).bank_of()
+    split = next(url for url, names in bank_of.items() if len(names) > 1)
+    neighbour = next(url for url, names in bank_of.items() if url != split and bank_of[split][0] in names)
+    entries = list(json_codec.iter_jsonl(original))
+    for entry in entries:
+        if entry['url'] in (split, neighbour):
+            for definition in entry['data']['definitions']:
+                definition['definition'] += ' (revisada)'
+    json_codec.write_jsonl(entries, revised)
+
+    update_term_banks(revised, updated_dir, manifest_path, max_entries=max_entries)
+    rebuilt_dir = os.path.join(tmp, 'incremental_rebuilt')
+    convert_to_yomitan_format(revised, rebuilt_dir, max_entries=max_entries)
+    updated, rebuilt = read_rows(updated_dir), read_rows(rebuilt_dir)
+    status = 'identical' if updated == rebuilt else 'DIFFERENT'
+    print(f'incremental update of a record split across banks: {len(updated)} rows, '
+          f'{len(rebuilt)} after a full rebuild, {status}')
+    return updated == rebuilt
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark sharded conversion of the scraped JSONL.')
+    parser.add_argument('--input', help='JSONL written by dde_scrape.py (default: synthesized)')
+    parser.add_argument('--copies', type=int, default=50, help='copies of the stand-in pages in the synthesized JSONL')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='worker counts to compare')
+    parser.add_argument('--shard-size', type=int, default=1 << 20, help='bytes of JSONL per shard')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = args.input
+        if input_path is None:
+            input_path = os.path.join(tmp, 'term_bank_0.jsonl')
+            synthesize_jsonl(input_path, args.copies)
+        with open(input_path, 'rb') as f:
+            records = sum(1 for _ in f)
+        print(f'{records} entries, {os.path.getsize(input_path) / 2 ** 20:.1f} MiB of JSONL, {os.cpu_count()} cores')
+
+        reference = None
+        for workers in args.workers:
+            output_dir = os.path.join(tmp, f'out_{workers}')
+            start = time.perf_counter()
+            convert_to_yomitan_format(input_path, output_dir, workers=workers, shard_bytes=args.shard_size)
+            elapsed = time.perf_counter() - start
+            banks = read_banks(output_dir)
+            if reference is None:
+                reference = banks
+            status = 'identical' if banks == reference else 'DIFFERENT from the first run'
+            print(f'{workers:>4} workers: {elapsed:.2f}s ({records / elapsed:.0f} entries/sec), '
+                  f'{len(banks)} banks, {status}')
+
+        check_incremental(tmp)
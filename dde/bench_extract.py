@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmarks page extraction (parse_page) over saved pages: the raw HTML cache,
+a directory of .html files, or pages generated by the stand-in server.
+
+With --save-reference the extracted data is written to a JSONL file; with
+--check-reference a later run compares its output against that file, so an
+extraction change can be verified to produce identical data.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from dde_scrape import parse_page
+from page_cache import PageCache
+from stand_in_server import DEFAULT_WORDS, make_page
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+BASE_URL = 'https://rae.es/diccionario-estudiante/'
+
+
+def load_pages(cache_dir=None, pages_dir=None, limit=None):
+    if cache_dir:
+        pages = list(PageCache(cache_dir).items())
+    elif pages_dir:
+        pages = []
+        for name in sorted(os.listdir(pages_dir)):
+            if name.endswith('.html'):
+                with open(os.path.join(pages_dir, name), 'r', encoding='utf-8') as f:
+                    pages.append((BASE_URL + name[:-len('.html')], f.read()))
+    else:
+        pages = [(BASE_URL + word, make_page(word, DEFAULT_WORDS)) for word in DEFAULT_WORDS]
+    return pages[:limit] if limit else pages
+
+
+def extract_all(pages):
+    output = io.StringIO()
+    grammar_tags, usage_tags, geo_tags = {}, {}, {}
+    not_found_words = []
+    with redirect_stdout(io.StringIO()):
+        for url, markup in pages:
+            key_word = url.rsplit('/', 1)[-1]
+            parse_page(output, markup, url, key_word, grammar_tags, usage_tags, geo_tags, not_found_words)
+    records = []
+    for line in output.getvalue().splitlines():
+        entry = json_codec.loads(line)
+        del entry['timestamp']
+        records.append(json_codec.dumps(entry).decode('utf-8'))
+    return records
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark DDE page extraction over saved pages.')
+    parser.add_argument('--cache-dir', help='raw HTML cache written by dde_scrape.py')
+    parser.add_argument('--pages-dir', help='directory of <word>.html files')
+    parser.add_argument('--limit', type=int, default=None, help='use at most this many pages')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs')
+    parser.add_argument('--save-reference', help='write the extracted records to this file')
+    parser.add_argument('--check-reference', help='compare the extracted records with this file')
+    args = parser.parse_args()
+
+    pages = load_pages(args.cache_dir, args.pages_dir, args.limit)
+    print(f'Loaded {len(pages)} pages')
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        records = extract_all(pages)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f'Best of {args.repeat}: {best:.3f}s ({len(pages) / best:.1f} pages/sec, {len(records)} records)')
+
+    if args.save_reference:
+        with open(args.save_reference, 'w', encoding='utf-8') as f:
+            f.writelines(record + '\n' for record in records)
+        print(f'Reference written to {args.save_reference}')
+
+    if args.check_reference:
+        with open(args.check_reference, 'r', encoding='utf-8') as f:
+            reference = f.read().splitlines()
+        mismatches = sum(1 for a, b in zip(records, reference) if a != b) + abs(len(records) - len(reference))
+        print('Output identical to reference' if not mismatches else f'{mismatches} records differ from reference')
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Measures fetch throughput (pages/sec) of the HTTP backend against the local
+stand-in server, so backend changes can be compared without any network.
+With --max-rate/--error-rate/--empty-rate the server injects throttling, to
+check how close the adaptive rate controller gets to the allowed rate.
+"""
+
+import argparse
+import time
+
+from fetchers import HttpFetcher
+from stand_in_server import StandInServer
+
+
+def bench(fetcher, base_url, words, pages):
+    urls = [f'{base_url}{words[i % len(words)]}' for i in range(pages)]
+    start = time.perf_counter()
+    markups = fetcher.fetch_many(urls)
+    elapsed = time.perf_counter() - start
+    empty = sum(1 for markup in markups if not markup)
+    return elapsed, empty
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the HTTP fetch backend against a local stand-in server.')
+    parser.add_argument('--pages', type=int, default=2000, help='number of pages to fetch per run')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32], help='worker counts to compare')
+    parser.add_argument('--latency', type=float, default=0.02, help='emulated server latency in seconds')
+    parser.add_argument('--max-rate', type=float, default=None, help='server answers 429 above this many requests/sec')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--empty-rate', type=float, default=0.0, help='fraction of requests answered with an empty page')
+    parser.add_argument('--no-adaptive', action='store_true', help='disable the adaptive rate controller')
+    args = parser.parse_args()
+
+    with StandInServer(latency=args.latency, max_rate=args.max_rate,
+                       error_rate=args.error_rate, empty_rate=args.empty_rate) as server:
+        for workers in args.workers:
+            requests_before, throttled_before = server.requests, server.throttled
+            fetcher = HttpFetcher(workers=workers, adaptive=not args.no_adaptive)
+            try:
+                elapsed, empty = bench(fetcher, server.base_url, server.words, args.pages)
+                summary = fetcher.summary()
+            finally:
+                fetcher.close()
+            print(f'{workers:>4} workers: {args.pages} pages in {elapsed:.2f}s '
+                  f'({args.pages / elapsed:.1f} pages/sec, {empty} empty, '
+                  f'{server.requests - requests_before} requests, {server.throttled - throttled_before} throttled)')
+            if summary:
+                print(f'      {summary}')
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Load-tests the lookup service on localhost. Starts lookup_service.py in a
+separate process (or targets --url), sends lookups for terms drawn from the
+dictionary with a Zipf-like skew, as single GETs or batches, from a number of
+concurrent clients, and reports throughput and client-side p50/p90/p99
+latency next to the server's own percentiles and cache hit ratio.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from binary_dict import BinaryDictionary, compile_dictionary
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'files')
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def zipf_terms(terms, count, skew, seed):
+    """
+    Draws `count` terms with the frequency of the n-th term proportional to
+    1/n**skew, so a few terms are hot as in real reading.
+    """
+    rng = random.Random(seed)
+    terms = list(terms)
+    rng.shuffle(terms)
+    weights = [1 / (rank ** skew) for rank in range(1, len(terms) + 1)]
+    return rng.choices(terms, weights, k=count)
+
+
+async def wait_until_ready(session, url, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(f'{url}/stats') as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'{url} did not start')
+        await asyncio.sleep(0.1)
+
+
+async def run_load(url, requests, concurrency, batch_size, fmt):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+
+    async def client(session):
+        nonlocal errors
+        while not queue.empty():
+            terms = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                if batch_size > 1:
+                    request = session.post(f'{url}/batch', json={'terms': terms, 'format': fmt})
+                else:
+                    request = session.get(f'{url}/lookup', params={'term': terms[0], 'format': fmt})
+                async with request as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await wait_until_ready(session, url)
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        async with session.get(f'{url}/stats') as response:
+            stats = await response.json()
+    return elapsed, sorted(latencies), errors, stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load-test the lookup service on localhost.')
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='compiled dictionary, term bank directory or dictionary zip to serve and sample terms from')
+    parser.add_argument('--url', help='test an already running service instead of starting one')
+    parser.add_argument('--requests', type=int, default=20000, help='requests to send')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent clients')
+    parser.add_argument('--batch-size', type=int, default=1, help='terms per request; above 1 uses POST /batch')
+    parser.add_argument('--format', default='json', choices=('json', 'html'))
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of the term distribution (0 = uniform)')
+    parser.add_argument('--cache-size', type=int, default=10000, help='cache size of the started service')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        compiled = args.source
+        if not compiled.endswith('.ytbd'):
+            compiled = os.path.join(tmp_dir, 'bench.ytbd')
+            compile_dictionary(args.source, compiled)
+        with BinaryDictionary(compiled) as dictionary:
+            terms = zipf_terms(dictionary.terms(), args.requests * args.batch_size, args.skew, args.seed)
+        requests = [terms[i:i + args.batch_size] for i in range(0, len(terms), args.batch_size)]
+
+        server = None
+        url = args.url
+        if url is None:
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lookup_service.py'),
+                 f'bench={compiled}', '--port', str(port), '--cache-size', str(args.cache_size)],
+                stdout=subprocess.DEVNULL)
+            url = f'http://127.0.0.1:{port}'
+        try:
+            elapsed, latencies, errors, stats = asyncio.run(
+                run_load(url, requests, args.concurrency, args.batch_size, args.format))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    print(f'{len(requests)} requests ({len(terms)} terms, batch size {args.batch_size}, {args.format}) '
+          f'from {args.concurrency} clients in {elapsed:.2f}s: {len(requests) / elapsed:.0f} requests/sec, '
+          f'{len(terms) / elapsed:.0f} terms/sec, {errors} errors')
+    print(f'client latency: p50 {percentile(latencies, 0.5) * 1000:.2f} ms, '
+          f'p90 {percentile(latencies, 0.9) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms')
+    histogram = stats['histograms'].get('request_seconds', {})
+    cache = stats['cache']
+    print(f'server latency: p50 <= {histogram.get("p50", 0) * 1000:.2f} ms, p99 <= {histogram.get("p99", 0) * 1000:.2f} ms; '
+          f'cache {cache["hits"]} hits / {cache["misses"]} misses ({cache["entries"]} entries)')
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+A compiled, read-only form of the term banks that answers lookups straight
+from a memory-mapped file.
+
+`compile` streams the term_bank_*.json files of a directory or release zip
+into one file laid out as:
+
+    header
+    key table       one fixed-size record per distinct term, sorted by the
+                    term's UTF-8 bytes: the first KEY_PREFIX bytes of the
+                    term, where its full text is, and its run of entries
+    key strings     the terms, concatenated
+    entry table     (offset, length) of each entry's blob, grouped by term
+                    in bank order
+    blobs           each term bank entry as compact JSON, in bank order
+
+`BinaryDictionary` maps the file and binary-searches the key table, comparing
+the fixed prefixes and reading a full key only when a prefix ties, then
+decodes just the blobs of the matching entries. Opening the file reads
+nothing but the header, so a process can answer its first query within
+milliseconds, and only the pages a lookup touches become resident.
+"""
+
+import argparse
+import mmap
+import os
+import resource
+import struct
+import sys
+import tempfile
+import time
+
+from lookup import iter_term_banks
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+MAGIC = b'YTBD'
+FORMAT_VERSION = 1
+KEY_PREFIX = 8
+
+HEADER = struct.Struct('<4sHHIIQQQQ')
+KEY_RECORD = struct.Struct(f'<{KEY_PREFIX}sIHIH')
+ENTRY_RECORD = struct.Struct('<QI')
+
+
+def _key_prefix(key):
+    return key[:KEY_PREFIX].ljust(KEY_PREFIX, b'\0')
+
+
+def compile_dictionary(source, path):
+    """
+    Compiles the term banks in `source` into `path` and returns the number of
+    entries. Blobs are streamed to a temporary file while the banks are read,
+    so only the terms and blob offsets are held in memory. The output is
+    written next to `path` and moved into place when complete.
+    """
+    keys = []
+    blobs = []
+    offset = 0
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=directory) as blob_file:
+        for _, bank in iter_term_banks(source):
+            for entry in bank:
+                blob = json_codec.dumps(entry)
+                blob_file.write(blob)
+                keys.append(entry[0].encode('utf-8'))
+                blobs.append((offset, len(blob)))
+                offset += len(blob)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+
+        key_records = []
+        key_strings = bytearray()
+        entry_records = bytearray()
+        for position, index in enumerate(order):
+            key = keys[index]
+            if key_records and key_records[-1][0] == key:
+                key_records[-1][2] += 1
+            else:
+                if len(key) > 0xffff:
+                    raise ValueError(f"Term too long: {key[:40]!r}...")
+                key_records.append([key, position, 1])
+            entry_records += ENTRY_RECORD.pack(*blobs[index])
+
+        key_table = bytearray()
+        for key, first_entry, entry_count in key_records:
+            if entry_count > 0xffff:
+                raise ValueError(f"Too many entries for {key.decode('utf-8')!r}")
+            key_table += KEY_RECORD.pack(_key_prefix(key), len(key_strings), len(key), first_entry, entry_count)
+            key_strings += key
+
+        keys_offset = HEADER.size
+        key_strings_offset = keys_offset + len(key_table)
+        entries_offset = key_strings_offset + len(key_strings)
+        blobs_offset = entries_offset + len(entry_records)
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, KEY_PREFIX, len(key_records), len(keys),
+                                keys_offset, key_strings_offset, entries_offset, blobs_offset))
+            f.write(key_table)
+            f.write(key_strings)
+            f.write(entry_records)
+            blob_file.seek(0)
+            while chunk := blob_file.read(1 << 20):
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    return len(keys)
+
+
+class BinaryDictionary:
+    """
+    Lookups against a file written by `compile_dictionary`. Results are term
+    bank entries exactly as the converter wrote them: [term, reading,
+    definition tags, rules, score, glossary, sequence, term tags].
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, key_prefix, self.key_count, self.entry_count, self.keys_offset,
+         self.key_strings_offset, self.entries_offset, self.blobs_offset) = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != FORMAT_VERSION or key_prefix != KEY_PREFIX:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} compiled dictionary")
+
+    def _key_record(self, index):
+        return KEY_RECORD.unpack_from(self.map, self.keys_offset + index * KEY_RECORD.size)
+
+    def _key(self, record):
+        start = self.key_strings_offset + record[1]
+        return self.map[start:start + record[2]]
+
+    def _lower_bound(self, key):
+        """
+        Index of the first key not less than `key`.
+        """
+        prefix = _key_prefix(key)
+        low, high = 0, self.key_count
+        while low < high:
+            middle = (low + high) // 2
+            record = self._key_record(middle)
+            if record[0] < prefix or (record[0] == prefix and self._key(record) < key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _blobs(self, record):
+        first_entry, entry_count = record[3], record[4]
+        for index in range(first_entry, first_entry + entry_count):
+            offset, length = ENTRY_RECORD.unpack_from(self.map, self.entries_offset + index * ENTRY_RECORD.size)
+            start = self.blobs_offset + offset
+            yield self.map[start:start + length]
+
+    def lookup_raw(self, term):
+        """
+        The compact JSON blobs of the entries for `term`, undecoded.
+        """
+        key = term.encode('utf-8')
+        index = self._lower_bound(key)
+        if index == self.key_count:
+            return []
+        record = self._key_record(index)
+        if self._key(record) != key:
+            return []
+        return list(self._blobs(record))
+
+    def lookup(self, term):
+        """
+        Entries whose term is exactly `term`, in bank order.
+        """
+        return [json_codec.loads(blob) for blob in self.lookup_raw(term)]
+
+    def prefix(self, prefix, limit=20):
+        """
+        Up to `limit` entries whose term starts with `prefix`, sorted by term.
+        """
+        key = prefix.encode('utf-8')
+        results = []
+        index = self._lower_bound(key)
+        while index < self.key_count and len(results) < limit:
+            record = self._key_record(index)
+            if not self._key(record).startswith(key):
+                break
+            for blob in self._blobs(record):
+                results.append(json_codec.loads(blob))
+                if len(results) == limit:
+                    break
+            index += 1
+        return results
+
+    def terms(self):
+        """
+        Yields every distinct term in key order.
+        """
+        for index in range(self.key_count):
+            yield self._key(self._key_record(index)).decode('utf-8')
+
+    def __len__(self):
+        return self.entry_count
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile and query the memory-mapped binary dictionary format.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = subparsers.add_parser('compile', help='compile the term banks of a directory or dictionary zip')
+    compile_parser.add_argument('source', help='directory with term_bank_*.json files, or a dictionary zip')
+    compile_parser.add_argument('output', nargs='?', default='terms.ytbd', help='compiled file to write')
+
+    query_parser = subparsers.add_parser('query', help='look up terms')
+    query_parser.add_argument('terms', nargs='+', help='terms to look up')
+    query_parser.add_argument('--dictionary', default='terms.ytbd', help='file written by compile')
+    query_parser.add_argument('--prefix', action='store_true', help='match terms starting with each query')
+    query_parser.add_argument('--limit', type=int, default=20, help='maximum results per prefix query')
+    query_parser.add_argument('--compact', action='store_true', help='print results without indentation')
+    args = parser.parse_args()
+
+    if args.command == 'compile':
+        start = time.perf_counter()
+        entries = compile_dictionary(args.source, args.output)
+        size = os.path.getsize(args.output)
+        print(f'Compiled {entries} entries from {args.source} into {args.output} '
+              f'({size / 2 ** 20:.1f} MiB) in {time.perf_counter() - start:.1f}s')
+    else:
+        start = time.perf_counter()
+        with BinaryDictionary(args.dictionary) as dictionary:
+            print(f'Opened {args.dictionary} ({len(dictionary)} entries) in '
+                  f'{(time.perf_counter() - start) * 1000:.2f} ms', file=sys.stderr)
+            for term in args.terms:
+                start = time.perf_counter()
+                results = dictionary.prefix(term, args.limit) if args.prefix else dictionary.lookup(term)
+                elapsed = time.perf_counter() - start
+                print(json_codec.dumps(results, None if args.compact else 2).decode('utf-8'))
+                print(f'{len(results)} results for {term!r} in {elapsed * 1000:.3f} ms', file=sys.stderr)
+        print(f'Peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB', file=sys.stderr)
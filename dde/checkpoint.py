@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+
+def tags_to_list(tags):
+    return [[tag, name] for tag, name in sorted(tags.keys(), key=lambda key: (str(key[0]), str(key[1])))]
+
+
+def tags_from_list(items):
+    return {(tag, name): True for tag, name in items}
+
+
+def committed_offset(output_file):
+    """
+    Flushes the output and returns its size in bytes. Taken after a word has
+    been completely written, it marks where a resumed crawl may append.
+    """
+    output_file.flush()
+    return os.path.getsize(output_file.name)
+
+
+def save_checkpoint(path, output_file, output_offset, frontier, processed_words, grammar_tags, usage_tags, geo_tags, not_found_words):
+    """
+    Atomically writes the crawl state to `path`. `output_offset` is the size
+    of the JSONL output once every processed word was stored, so a resumed
+    crawl can drop whatever was written after it instead of duplicating it.
+    """
+    output_file.flush()
+    os.fsync(output_file.fileno())
+
+    state = {
+        'frontier': list(frontier),
+        'processed_words': sorted(processed_words),
+        'grammar_tags': tags_to_list(grammar_tags),
+        'usage_tags': tags_to_list(usage_tags),
+        'geo_tags': tags_to_list(geo_tags),
+        'not_found_words': list(not_found_words),
+        'output_path': output_file.name,
+        'output_offset': output_offset,
+    }
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(json_codec.dumps(state))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    state = json_codec.load(path)
+    return {
+        'frontier': state['frontier'],
+        'processed_words': set(state['processed_words']),
+        'grammar_tags': tags_from_list(state['grammar_tags']),
+        'usage_tags': tags_from_list(state['usage_tags']),
+        'geo_tags': tags_from_list(state['geo_tags']),
+        'not_found_words': state['not_found_words'],
+        'output_path': state['output_path'],
+        'output_offset': state['output_offset'],
+    }
+
+
+def open_output(path, resume_offset=None):
+    """
+    Opens the JSONL output. On resume the file is cut back to the size it had
+    at the last checkpoint and reopened for appending; otherwise it is truncated.
+    """
+    if resume_offset is None:
+        return open(path, 'w', encoding='utf-8')
+
+    with open(path, 'a+b') as f:
+        f.truncate(resume_offset)
+    return open(path, 'a', encoding='utf-8')
@@ -0,0 +1,677 @@
+"""
+Conjugates Spanish verbs by the 67 models of the DLE conjugation tables (the
+numbers in yomitan.conjugation_model_mapping).
+
+Each model is a small rule set applied to the verb's own stem: a vowel change
+in the stressed stem (contar: cuento), raising in -ir verbs (pedir: pidió),
+-zc- or -y- insertion, irregular yo, preterite and future stems, and literal
+forms for the truly irregular cells. Orthographic changes (sacar: saqué,
+vencer: venzo, leer: leyó) are applied to every verb. Models with literal
+forms only fit their model verb, so other verbs of such a model (detener,
+satisfacer, traducir) are conjugated from the model verb's paradigm by
+swapping the part in front of the suffix they share.
+
+A paradigm is a dict from cell name to form; see CELLS. The compound tenses,
+haber plus the participle, come from `conjugate_compound`.
+"""
+
+import re
+from functools import lru_cache
+
+PERSONS = ('1s', '2s', '3s', '1p', '2p', '3p')
+
+PERSONAL_TENSES = (
+    'presente',
+    'preterito_imperfecto',
+    'preterito_perfecto_simple',
+    'futuro',
+    'condicional',
+    'subjuntivo_presente',
+    'subjuntivo_preterito_imperfecto_ra',
+    'subjuntivo_preterito_imperfecto_se',
+    'subjuntivo_futuro',
+)
+
+IMPERATIVE_PERSONS = ('2s', '2s_vos', '3s', '2p', '3p')
+
+CELLS = (
+    ('infinitivo', 'gerundio', 'participio')
+    + tuple(f'{tense}.{person}' for tense in PERSONAL_TENSES for person in PERSONS)
+    + ('presente.2s_vos',)
+    + tuple(f'imperativo.{person}' for person in IMPERATIVE_PERSONS)
+)
+
+# Compound tense -> tense of the auxiliary haber it is built with.
+COMPOUND_TENSES = {
+    'preterito_perfecto_compuesto': 'presente',
+    'preterito_pluscuamperfecto': 'preterito_imperfecto',
+    'preterito_anterior': 'preterito_perfecto_simple',
+    'futuro_compuesto': 'futuro',
+    'condicional_compuesto': 'condicional',
+    'subjuntivo_preterito_perfecto': 'subjuntivo_presente',
+    'subjuntivo_preterito_pluscuamperfecto_ra': 'subjuntivo_preterito_imperfecto_ra',
+    'subjuntivo_preterito_pluscuamperfecto_se': 'subjuntivo_preterito_imperfecto_se',
+    'subjuntivo_futuro_compuesto': 'subjuntivo_futuro',
+}
+
+VOWELS = 'aeiouáéíóúü'
+_ACCENT = str.maketrans('aeiou', 'áéíóú')
+_UNACCENT = str.maketrans('áéíóú', 'aeiou')
+_ACCENTED = re.compile('[áéíóú]')
+
+ENDINGS = {
+    'ar': {
+        'presente': ('o', 'as', 'a', 'amos', 'áis', 'an'),
+        'preterito_imperfecto': ('aba', 'abas', 'aba', 'ábamos', 'abais', 'aban'),
+        'preterito_perfecto_simple': ('é', 'aste', 'ó', 'amos', 'asteis', 'aron'),
+        'subjuntivo_presente': ('e', 'es', 'e', 'emos', 'éis', 'en'),
+        'vos': 'ás', 'imperativo_vos': 'á', 'gerundio': 'ando', 'participio': 'ado',
+    },
+    'er': {
+        'presente': ('o', 'es', 'e', 'emos', 'éis', 'en'),
+        'preterito_imperfecto': ('ía', 'ías', 'ía', 'íamos', 'íais', 'ían'),
+        'preterito_perfecto_simple': ('í', 'iste', 'ió', 'imos', 'isteis', 'ieron'),
+        'subjuntivo_presente': ('a', 'as', 'a', 'amos', 'áis', 'an'),
+        'vos': 'és', 'imperativo_vos': 'é', 'gerundio': 'iendo', 'participio': 'ido',
+    },
+    'ir': {
+        'presente': ('o', 'es', 'e', 'imos', 'ís', 'en'),
+        'preterito_imperfecto': ('ía', 'ías', 'ía', 'íamos', 'íais', 'ían'),
+        'preterito_perfecto_simple': ('í', 'iste', 'ió', 'imos', 'isteis', 'ieron'),
+        'subjuntivo_presente': ('a', 'as', 'a', 'amos', 'áis', 'an'),
+        'vos': 'ís', 'imperativo_vos': 'í', 'gerundio': 'iendo', 'participio': 'ido',
+    },
+}
+FUTURE_ENDINGS = ('é', 'ás', 'á', 'emos', 'éis', 'án')
+CONDITIONAL_ENDINGS = ('ía', 'ías', 'ía', 'íamos', 'íais', 'ían')
+STRONG_PRETERITE_ENDINGS = ('e', 'iste', 'o', 'imos', 'isteis', 'ieron')
+
+# Cells whose stem carries the stress, where contar diphthongs (cuento) and
+# enviar takes a written accent (envío).
+STRESSED_CELLS = {
+    'presente.1s', 'presente.2s', 'presente.3s', 'presente.3p',
+    'subjuntivo_presente.1s', 'subjuntivo_presente.2s', 'subjuntivo_presente.3s', 'subjuntivo_presente.3p',
+}
+# Cells where -ir stem changers raise e to i and o to u (pidió, durmiendo).
+RAISED_CELLS = {
+    'preterito_perfecto_simple.3s', 'preterito_perfecto_simple.3p',
+    'subjuntivo_presente.1p', 'subjuntivo_presente.2p', 'gerundio',
+}
+Y_CELLS = {'presente.1s', 'presente.2s', 'presente.3s', 'presente.3p'}
+
+
+def _forms(text):
+    return dict(zip(PERSONS, text.split()))
+
+
+# Model number -> rules. Keys:
+#   verb: the model verb
+#   stem_change: 'diphthong' (e>ie, o>ue, i>ie, u>ue), 'close' (e>i) or
+#       'accent' (i>í, u>ú) on the last stem vowel in STRESSED_CELLS
+#   raise: e>i, o>u in RAISED_CELLS
+#   zc: -c- becomes -zc- in the yo present and the present subjunctive
+#   y: -y- after the stem in Y_CELLS and the present subjunctive
+#   yo: literal yo present; the present subjunctive is built on its stem
+#   preterite: strong preterite stem (tuv-: tuve, tuvo, tuvieron)
+#   future: future and conditional stem
+#   forms: literal forms, by tense (six persons) or by cell
+MODELS = {
+    1: {'verb': 'amar'},
+    2: {'verb': 'temer'},
+    3: {'verb': 'partir'},
+    4: {'verb': 'anunciar'},
+    5: {'verb': 'enviar', 'stem_change': 'accent'},
+    6: {'verb': 'liar', 'stem_change': 'accent'},
+    7: {'verb': 'averiguar'},
+    8: {'verb': 'actuar', 'stem_change': 'accent'},
+    9: {'verb': 'bailar'},
+    10: {'verb': 'aislar', 'stem_change': 'accent'},
+    11: {'verb': 'causar'},
+    12: {'verb': 'aunar', 'stem_change': 'accent'},
+    13: {'verb': 'peinar'},
+    14: {'verb': 'descafeinar', 'stem_change': 'accent'},
+    15: {'verb': 'adeudar'},
+    16: {'verb': 'rehusar', 'stem_change': 'accent'},
+    17: {'verb': 'acertar', 'stem_change': 'diphthong'},
+    18: {'verb': 'adquirir', 'stem_change': 'diphthong'},
+    19: {'verb': 'agradecer', 'zc': True},
+    20: {'verb': 'andar', 'preterite': 'anduv'},
+    21: {'verb': 'asir', 'yo': 'asgo'},
+    22: {'verb': 'bendecir', 'stem_change': 'close', 'raise': True, 'yo': 'bendigo', 'preterite': 'bendij'},
+    23: {'verb': 'caber', 'yo': 'quepo', 'preterite': 'cup', 'future': 'cabr'},
+    24: {'verb': 'caer', 'yo': 'caigo'},
+    25: {'verb': 'ceñir', 'stem_change': 'close', 'raise': True},
+    26: {'verb': 'conducir', 'zc': True, 'preterite': 'conduj'},
+    27: {'verb': 'construir', 'y': True},
+    28: {'verb': 'contar', 'stem_change': 'diphthong'},
+    29: {'verb': 'dar', 'forms': {
+        'presente': _forms('doy das da damos dais dan'),
+        'preterito_perfecto_simple': _forms('di diste dio dimos disteis dieron'),
+        'subjuntivo_presente': _forms('dé des dé demos deis den'),
+        'presente.2s_vos': 'das', 'imperativo.2s_vos': 'da',
+    }},
+    30: {'verb': 'decir', 'stem_change': 'close', 'raise': True, 'yo': 'digo', 'preterite': 'dij', 'future': 'dir',
+         'forms': {'participio': 'dicho', 'imperativo.2s': 'di'}},
+    31: {'verb': 'discernir', 'stem_change': 'diphthong'},
+    32: {'verb': 'dormir', 'stem_change': 'diphthong', 'raise': True},
+    33: {'verb': 'entender', 'stem_change': 'diphthong'},
+    34: {'verb': 'erguir', 'raise': True, 'forms': {
+        'presente': _forms('yergo yergues yergue erguimos erguís yerguen'),
+        'subjuntivo_presente': _forms('yerga yergas yerga irgamos irgáis yergan'),
+        'imperativo.2s': 'yergue',
+    }},
+    35: {'verb': 'errar', 'stem_change': 'diphthong'},
+    36: {'verb': 'estar', 'preterite': 'estuv', 'forms': {
+        'presente': _forms('estoy estás está estamos estáis están'),
+        'subjuntivo_presente': _forms('esté estés esté estemos estéis estén'),
+        'imperativo.2s': 'está', 'imperativo.2s_vos': 'está',
+    }},
+    37: {'verb': 'haber', 'preterite': 'hub', 'future': 'habr', 'forms': {
+        'presente': _forms('he has ha hemos habéis han'),
+        'subjuntivo_presente': _forms('haya hayas haya hayamos hayáis hayan'),
+        'presente.2s_vos': 'has', 'imperativo.2s': 'he',
+    }},
+    38: {'verb': 'hacer', 'yo': 'hago', 'preterite': 'hic', 'future': 'har',
+         'forms': {'preterito_perfecto_simple.3s': 'hizo', 'participio': 'hecho', 'imperativo.2s': 'haz'}},
+    39: {'verb': 'huir', 'y': True},
+    40: {'verb': 'ir', 'forms': {
+        'presente': _forms('voy vas va vamos vais van'),
+        'preterito_imperfecto': _forms('iba ibas iba íbamos ibais iban'),
+        'preterito_perfecto_simple': _forms('fui fuiste fue fuimos fuisteis fueron'),
+        'subjuntivo_presente': _forms('vaya vayas vaya vayamos vayáis vayan'),
+        'presente.2s_vos': 'vas', 'gerundio': 'yendo', 'imperativo.2s': 've', 'imperativo.2s_vos': 'andá',
+    }},
+    41: {'verb': 'jugar', 'stem_change': 'diphthong'},
+    42: {'verb': 'leer'},
+    43: {'verb': 'lucir', 'zc': True},
+    44: {'verb': 'mover', 'stem_change': 'diphthong'},
+    45: {'verb': 'mullir'},
+    46: {'verb': 'oír', 'y': True, 'yo': 'oigo'},
+    47: {'verb': 'oler', 'stem_change': 'diphthong'},
+    48: {'verb': 'pedir', 'stem_change': 'close', 'raise': True},
+    49: {'verb': 'poder', 'stem_change': 'diphthong', 'preterite': 'pud', 'future': 'podr',
+         'forms': {'gerundio': 'pudiendo'}},
+    50: {'verb': 'poner', 'yo': 'pongo', 'preterite': 'pus', 'future': 'pondr',
+         'forms': {'participio': 'puesto', 'imperativo.2s': 'pon'}},
+    51: {'verb': 'predecir', 'stem_change': 'close', 'raise': True, 'yo': 'predigo', 'preterite': 'predij',
+         'forms': {'participio': 'predicho'}},
+    52: {'verb': 'pudrir', 'forms': {'participio': 'podrido'}},
+    53: {'verb': 'querer', 'stem_change': 'diphthong', 'preterite': 'quis', 'future': 'querr'},
+    54: {'verb': 'reír', 'forms': {
+        'presente': _forms('río ríes ríe reímos reís ríen'),
+        'preterito_perfecto_simple': _forms('reí reíste rio reímos reísteis rieron'),
+        'subjuntivo_presente': _forms('ría rías ría riamos riais rían'),
+        'gerundio': 'riendo', 'imperativo.2s': 'ríe',
+    }},
+    55: {'verb': 'roer', 'yo': 'roo'},
+    56: {'verb': 'saber', 'preterite': 'sup', 'future': 'sabr', 'forms': {
+        'presente.1s': 'sé',
+        'subjuntivo_presente': _forms('sepa sepas sepa sepamos sepáis sepan'),
+    }},
+    57: {'verb': 'salir', 'yo': 'salgo', 'future': 'saldr', 'forms': {'imperativo.2s': 'sal'}},
+    58: {'verb': 'sentir', 'stem_change': 'diphthong', 'raise': True},
+    59: {'verb': 'ser', 'forms': {
+        'presente': _forms('soy eres es somos sois son'),
+        'preterito_imperfecto': _forms('era eras era éramos erais eran'),
+        'preterito_perfecto_simple': _forms('fui fuiste fue fuimos fuisteis fueron'),
+        'subjuntivo_presente': _forms('sea seas sea seamos seáis sean'),
+        'presente.2s_vos': 'sos', 'imperativo.2s': 'sé', 'imperativo.2s_vos': 'sé',
+    }},
+    60: {'verb': 'sonreír', 'like': 54},
+    61: {'verb': 'tañer'},
+    62: {'verb': 'tener', 'stem_change': 'diphthong', 'yo': 'tengo', 'preterite': 'tuv', 'future': 'tendr',
+         'forms': {'imperativo.2s': 'ten'}},
+    63: {'verb': 'traer', 'yo': 'traigo', 'preterite': 'traj'},
+    64: {'verb': 'valer', 'yo': 'valgo', 'future': 'valdr'},
+    65: {'verb': 'venir', 'stem_change': 'diphthong', 'raise': True, 'yo': 'vengo', 'preterite': 'vin',
+         'future': 'vendr', 'forms': {'imperativo.2s': 'ven'}},
+    66: {'verb': 'ver', 'yo': 'veo', 'forms': {
+        'preterito_imperfecto': _forms('veía veías veía veíamos veíais veían'),
+        'participio': 'visto',
+    }},
+    67: {'verb': 'yacer', 'zc': True},
+}
+
+_LEXICAL_RULES = ('yo', 'preterite', 'future', 'forms', 'like')
+_MODEL_ALIASES = {'podrir': 52}
+_MODELS_BY_VERB = {spec['verb']: number for number, spec in MODELS.items()}
+
+
+def resolve_model(model):
+    """
+    Returns the model number for a model number (int or string) or a model
+    verb name, or None if it is unknown.
+    """
+    if model is None:
+        return None
+    if isinstance(model, int):
+        return model if model in MODELS else None
+    model = model.strip()
+    if model.isdigit():
+        return int(model) if int(model) in MODELS else None
+    return _MODELS_BY_VERB.get(model) or _MODEL_ALIASES.get(model)
+
+
+# Verb families that follow one model, for sources that do not name the model
+# of each verb (the term banks only carry it when the DLE page shows it).
+# Matched on the longest suffix, so only endings no verb of another model
+# shares are listed: the spelling of most verbs does not tell whether they
+# change their stem (pensar: pienso, but compensar: compenso). Model verbs
+# whose ending other verbs share without following them (ver: mover, estar:
+# contestar, andar: mandar) list their prefixed family members in full.
+SUFFIX_MODELS = {
+    'tener': 62, 'poner': 50, 'venir': 65, 'hacer': 38, 'decir': 30, 'bendecir': 22, 'maldecir': 22,
+    'satisfacer': 38, 'traer': 63, 'salir': 57, 'valer': 64, 'caer': 24, 'contar': 28, 'mover': 44, 'volver': 44,
+    'solver': 44, 'cocer': 44, 'torcer': 44, 'sentir': 58, 'vertir': 58, 'ferir': 58, 'gerir': 58, 'pedir': 48,
+    'medir': 48, 'seguir': 48, 'vestir': 48, 'dormir': 32, 'morir': 32, 'querer': 53, 'reír': 60, 'tender': 33,
+    'ducir': 26, 'ecer': 19, 'ocer': 19, 'ucir': 43, 'nacer': 19, 'pacer': 19, 'mecer': 2,
+    'yacer': 67, 'roer': 55, 'leer': 42, 'oír': 46, 'prever': 66, 'entrever': 66, 'rever': 66,
+    'desandar': 20, 'rehaber': 37, 'resaber': 56, 'adquirir': 18, 'inquirir': 18, 'discernir': 31,
+    'concernir': 31, 'cernir': 31, 'mullir': 45, 'bullir': 45, 'engullir': 45, 'tullir': 45,
+    'abrir': 3, 'cubrir': 3, 'scribir': 3, 'imprimir': 3, 'romper': 2, 'proveer': 42,
+}
+_SUFFIX_LENGTHS = sorted({len(suffix) for suffix in SUFFIX_MODELS}, reverse=True)
+
+
+def guess_model(infinitive):
+    """
+    The model number of `infinitive`: its own when it is a model verb (ser
+    59, estar 36), else that of the verb family it belongs to (detener 62,
+    traducir 26, obedecer 19, incluir 27, prever 66), or None when neither
+    tells: such a verb may be regular or change its stem, and conjugating it
+    as regular would invent forms (penso for pienso).
+    """
+    number = resolve_model(infinitive)
+    if number is not None:
+        return number
+    if infinitive.endswith('uir') and infinitive[-4:-3] not in ('g', 'q'):
+        return 27
+    suffix = _longest_suffix(infinitive, SUFFIX_MODELS, _SUFFIX_LENGTHS)
+    return SUFFIX_MODELS[suffix] if suffix is not None else None
+
+
+def _longest_suffix(word, table, lengths):
+    for length in lengths:
+        suffix = word[-length:]
+        if len(word) >= length and suffix in table:
+            return suffix
+    return None
+
+
+# Participles no model gives, by verb family: the irregular one first, then
+# the regular one where both are used. An empty tuple keeps the model's.
+IRREGULAR_PARTICIPLES = {
+    'abrir': ('abierto',), 'cubrir': ('cubierto',), 'scribir': ('scrito',), 'romper': ('roto',),
+    'corromper': (), 'morir': ('muerto',), 'volver': ('vuelto',), 'solver': ('suelto',),
+    'freír': ('frito', 'freído'), 'imprimir': ('impreso', 'imprimido'), 'proveer': ('provisto', 'proveído'),
+}
+_PARTICIPLE_LENGTHS = sorted({len(suffix) for suffix in IRREGULAR_PARTICIPLES}, reverse=True)
+
+
+def irregular_participles(infinitive):
+    """
+    The irregular participles of `infinitive` (escribir: escrito, freír:
+    frito and freído), or an empty list.
+    """
+    suffix = _longest_suffix(infinitive, IRREGULAR_PARTICIPLES, _PARTICIPLE_LENGTHS)
+    if suffix is None:
+        return []
+    head = infinitive[:-len(suffix)]
+    return [head + participle for participle in IRREGULAR_PARTICIPLES[suffix]]
+
+
+def conjugation_class(infinitive):
+    ending = infinitive[-2:].translate(_UNACCENT)
+    if ending not in ENDINGS:
+        raise ValueError(f"{infinitive!r} is not an infinitive")
+    return ending
+
+
+def is_vowel(word, index):
+    """
+    Whether word[index] is pronounced as a vowel; the u of gue/gui/que/qui is
+    not.
+    """
+    char = word[index]
+    if char not in VOWELS:
+        return False
+    if char == 'u' and index > 0 and word[index - 1] in 'gq':
+        following = word[index + 1:index + 2]
+        return following not in ('e', 'i', 'é', 'í')
+    return True
+
+
+def _last_nucleus(stem, following=''):
+    """
+    (start, end) of the last vowel group of `stem`, read as if `following`
+    came after it.
+    """
+    word = stem + following
+    end = len(stem)
+    while end > 0 and not is_vowel(word, end - 1):
+        end -= 1
+    start = end
+    while start > 0 and is_vowel(word, start - 1):
+        start -= 1
+    return start, end
+
+
+def change_stem(stem, kind, following):
+    """
+    Applies a stem vowel change of `kind` to the last vowel group of `stem`.
+    """
+    start, end = _last_nucleus(stem, following)
+    if start == end:
+        return stem
+    nucleus = stem[start:end]
+    if kind == 'diphthong':
+        for index in range(len(nucleus) - 1, -1, -1):
+            vowel = nucleus[index]
+            if vowel in 'eoiu':
+                replacement = {'e': 'ie', 'o': 'ue', 'i': 'ie', 'u': 'ue'}[vowel]
+                if start + index == 0:
+                    replacement = {'ie': 'ye', 'ue': 'hue'}[replacement]
+                elif replacement == 'ue' and stem[start + index - 1] == 'g':
+                    replacement = 'üe'  # avergonzar: avergüenzo
+                nucleus = nucleus[:index] + replacement + nucleus[index + 1:]
+                break
+    elif kind == 'close':
+        index = nucleus.rfind('e')
+        if index >= 0:
+            nucleus = nucleus[:index] + 'i' + nucleus[index + 1:]
+    elif kind == 'raise':
+        for index in range(len(nucleus) - 1, -1, -1):
+            if nucleus[index] in 'eo':
+                nucleus = nucleus[:index] + {'e': 'i', 'o': 'u'}[nucleus[index]] + nucleus[index + 1:]
+                break
+    elif kind == 'accent':
+        for index in range(len(nucleus) - 1, -1, -1):
+            if nucleus[index] in 'iu':
+                nucleus = nucleus[:index] + nucleus[index].translate(_ACCENT) + nucleus[index + 1:]
+                break
+    return stem[:start] + nucleus + stem[end:]
+
+
+def join(stem, ending, verb_class):
+    """
+    Appends a regular `ending` to `stem` with Spanish spelling rules: sacar
+    saqué, pagar pagué, cazar cacé, averiguar averigüé, vencer venzo, coger
+    cojo, seguir sigo, leer leyó/leíste, tañer tañó.
+    """
+    if not ending:
+        return stem
+    first = ending[0]
+    if verb_class in ('er', 'ir') and first == 'i' and len(ending) > 1 and ending[1] in 'aeoó':
+        if stem.endswith(('ñ', 'll')):
+            ending = ending[1:]
+        elif stem and is_vowel(stem + ending, len(stem) - 1):
+            ending = 'y' + ending[1:]
+    elif verb_class in ('er', 'ir') and first == 'i' and stem[-1:] in ('a', 'e', 'o'):
+        ending = 'í' + ending[1:]
+
+    first = ending[0]
+    if verb_class == 'ar' and first in 'eé':
+        if stem.endswith('gu'):
+            stem = stem[:-2] + 'gü'
+        elif stem.endswith('c'):
+            stem = stem[:-1] + 'qu'
+        elif stem.endswith('g'):
+            stem = stem[:-1] + 'gu'
+        elif stem.endswith('z'):
+            stem = stem[:-1] + 'c'
+    elif verb_class in ('er', 'ir') and first in 'aoáó':
+        if stem.endswith('gu'):
+            stem = stem[:-1]
+        elif stem.endswith('qu'):
+            stem = stem[:-2] + 'c'
+        elif stem.endswith('c') and not stem.endswith('zc'):
+            stem = stem[:-1] + 'z'
+        elif stem.endswith('g'):
+            stem = stem[:-1] + 'j'
+    return stem + ending
+
+
+def syllables(word):
+    """
+    Counts the syllables of `word` as the accent rules do: two strong vowels,
+    or a strong vowel next to an accented i or u, are a hiatus; anything else
+    in a vowel group is one syllable (so hui and guion are monosyllables).
+    """
+    count = 0
+    previous = None
+    for index, char in enumerate(word):
+        if is_vowel(word, index):
+            if (previous is None
+                    or (char in 'aeoáéó' and previous in 'aeoáéóíú')
+                    or (char in 'íú' and previous in 'aeoáéó')):
+                count += 1
+            previous = char
+        else:
+            previous = None
+    return count
+
+
+def strip_monosyllable_accent(word):
+    """
+    Monosyllables carry no written accent: lie, lio, liais, vi, vio, hui, huis.
+    """
+    if _ACCENTED.search(word) and syllables(word) == 1:
+        return word.translate(_UNACCENT)
+    return word
+
+
+def add_final_stress_accent(word):
+    """
+    Writes the accent of a word stressed on its last syllable that ends in a
+    vowel, n or s (detén, compón, previó, prevéis).
+    """
+    if any(char in 'áéíóú' for char in word) or word[-1:] not in 'aeiouns':
+        return word
+    end = len(word)
+    while end > 0 and not is_vowel(word, end - 1):
+        end -= 1
+    start = end
+    while start > 0 and is_vowel(word, start - 1):
+        start -= 1
+    nucleus = word[start:end]
+    strong = [index for index, char in enumerate(nucleus) if char in 'aeo']
+    index = strong[-1] if strong else len(nucleus) - 1
+    nucleus = nucleus[:index] + nucleus[index].translate(_ACCENT) + nucleus[index + 1:]
+    return word[:start] + nucleus + word[end:]
+
+
+def _accent_last_vowel(base):
+    for index in range(len(base) - 1, -1, -1):
+        if base[index] in 'aeiou':
+            return base[:index] + base[index].translate(_ACCENT) + base[index + 1:]
+    return base
+
+
+def _apply_rules(infinitive, spec):
+    verb_class = conjugation_class(infinitive)
+    endings = ENDINGS[verb_class]
+    stem = infinitive[:-2]
+    thematic = infinitive[-2]
+    stem_change = spec.get('stem_change')
+    literal = set()
+
+    def stem_for(cell):
+        cell_stem = stem
+        if stem_change and cell in STRESSED_CELLS:
+            cell_stem = change_stem(cell_stem, stem_change, thematic)
+        if spec.get('raise') and cell in RAISED_CELLS:
+            cell_stem = change_stem(cell_stem, 'raise', thematic)
+        if spec.get('zc') and (cell == 'presente.1s' or cell.startswith('subjuntivo_presente.')):
+            cell_stem = cell_stem[:-1] + 'zc'
+        if spec.get('y') and (cell in Y_CELLS or cell.startswith('subjuntivo_presente.')):
+            cell_stem = cell_stem + 'y'
+        return cell_stem
+
+    paradigm = {'infinitivo': infinitive}
+    paradigm['gerundio'] = join(stem_for('gerundio'), endings['gerundio'], verb_class)
+    paradigm['participio'] = join(stem, endings['participio'], verb_class)
+    for tense in ('presente', 'preterito_imperfecto', 'preterito_perfecto_simple', 'subjuntivo_presente'):
+        for person, ending in zip(PERSONS, endings[tense]):
+            cell = f'{tense}.{person}'
+            paradigm[cell] = join(stem_for(cell), ending, verb_class)
+    paradigm['presente.2s_vos'] = join(stem, endings['vos'], verb_class)
+
+    if 'yo' in spec:
+        paradigm['presente.1s'] = spec['yo']
+        yo_stem = spec['yo'][:-1]
+        for person, ending in zip(PERSONS, ENDINGS['er']['subjuntivo_presente']):
+            paradigm[f'subjuntivo_presente.{person}'] = yo_stem + ending
+        literal.update(['presente.1s'] + [f'subjuntivo_presente.{person}' for person in PERSONS])
+
+    if 'preterite' in spec:
+        preterite = spec['preterite']
+        for person, ending in zip(PERSONS, STRONG_PRETERITE_ENDINGS):
+            if preterite.endswith('j') and ending == 'ieron':
+                ending = 'eron'
+            paradigm[f'preterito_perfecto_simple.{person}'] = preterite + ending
+            literal.add(f'preterito_perfecto_simple.{person}')
+
+    future = spec.get('future', infinitive.translate(_UNACCENT))
+    for person, future_ending, conditional_ending in zip(PERSONS, FUTURE_ENDINGS, CONDITIONAL_ENDINGS):
+        paradigm[f'futuro.{person}'] = future + future_ending
+        paradigm[f'condicional.{person}'] = future + conditional_ending
+
+    for key, value in spec.get('forms', {}).items():
+        if isinstance(value, dict):
+            for person, form in value.items():
+                paradigm[f'{key}.{person}'] = form
+                literal.add(f'{key}.{person}')
+        else:
+            paradigm[key] = value
+            literal.add(key)
+
+    base = paradigm['preterito_perfecto_simple.3p'][:-3]
+    accented = _accent_last_vowel(base)
+    for tense, suffix in (('subjuntivo_preterito_imperfecto_ra', 'ra'), ('subjuntivo_preterito_imperfecto_se', 'se'),
+                          ('subjuntivo_futuro', 're')):
+        for person, ending in zip(PERSONS, ('', 's', '', 'mos', 'is', 'n')):
+            paradigm[f'{tense}.{person}'] = (accented if person == '1p' else base) + suffix + ending
+
+    imperative = {
+        'imperativo.2s': paradigm['presente.3s'],
+        'imperativo.2s_vos': join(stem, endings['imperativo_vos'], verb_class),
+        'imperativo.3s': paradigm['subjuntivo_presente.3s'],
+        'imperativo.2p': infinitive[:-1] + 'd',
+        'imperativo.3p': paradigm['subjuntivo_presente.3p'],
+    }
+    for cell, form in imperative.items():
+        if cell not in literal:
+            paradigm[cell] = form
+
+    for cell in CELLS:
+        if cell not in literal:
+            paradigm[cell] = strip_monosyllable_accent(paradigm[cell])
+    return {cell: paradigm[cell] for cell in CELLS}
+
+
+def _common_suffix_length(a, b):
+    length = 0
+    while length < min(len(a), len(b)) and a[-1 - length] == b[-1 - length]:
+        length += 1
+    return length
+
+
+def transfer(paradigm, target):
+    """
+    Conjugates `target` like the verb of `paradigm` by replacing what comes
+    before their common suffix (tener > detener, hacer > satisfacer,
+    conducir > traducir). Raises ValueError when some form of the model does
+    not start with that part.
+    """
+    model = paradigm['infinitivo']
+    shared = _common_suffix_length(model, target)
+    if shared < 2:
+        raise ValueError(f"{target!r} shares no suffix with {model!r}")
+    model_head = model[:-shared]
+    target_head = target[:-shared]
+    result = {}
+    for cell, form in paradigm.items():
+        if not form.startswith(model_head):
+            raise ValueError(f"Cannot conjugate {target!r} like {model!r}: {cell} {form!r} does not share its stem")
+        rest = form[len(model_head):]
+        if not model_head and target_head and syllables(rest) == 1:
+            rest = add_final_stress_accent(rest)
+        elif not model_head and target_head[-1:] in ('a', 'e', 'o'):
+            rest = _hiatus_accent(rest)
+        result[cell] = target_head + rest
+    return result
+
+
+def _hiatus_accent(rest):
+    # A stressed i or u after h and the strong vowel of a prefix is in hiatus
+    # with it and takes a written accent: rehacer rehíce, rehízo.
+    if (len(rest) > 1 and rest[0] == 'h' and rest[1] in 'iu' and syllables(rest) == 2
+            and rest[-1] in 'aeiouns' and not _ACCENTED.search(rest)):
+        return rest[0] + rest[1].translate(_ACCENT) + rest[2:]
+    return rest
+
+
+def conjugate(infinitive, model=None):
+    """
+    Returns the paradigm of `infinitive` (a dict from cell name to form)
+    following DLE model `model`, a model number or model verb. Without a
+    model the verb is conjugated as regular. Verbs with an irregular
+    participle (abrir: abierto) get it whatever their model.
+    """
+    infinitive = infinitive.strip()
+    paradigm = _conjugate(infinitive, model)
+    participles = irregular_participles(infinitive)
+    if participles:
+        paradigm['participio'] = participles[0]
+    return paradigm
+
+
+def _conjugate(infinitive, model):
+    number = resolve_model(model)
+    if number is None:
+        if model is not None:
+            raise ValueError(f"Unknown conjugation model {model!r}")
+        return _apply_rules(infinitive, {})
+    spec = MODELS[number]
+    if 'like' in spec:
+        return transfer(conjugate(MODELS[spec['like']]['verb'], spec['like']), infinitive)
+    if infinitive == spec['verb']:
+        return _apply_rules(infinitive, spec)
+    if _MODEL_ALIASES.get(infinitive) == number:
+        # podrir is conjugated as pudrir in every form but its infinitive.
+        return {**_apply_rules(spec['verb'], spec), 'infinitivo': infinitive}
+    if not any(key in spec for key in _LEXICAL_RULES):
+        return _apply_rules(infinitive, spec)
+    return transfer(_apply_rules(spec['verb'], spec), infinitive)
+
+
+@lru_cache(maxsize=None)
+def _haber_paradigm():
+    return conjugate('haber', 'haber')
+
+
+def conjugate_compound(participle):
+    """
+    The compound forms built on `participle`: infinitivo_compuesto,
+    gerundio_compuesto and every person of COMPOUND_TENSES.
+    """
+    haber = _haber_paradigm()
+    forms = {
+        'infinitivo_compuesto': f"{haber['infinitivo']} {participle}",
+        'gerundio_compuesto': f"{haber['gerundio']} {participle}",
+    }
+    for tense, auxiliary in COMPOUND_TENSES.items():
+        for person in PERSONS:
+            forms[f'{tense}.{person}'] = f"{haber[f'{auxiliary}.{person}']} {participle}"
+    return forms
+
+
+def model_paradigm(number):
+    """
+    The paradigm of a model's own verb.
+    """
+    return conjugate(MODELS[number]['verb'], number)
+
+
+def is_infinitive(word):
+    return word == 'ir' or bool(re.fullmatch(r"[a-záéíóúüñ]+(ar|er|ir|ír)", word))
@@ -1,11 +1,44 @@
 #!/usr/bin/env python3
 
+import argparse
+import io
+import os
+import sys
+import time
 import lxml.html
-from selenium import webdriver
-import json
 import csv
 from datetime import datetime
 
+from fetchers import make_fetcher
+from page_cache import PageCache
+from checkpoint import committed_offset, save_checkpoint, load_checkpoint, open_output
+from frontier import Frontier, SEED_LETTERS
+from metrics import metrics, MetricsFlusher
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+# Metrics recorded while parsing a page, handed back to the parent process by extract_page.
+PAGE_METRICS = ('parse_seconds', 'extract_seconds', 'entries_stored_total', 'store_errors_total',
+                'pages_without_entry_total', 'parse_errors_total')
+
+XPATH_TEXT = lxml.etree.XPath('.//text()')
+XPATH_RUEDA = lxml.etree.XPath('//ul[@class="rueda"]/li/a | //ul[@class="rueda"]/li/b')
+XPATH_ENTRADA = lxml.etree.XPath('//span[@class="entrada"]')
+XPATH_PARACEP = lxml.etree.XPath('//div[@class="paracep"]')
+XPATH_VERB_MODEL = lxml.etree.XPath('.//span[contains(@class, "verboModelo")]')
+XPATH_PLURAL = lxml.etree.XPath('.//span[contains(@class, "pluralForm")]')
+XPATH_PAR = lxml.etree.XPath('.//div[contains(@class, "par")]')
+XPATH_PARTICIPIO = lxml.etree.XPath('.//span[contains(@class, "participioIrregular")]')
+XPATH_ACEP = lxml.etree.XPath('.//div[contains(@class, "acep")]')
+XPATH_ARTICLE = lxml.etree.XPath('//article')
+XPATH_LOCS_AND_SOLS = lxml.etree.XPath('.//div[@class="locs"]//div[@class="fc"] | .//div[@class="sols"]//div[@class="fc"]')
+XPATH_HEADWORD_FC = lxml.etree.XPath('.//span[@class="headword-fc"]')
+XPATH_LOC_DEF = lxml.etree.XPath('.//div[@class="acep nogr"]//span[@class="def"]')
+XPATH_DEF = lxml.etree.XPath('.//span[@class="def"]')
+XPATH_ANCESTOR_CLASS = lxml.etree.XPath('ancestor::div/@class')
+XPATH_LINK_TEXT = lxml.etree.XPath('.//a/text()')
+
 def store_entry(file_handle, url, word, entry_type, structured_data):
     try:
         entry = {
@@ -15,68 +48,83 @@ def store_entry(file_handle, url, word, entry_type, structured_data):
             'data': structured_data,
             'timestamp': datetime.now().isoformat()
         }
-        file_handle.write(json.dumps(entry, ensure_ascii=False) + '\n')
-        print(f' 💾 {entry_type.capitalize()} "{word}" @ {url} stored')
+        file_handle.write(json_codec.dumps(entry).decode('utf-8') + '\n')
+        metrics.inc('entries_stored_total')
     except Exception as e:
+        metrics.inc('store_errors_total')
         print(e, url)
 
 def get_text_content(element):
-    return ' '.join(element.xpath('.//text()')).strip() if element is not None else ''
-
-def get_next_word(soup, current_word):
-    rueda = soup.xpath('//ul[@class="rueda"]/li/a | //ul[@class="rueda"]/li/b')
-    current_found = False
-    
-    words_in_wheel = [link.text_content().strip() for link in rueda]
-    
-    for i, link in enumerate(rueda):
-        word = link.text_content().strip()
-        if current_found:
-            next_word = word
-            print(f"Found next word: {next_word}")
-            return next_word
-        if word == current_word:
-            current_found = True
-            if i == len(rueda) - 1:
-                next_word = words_in_wheel[0]
-                return next_word
-            
-    if not current_found:
-        print(f"Warning: Could not find {current_word} in the term wheel")
-    
-    return None
+    return ' '.join(XPATH_TEXT(element)).strip() if element is not None else ''
+
+def get_wheel_words(soup):
+    rueda = XPATH_RUEDA(soup)
+    return [link.text_content().strip() for link in rueda]
+
+def fetch_markup(fetcher, url, key_word, not_found_words, max_retries=3, cache=None):
+    if cache is not None:
+        markup = cache.get(url)
+        if markup:
+            metrics.inc('cache_hits_total')
+            return markup
+
+    # An adaptive HttpFetcher retries with backoff itself; retrying here too
+    # would multiply the requests sent for one page.
+    fetcher_attempts = getattr(fetcher, 'max_attempts', 1)
+    if fetcher_attempts > 1:
+        max_retries = 1
 
-def fetch_page(output_file, driver, url, key_word, grammar_tags, usage_tags, geo_tags, not_found_words, max_retries=3):
     retries = 0
     markup = ''
     while retries < max_retries:
-        print(f'Fetching {url}... Attempt {retries + 1}/{max_retries}')
-        driver.get(url)
-        markup = driver.page_source.strip()
+        with metrics.timer('fetch_seconds'):
+            markup = fetcher.fetch(url)
         if markup:
             break
         else:
             print(f'Warning: Empty document retrieved for "{key_word}" @ {url}')
+            metrics.inc('fetch_retries_total')
             retries += 1
 
     if not markup:
         not_found_words.append(url)
-        print(f' ❌ No valid content found for "{key_word}" @ {url} after {max_retries} attempts. Skipping...')
+        metrics.inc('not_found_total')
+        print(f' ❌ No valid content found for "{key_word}" @ {url} after {max_retries * fetcher_attempts} attempts. Skipping...')
+        return None
+
+    if cache is not None:
+        cache.put(url, markup)
+
+    return markup
+
+def fetch_page(output_file, fetcher, url, key_word, grammar_tags, usage_tags, geo_tags, not_found_words, max_retries=3, cache=None, references=None):
+    markup = fetch_markup(fetcher, url, key_word, not_found_words, max_retries, cache)
+    if markup is None:
         return None
+    return parse_page(output_file, markup, url, key_word, grammar_tags, usage_tags, geo_tags, not_found_words, references)
 
+def parse_page(output_file, markup, url, key_word, grammar_tags, usage_tags, geo_tags, not_found_words, references=None):
+    start = time.perf_counter()
     try:
         soup = lxml.html.fromstring(markup)
     except lxml.etree.ParserError as e:
         print(f'Parsing error for "{key_word}" @ {url}: {e}. Skipping...')
+        metrics.inc('parse_errors_total')
         not_found_words.append(url)
         return None
+    metrics.observe('parse_seconds', time.perf_counter() - start)
 
+    with metrics.timer('extract_seconds'):
+        return extract_entries(output_file, soup, url, key_word, grammar_tags, usage_tags, geo_tags, references)
+
+def extract_entries(output_file, soup, url, key_word, grammar_tags, usage_tags, geo_tags, references=None):
     soup.make_links_absolute(base_url='https://rae.es/diccionario-estudiante/')
-    word_element = soup.xpath('//span[@class="entrada"]')
+    word_element = XPATH_ENTRADA(soup)
     word = word_element[0].text_content() if word_element else None
 
     if not word:
         print(f' ❌ No entry found for "{key_word}" @ {url}. Skipping...')
+        metrics.inc('pages_without_entry_total')
         return None
 
     structured_data = []
@@ -86,14 +134,14 @@ def fetch_page(output_file, driver, url, key_word, grammar_tags, usage_tags, geo
     plural = None
     participios = []
     note = None
-    paracep = soup.xpath('//div[@class="paracep"]')
+    paracep = XPATH_PARACEP(soup)
 
     # Process paracep if it exists
     if paracep:
-        model_span = paracep[0].xpath('.//span[contains(@class, "verboModelo")]')
-        plural_span = paracep[0].xpath('.//span[contains(@class, "pluralForm")]')
-        note_span = paracep[0].xpath('.//div[contains(@class, "par")]')
-        participio_spans = paracep[0].xpath('.//span[contains(@class, "participioIrregular")]')
+        model_span = XPATH_VERB_MODEL(paracep[0])
+        plural_span = XPATH_PLURAL(paracep[0])
+        note_span = XPATH_PAR(paracep[0])
+        participio_spans = XPATH_PARTICIPIO(paracep[0])
 
         if model_span:
             conjugation_model = model_span[0].text_content().strip()
@@ -107,20 +155,20 @@ def fetch_page(output_file, driver, url, key_word, grammar_tags, usage_tags, geo
         if not conjugation_model and not plural and not participios and note_span:
             note = note_span[0].text_content().strip()
 
-        for acep in paracep[0].xpath('.//div[contains(@class, "acep")]'):
+        for acep in XPATH_ACEP(paracep[0]):
             process_definition(acep, structured_data, grammar_tags, usage_tags, geo_tags)
 
         for p in paracep:
             p.getparent().remove(p)
 
     # Process articles
-    articles = soup.xpath('//article')
+    articles = XPATH_ARTICLE(soup)
     if articles:
         for article in articles:
-            locs_and_sols = article.xpath('.//div[@class="locs"]//div[@class="fc"] | .//div[@class="sols"]//div[@class="fc"]')
+            locs_and_sols = XPATH_LOCS_AND_SOLS(article)
             
             for loc in locs_and_sols:
-                expression_element = loc.xpath('.//span[@class="headword-fc"]')
+                expression_element = XPATH_HEADWORD_FC(loc)
                 headword = expression_element[0].text_content() if expression_element else key_word
 
                 definition_data = {
@@ -136,21 +184,21 @@ def fetch_page(output_file, driver, url, key_word, grammar_tags, usage_tags, geo
                     "term_notes": [],
                 }
 
-                definition = loc.xpath('.//div[@class="acep nogr"]//span[@class="def"]')
+                definition = XPATH_LOC_DEF(loc)
                 if definition:
                     definition_data["definition"] = get_text_content(definition[0])
 
-                examples = loc.xpath('.//span[@class="ejemplo"]')
-                definition_data["examples"].extend(get_text_content(e) for e in examples)
+                elements = collect_elements(loc)
+
+                definition_data["examples"].extend(get_text_content(e) for e in elements["examples"])
 
-                note_elements = loc.xpath('.//div[contains(@class, "par")]')
-                definition_data["term_notes"].extend(get_text_content(note) for note in note_elements)
+                definition_data["term_notes"].extend(get_text_content(note) for note in elements["par_notes"])
 
-                extract_tags(loc, definition_data, grammar_tags, usage_tags, geo_tags)
+                add_tags(elements, definition_data, grammar_tags, usage_tags, geo_tags)
 
-                extract_synonyms_antonyms(loc, definition_data)
+                add_synonyms_antonyms(elements["refs"], definition_data)
 
-                expr_type = "locution" if "locs" in loc.xpath('ancestor::div/@class')[0] else "solution"
+                expr_type = "locution" if "locs" in XPATH_ANCESTOR_CLASS(loc)[0] else "solution"
                 expressions_data.append({
                     "expression": headword,
                     "type": expr_type,
@@ -160,7 +208,7 @@ def fetch_page(output_file, driver, url, key_word, grammar_tags, usage_tags, geo
             for loc in locs_and_sols:
                 loc.getparent().remove(loc)
 
-            for acep in article.xpath('.//div[contains(@class, "acep")]'):
+            for acep in XPATH_ACEP(article):
                 process_definition(acep, structured_data, grammar_tags, usage_tags, geo_tags)
 
     if structured_data:
@@ -188,10 +236,14 @@ def fetch_page(output_file, driver, url, key_word, grammar_tags, usage_tags, geo
         expr_url = f"{url}#{expr['data']['id']}"
         store_entry(output_file, expr_url, expr['expression'], expr['type'], [expr['data']])
 
+    if references is not None:
+        for definition_data in structured_data + [expr['data'] for expr in expressions_data]:
+            references.update(definition_data["synonyms"])
+            references.update(definition_data["antonyms"])
+
     return soup
 
 def process_definition(acep, structured_data, grammar_tags, usage_tags, geo_tags):
-    definition_text = get_text_content(acep.xpath('.//span[@class="def"]')[0]) if acep.xpath('.//span[@class="def"]') else ""
     acep_id = acep.get('id')
 
     if acep_id is None:
@@ -209,70 +261,118 @@ def process_definition(acep, structured_data, grammar_tags, usage_tags, geo_tags
         "id": acep_id
     }
 
-    definition = acep.xpath('.//span[@class="def"]')
+    definition = XPATH_DEF(acep)
     if definition:
         definition_data["definition"] = get_text_content(definition[0])
 
-    for loc in acep.xpath('.//div[@class="locs"]//div[@class="fc"] | .//div[@class="sols"]//div[@class="fc"]'):
+    for loc in XPATH_LOCS_AND_SOLS(acep):
         loc.getparent().remove(loc)
 
-    extract_tags(acep, definition_data, grammar_tags, usage_tags, geo_tags)
+    elements = collect_elements(acep)
 
-    examples = acep.xpath('.//span[@class="ejemplo"]')
-    definition_data["examples"].extend(get_text_content(e) for e in examples)
+    add_tags(elements, definition_data, grammar_tags, usage_tags, geo_tags)
 
-    extract_synonyms_antonyms(acep, definition_data)
+    definition_data["examples"].extend(get_text_content(e) for e in elements["examples"])
 
-    extract_notes(acep, definition_data)
+    add_synonyms_antonyms(elements["refs"], definition_data)
+
+    add_notes(elements, definition_data)
 
     structured_data.append(definition_data)
 
-def extract_notes(element, definition_data):
+def collect_elements(element):
+    """
+    Sorts every descendant of `element` the extraction looks at into buckets
+    in a single walk of the tree. Each bucket keeps document order, so it
+    holds exactly what the equivalent descendant XPath query would return.
+    """
+    elements = {
+        "grammar_tags": [],
+        "usage_tags": [],
+        "geo_tags": [],
+        "examples": [],
+        "def_notes": [],
+        "symbols": [],
+        "refs": [],
+        "par_notes": [],
+    }
+    for child in element.iterdescendants('abbr', 'span', 'div'):
+        css_class = child.get('class')
+        if css_class is None:
+            continue
+        if child.tag == 'abbr':
+            if css_class == 'gram' or css_class == 'gram primera':
+                elements["grammar_tags"].append(child)
+            elif css_class == 'register':
+                elements["usage_tags"].append(child)
+            elif css_class == 'geo':
+                elements["geo_tags"].append(child)
+        elif child.tag == 'span':
+            if css_class == 'ejemplo':
+                elements["examples"].append(child)
+            elif css_class == 'defP':
+                elements["def_notes"].append(child)
+            elif css_class == 'symbol':
+                elements["symbols"].append(child)
+        else:
+            if 'ref' in css_class:
+                elements["refs"].append(child)
+            if 'par' in css_class:
+                elements["par_notes"].append(child)
+    return elements
+
+def add_notes(elements, definition_data):
     if 'def_notes' not in definition_data:
         definition_data['def_notes'] = []
-    
-    def_notes_tb = element.xpath('.//span[@class="defP"]')
-    if def_notes_tb:
-        for note in def_notes_tb:
-            definition_data["def_notes"].append(get_text_content(note))
-
-    symbols_in_element = element.xpath('.//span[@class="symbol"]')
-    for symbol in symbols_in_element:
+
+    for note in elements["def_notes"]:
+        definition_data["def_notes"].append(get_text_content(note))
+
+    for symbol in elements["symbols"]:
         symbol_text = symbol.text_content().strip()
         definition_data["def_notes"].append({"symbol": symbol_text})
 
-def extract_tags(element, definition_data, grammar_tags, usage_tags, geo_tags):
-    grammar_tags_in_element = element.xpath(".//abbr[@class='gram' or @class='gram primera']")
-    for tag in grammar_tags_in_element:
-        tag_name = tag.get('title')
-        tag_text = tag.text
-        definition_data["grammar_tags"].append({"tag": tag_text})
-        grammar_tags[(tag_text, tag_name)] = True
-
-    usage_tags_in_element = element.xpath(".//abbr[@class='register']")
-    for tag in usage_tags_in_element:
-        tag_name = tag.get('title')
-        tag_text = tag.text
-        definition_data["usage_tags"].append({"tag": tag_text})
-        usage_tags[(tag_text, tag_name)] = True
-
-    geo_tags_in_element = element.xpath(".//abbr[@class='geo']")
-    for tag in geo_tags_in_element:
-        tag_name = tag.get('title')
-        tag_text = tag.text
-        definition_data["geo_tags"].append({"tag": tag_text})
-        geo_tags[(tag_text, tag_name)] = True
-    pass
+def add_tags(elements, definition_data, grammar_tags, usage_tags, geo_tags):
+    for key, registry in (("grammar_tags", grammar_tags), ("usage_tags", usage_tags), ("geo_tags", geo_tags)):
+        for tag in elements[key]:
+            tag_name = tag.get('title')
+            tag_text = tag.text
+            definition_data[key].append({"tag": tag_text})
+            registry[(tag_text, tag_name)] = True
 
-def extract_synonyms_antonyms(element, definition_data):
-    for ref in element.xpath('.//div[contains(@class, "ref")]'):
+def add_synonyms_antonyms(refs, definition_data):
+    for ref in refs:
         ref_type = ref.get('class').replace('ref', '').strip()
-        ref_words = [word.strip() for word in ref.xpath('.//a/text()')]
+        ref_words = [word.strip() for word in XPATH_LINK_TEXT(ref)]
         if ref_type == 'S':  # Synonym
             definition_data["synonyms"].extend(ref_words)
         elif ref_type == 'A':  # Antonym
             definition_data["antonyms"].extend(ref_words)
 
+def extract_page(markup, url, key_word):
+    """
+    Runs parse_page on its own output buffer and tag registries and returns
+    everything it produced as plain data, so extraction can run in a worker
+    process and be merged by a single writer.
+    """
+    output = io.StringIO()
+    grammar_tags = {}
+    usage_tags = {}
+    geo_tags = {}
+    not_found_words = []
+    references = set()
+    soup = parse_page(output, markup, url, key_word, grammar_tags, usage_tags, geo_tags, not_found_words, references)
+    links = get_wheel_words(soup) + sorted(references) if soup is not None else []
+    return {
+        'entries': output.getvalue(),
+        'grammar_tags': list(grammar_tags),
+        'usage_tags': list(usage_tags),
+        'geo_tags': list(geo_tags),
+        'not_found_words': not_found_words,
+        'links': links,
+        'metrics': metrics.take(PAGE_METRICS),
+    }
+
 def save_tags_to_file(tags, filename):
     with open(filename, 'w', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
@@ -282,59 +382,96 @@ def save_tags_to_file(tags, filename):
     pass
 
 if __name__ == '__main__':
-    initial_word = "a"  # Starting word
-    processed_words = set()
-    current_word = initial_word
-    output_file = open('term_bank_0.jsonl', 'w', encoding='utf-8')
-    
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_argument("--guest")
-    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--disable-first-run-ui')
-    chrome_options.add_argument('--disable-popup-blocking')
-    chrome_options.add_argument('--disable-notifications')
-    chrome_options.add_argument('--disable-infobars')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--ignore-certificate-errors')
-    chrome_options.add_argument('--ignore-ssl-errors')
-    chrome_options.add_argument('--disable-extensions')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('window-size=800,700')
-    driver = webdriver.Chrome(options=chrome_options)
+    parser = argparse.ArgumentParser(description='Scrape the Diccionario del estudiante following the term wheel.')
+    parser.add_argument('--backend', choices=['http', 'selenium'], default='http',
+                        help='fetch pages with the async HTTP client or with a pool of headless Chrome instances')
+    parser.add_argument('--workers', type=int, default=8, help='number of pages fetched concurrently')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='processes used for parsing and extraction (default: all cores)')
+    parser.add_argument('--no-adaptive', action='store_true',
+                        help='disable adaptive rate control and retry backoff (http backend)')
+    parser.add_argument('--recycle-after', type=int, default=200,
+                        help='restart each Chrome instance after this many pages (selenium backend)')
+    parser.add_argument('--seeds', nargs='+', default=SEED_LETTERS, help='words the crawl starts from')
+    parser.add_argument('--base-url', default='https://rae.es/diccionario-estudiante/',
+                        help='dictionary root, e.g. a local stand_in_server.py instance')
+    parser.add_argument('--cache-dir', default='page_cache', help='directory of the raw HTML cache')
+    parser.add_argument('--no-cache', action='store_true', help='always fetch and do not store pages')
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help='refetch cached pages older than this many days')
+    parser.add_argument('--cache-revision', default=None,
+                        help='refetch cached pages stored under a different revision label')
+    parser.add_argument('--checkpoint', default='crawl_state.json', help='file the crawl state is saved to')
+    parser.add_argument('--checkpoint-every', type=int, default=50, help='save the crawl state every N words')
+    parser.add_argument('--resume', action='store_true', help='continue from the last checkpoint')
+    parser.add_argument('--metrics-file', default='crawl_metrics.prom',
+                        help='metrics output, JSON if it ends in .json, Prometheus text format otherwise')
+    parser.add_argument('--metrics-every', type=float, default=10.0, help='seconds between metrics flushes')
+    args = parser.parse_args()
 
+    processed_words = set()
+    pending_words = args.seeds
     grammar_tags = {}
     usage_tags = {}
     geo_tags = {}
     not_found_words = []
+    output_path = 'term_bank_0.jsonl'
+    resume_offset = None
+
+    if args.resume:
+        state = load_checkpoint(args.checkpoint)
+        processed_words = state['processed_words']
+        pending_words = state['frontier']
+        grammar_tags = state['grammar_tags']
+        usage_tags = state['usage_tags']
+        geo_tags = state['geo_tags']
+        not_found_words = state['not_found_words']
+        output_path = state['output_path']
+        resume_offset = state['output_offset']
+        print(f"Resuming with {len(pending_words)} queued and {len(processed_words)} processed words")
+
+    frontier = Frontier(args.base_url, seen_words=processed_words)
+    frontier.extend(pending_words)
+
+    output_file = open_output(output_path, resume_offset)
+    output_offset = committed_offset(output_file)
+
+    def checkpoint():
+        pending = [word for word in frontier.pending() if word not in processed_words]
+        save_checkpoint(args.checkpoint, output_file, output_offset, pending, processed_words,
+                        grammar_tags, usage_tags, geo_tags, not_found_words)
+
+    def on_word_done():
+        global output_offset
+        output_offset = committed_offset(output_file)
+        if len(processed_words) % args.checkpoint_every == 0:
+            checkpoint()
+
+    fetcher = make_fetcher(args.backend, workers=args.workers, recycle_after=args.recycle_after,
+                           adaptive=not args.no_adaptive)
+    cache = None
+    if not args.no_cache:
+        ttl = args.cache_ttl * 86400 if args.cache_ttl is not None else None
+        cache = PageCache(args.cache_dir, ttl=ttl, revision=args.cache_revision)
+
+    from pipeline import CrawlPipeline
+
+    pipeline = CrawlPipeline(frontier, fetcher, output_file, grammar_tags, usage_tags, geo_tags,
+                             not_found_words, processed_words, cache=cache, fetch_workers=args.workers,
+                             parse_workers=args.parse_workers, on_word_done=on_word_done)
+
+    flusher = MetricsFlusher(metrics, args.metrics_file, args.metrics_every).start()
 
     try:
-        while current_word and current_word not in processed_words:
-            print(f"\nProcessing word: {current_word}")
-            url = f'https://rae.es/diccionario-estudiante/{current_word}'
-            soup = fetch_page(output_file, driver, url, current_word, grammar_tags, usage_tags, geo_tags, not_found_words)
-            
-            if soup is None:
-                print(f"Error processing {current_word}, stopping")
-                break
-                
-            processed_words.add(current_word)
-            
-            next_word = get_next_word(soup, current_word)
-            
-            if next_word is None:
-                break
-                
-            if next_word == initial_word:
-                break
-                
-            current_word = next_word
+        pipeline.run()
 
     except Exception as e:
         print(f"Unexpected error: {e}")
-        
+
     finally:
-        output_file.close()
+        with pipeline.output_lock:
+            checkpoint()
+            output_file.close()
         
         save_tags_to_file(grammar_tags, 'grammar_tags.csv')
         save_tags_to_file(usage_tags, 'usage_tags.csv')
@@ -344,5 +481,10 @@ if __name__ == '__main__':
             for unfound_word in sorted(not_found_words):
                 f.write(f"{unfound_word}\n")
 
-        print('Completed. Quitting...')
-        driver.quit()
\ No newline at end of file
+        if cache is not None:
+            cache.save()
+
+        flusher.stop()
+        print(metrics.summary())
+        print(f'Completed {len(processed_words)} words. Quitting...')
+        fetcher.close()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Builds a reverse index from inflected verb forms to their infinitives.
+
+`build` collects every verb of the scraped JSONL (entries whose grammar tags
+map to the rule "v", with the DLE conjugation model when the page gives one)
+or of built term banks (rule "v", model number in the term tags), conjugates
+each through its model with `conjugation.conjugate`, and writes one JSON
+index of form -> lemmas and cells; --tsv also writes it as flat rows for
+other tools. Verbs without a model are conjugated by their own model or
+like their verb family (detener like tener), see `conjugation.guess_model`;
+the others are skipped rather than conjugated as regular, so a full index
+needs the scraped JSONL, whose verbs name their model. `lookup`
+deinflects forms against a built index and `conjugate` prints the paradigm
+of one verb.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from conjugation import CELLS, conjugate, guess_model, irregular_participles
+from entries import base_infinitive, collect_verbs
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+FORMAT_VERSION = 1
+
+
+class DeinflectionIndex:
+    """
+    Inflected form -> {lemma: [cells]}, a plain dict, so `lookup` is a single
+    hash lookup. Saved as JSON with lemmas and cells numbered to keep the
+    file small.
+    """
+
+    def __init__(self, forms=None, models=None):
+        self.forms = forms if forms is not None else {}
+        self.models = models if models is not None else {}
+
+    def add_paradigm(self, lemma, model, paradigm):
+        self.models[lemma] = model
+        for cell, form in paradigm.items():
+            self.add_form(form, lemma, cell)
+
+    def add_form(self, form, lemma, cell):
+        cells = self.forms.setdefault(form, {}).setdefault(lemma, [])
+        if cell not in cells:
+            cells.append(cell)
+
+    def lookup(self, form):
+        """
+        The lemmas `form` can be an inflection of, each with the paradigm cells
+        it fills; an empty dict for unknown forms.
+        """
+        return self.forms.get(form.strip().lower(), {})
+
+    def __len__(self):
+        return len(self.forms)
+
+    def to_json(self):
+        lemmas = sorted(self.models)
+        lemma_ids = {lemma: number for number, lemma in enumerate(lemmas)}
+        cell_ids = {cell: number for number, cell in enumerate(CELLS)}
+        return {
+            'version': FORMAT_VERSION,
+            'cells': list(CELLS),
+            'lemmas': [[lemma, self.models[lemma]] for lemma in lemmas],
+            'forms': {
+                form: [[lemma_ids[lemma]] + [cell_ids[cell] for cell in cells] for lemma, cells in entries.items()]
+                for form, entries in sorted(self.forms.items())
+            },
+        }
+
+    @classmethod
+    def from_json(cls, state):
+        if state.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported deinflection index version {state.get('version')!r}")
+        cells = state['cells']
+        lemmas = [lemma for lemma, _ in state['lemmas']]
+        forms = {
+            form: {lemmas[row[0]]: [cells[cell] for cell in row[1:]] for row in rows}
+            for form, rows in state['forms'].items()
+        }
+        return cls(forms, {lemma: model for lemma, model in state['lemmas']})
+
+    def save(self, path):
+        tmp_path = f'{path}.tmp'
+        json_codec.dump(self.to_json(), tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_json(json_codec.load(path))
+
+    def write_tsv(self, path):
+        """
+        Writes one "form<TAB>lemma<TAB>cell,cell" row per form and lemma.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            for form, entries in sorted(self.forms.items()):
+                for lemma, cells in entries.items():
+                    f.write(f"{form}\t{lemma}\t{','.join(cells)}\n")
+
+
+def build_deinflection_index(verbs):
+    """
+    Conjugates every verb of `collect_verbs` into a DeinflectionIndex and
+    returns it with the verbs that could not be conjugated.
+    """
+    index = DeinflectionIndex()
+    skipped = []
+    for lemma, (model, participles) in sorted(verbs.items()):
+        infinitive = base_infinitive(lemma)
+        if infinitive is None:
+            skipped.append((lemma, 'not an infinitive'))
+            continue
+        if model is None:
+            model = guess_model(infinitive)
+        if model is None:
+            skipped.append((lemma, 'no conjugation model recorded, and its spelling does not tell it'))
+            continue
+        try:
+            paradigm = conjugate(infinitive, model)
+        except ValueError as e:
+            skipped.append((lemma, str(e)))
+            continue
+        index.add_paradigm(lemma, model, paradigm)
+        for participle in participles or irregular_participles(infinitive):
+            index.add_form(participle, lemma, 'participio')
+    return index, skipped
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build and query a Spanish verb deinflection index.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='conjugate every verb of a source into an index')
+    build_parser.add_argument('source', help='scraped JSONL file, term bank directory or dictionary zip')
+    build_parser.add_argument('--output', default='deinflection.json', help='index file to write')
+    build_parser.add_argument('--tsv', help='also write the index as form/lemma/cells rows to this file')
+
+    lookup_parser = subparsers.add_parser('lookup', help='deinflect forms')
+    lookup_parser.add_argument('forms', nargs='+', help='inflected forms')
+    lookup_parser.add_argument('--index', default='deinflection.json', help='index written by build')
+
+    conjugate_parser = subparsers.add_parser('conjugate', help='print the paradigm of a verb')
+    conjugate_parser.add_argument('verb', help='infinitive')
+    conjugate_parser.add_argument('--model', help='DLE model number or model verb (default: regular)')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        verbs = collect_verbs(args.source)
+        index, skipped = build_deinflection_index(verbs)
+        index.save(args.output)
+        if args.tsv:
+            index.write_tsv(args.tsv)
+        for lemma, reason in skipped:
+            logging.info(f"Skipped {lemma}: {reason}")
+        print(f'Indexed {len(index)} forms of {len(index.models)} verbs ({len(skipped)} skipped) '
+              f'into {args.output} in {time.perf_counter() - start:.1f}s')
+    elif args.command == 'lookup':
+        index = DeinflectionIndex.load(args.index)
+        for form in args.forms:
+            print(form, json_codec.dumps(index.lookup(form)).decode('utf-8'))
+    else:
+        for cell, form in conjugate(args.verb, args.model).items():
+            print(f'{cell}\t{form}')
@@ -0,0 +1,134 @@
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+_CENTRAL_HEADER = struct.Struct('<4s6H3L5H2L')
+_END_OF_CENTRAL_DIRECTORY = struct.Struct('<4s4H2LH')
+_UTF8_NAMES = 0x800
+_ZIP_LIMIT = 0xFFFFFFFF
+
+
+def _compress(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return zlib.crc32(data), compressor.compress(data) + compressor.flush()
+
+
+def _dos_datetime(timestamp):
+    t = time.localtime(timestamp)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+class DictionaryZip:
+    """
+    Writes a dictionary archive member by member. Members are deflated by a
+    thread pool (zlib releases the GIL, so this uses every core) and written
+    in the order they were added; at most `window` members are held in
+    memory at once. The archive is written to a temporary file and moved
+    into place on close, so a failed build never leaves a truncated zip.
+    """
+
+    def __init__(self, path, level=9, workers=None, window=None):
+        self.path = path
+        self.level = level
+        self.workers = workers or os.cpu_count() or 1
+        self.window = window or self.workers * 2
+        self.members = []
+        self._tmp_path = f'{path}.tmp'
+        self._file = open(self._tmp_path, 'wb')
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending = deque()
+        self._dos_time, self._dos_date = _dos_datetime(time.time())
+
+    def add(self, name, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._pending.append((name, len(data), self._pool.submit(_compress, data, self.level)))
+        while len(self._pending) > self.window:
+            self._write_member(*self._pending.popleft())
+
+    def _write_member(self, name, size, future):
+        crc, compressed = future.result()
+        encoded_name = name.encode('utf-8')
+        offset = self._file.tell()
+        if max(offset, size, len(compressed)) >= _ZIP_LIMIT:
+            raise ValueError(f"Member {name} does not fit in a zip without Zip64 extensions")
+        self._file.write(_LOCAL_HEADER.pack(
+            b'PK\x03\x04', 20, _UTF8_NAMES, zlib.DEFLATED, self._dos_time, self._dos_date,
+            crc, len(compressed), size, len(encoded_name), 0,
+        ))
+        self._file.write(encoded_name)
+        self._file.write(compressed)
+        self.members.append((encoded_name, crc, len(compressed), size, offset))
+
+    def close(self):
+        while self._pending:
+            self._write_member(*self._pending.popleft())
+        self._pool.shutdown()
+
+        directory_offset = self._file.tell()
+        for encoded_name, crc, compressed_size, size, offset in self.members:
+            self._file.write(_CENTRAL_HEADER.pack(
+                b'PK\x01\x02', 20, 20, _UTF8_NAMES, zlib.DEFLATED, self._dos_time, self._dos_date,
+                crc, compressed_size, size, len(encoded_name), 0, 0, 0, 0, 0, offset,
+            ))
+            self._file.write(encoded_name)
+        directory_size = self._file.tell() - directory_offset
+        self._file.write(_END_OF_CENTRAL_DIRECTORY.pack(
+            b'PK\x05\x06', 0, 0, len(self.members), len(self.members), directory_size, directory_offset, 0,
+        ))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        for _, _, future in self._pending:
+            future.cancel()
+        self._pool.shutdown()
+        self._file.close()
+        os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def stamp_index(index_path, revision=None, indent=4):
+    """
+    Returns the contents of index.json with `revision` set, by default to
+    today's date in the YYYY.MM.DD form the existing releases use, compact
+    when `indent` is None.
+    """
+    index = json_codec.load(index_path)
+    index['revision'] = revision or datetime.now().strftime('%Y.%m.%d')
+    return json_codec.dumps(index, indent)
+
+
+def add_static_files(archive, files_dir, revision=None, indent=4):
+    """
+    Adds index.json (with a fresh revision, indented by `indent`) and every
+    other file in `files_dir` except the term banks, which the converter
+    streams in.
+    """
+    archive.add('index.json', stamp_index(os.path.join(files_dir, 'index.json'), revision, indent))
+    for name in sorted(os.listdir(files_dir)):
+        path = os.path.join(files_dir, name)
+        if name == 'index.json' or name.startswith('term_bank_') or not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            archive.add(name, f.read())
@@ -0,0 +1,108 @@
+"""
+Reads the entries of DDE, from the scraped JSONL or from built term banks,
+that both the dictionary converter and the verb tools need: the definitions
+of an entry, the rule identifier of its grammar tags, and which headwords
+are verbs, with their conjugation model and irregular participles.
+
+ddc/ imports this module from the dde directory, so it must not import
+modules whose names ddc/ also uses, such as yomitan.
+"""
+
+import os
+import sys
+
+from conjugation import is_infinitive, resolve_model
+from lookup import iter_term_banks
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+grammar_rule_mapping = {
+    "adj.": "adj",
+    "aux.": "v",
+    "copul.": "v",
+    "intr.": "v",
+    "reg.": "v",
+    "tr.": "v",
+    "v.": "v",
+    "m.": "n",
+    "f.": "n",
+    "n.": "n"
+}
+
+
+def get_definitions(entry_data):
+    """
+    Extract definitions from entry data, handling both regular and solution entries.
+    """
+    if isinstance(entry_data, dict) and 'definitions' in entry_data:
+        return entry_data['definitions']
+    elif isinstance(entry_data, list):
+        return entry_data
+    return []
+
+
+def _is_verb_entry(entry):
+    for definition in get_definitions(entry['data']):
+        for tag in definition.get('grammar_tags', []):
+            if grammar_rule_mapping.get(tag['tag']) == 'v':
+                return True
+    return False
+
+
+def iter_scraped_verbs(db_path):
+    """
+    Yields (lemma, model, irregular participles) for the verb entries of a
+    scraped JSONL file.
+    """
+    for entry in json_codec.iter_jsonl(db_path):
+        data = entry['data']
+        details = data if isinstance(data, dict) else {}
+        if 'conjugation_model' not in details and not _is_verb_entry(entry):
+            continue
+        yield entry['word'], details.get('conjugation_model'), details.get('participios', [])
+
+
+def iter_term_bank_verbs(source):
+    """
+    Yields (lemma, model, irregular participles) for the term bank entries
+    with the rule "v" in a directory or dictionary zip.
+    """
+    for _, bank in iter_term_banks(source):
+        for term, _, _, rules, _, _, _, term_tags in bank:
+            if 'v' in rules.split():
+                yield term, term_tags or None, []
+
+
+def collect_verbs(source):
+    """
+    Maps each verb lemma in `source` (a JSONL file, a term bank directory or
+    a dictionary zip) to its model and irregular participles. A verb found
+    several times keeps the first model given for it.
+    """
+    verbs = {}
+    records = iter_scraped_verbs(source) if source.endswith('.jsonl') else iter_term_bank_verbs(source)
+    for lemma, model, participles in records:
+        lemma = lemma.strip()
+        model_number, known_participles = verbs.get(lemma, (None, []))
+        if model_number is None:
+            model_number = resolve_model(model)
+        for participle in participles:
+            for form in participle.replace(',', ' ').split():
+                if form != 'o' and form not in known_participles:
+                    known_participles.append(form)
+        verbs[lemma] = (model_number, known_participles)
+    return verbs
+
+
+def base_infinitive(lemma):
+    """
+    The infinitive to conjugate for a headword: the verb itself, or the verb
+    of a pronominal headword (arrepentirse -> arrepentir). None for anything
+    else, such as multiword phrases.
+    """
+    if is_infinitive(lemma):
+        return lemma
+    if lemma.endswith('se') and is_infinitive(lemma[:-2]):
+        return lemma[:-2]
+    return None
@@ -0,0 +1,271 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from metrics import metrics
+from rate_control import RETRY_STATUSES, RateController, backoff_delay, parse_retry_after
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Language': 'es-ES,es;q=0.9',
+}
+
+CHROME_ARGUMENTS = [
+    "--guest",
+    "--blink-settings=imagesEnabled=false",
+    '--disable-gpu',
+    '--disable-first-run-ui',
+    '--disable-popup-blocking',
+    '--disable-notifications',
+    '--disable-infobars',
+    '--disable-dev-shm-usage',
+    '--ignore-certificate-errors',
+    '--ignore-ssl-errors',
+    '--disable-extensions',
+    '--no-sandbox',
+    'window-size=800,700',
+]
+
+# Resources a dictionary page never needs for its markup, blocked through CDP.
+BLOCKED_RESOURCES = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.mp3', '*.mp4',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*twitter.com*',
+]
+
+
+class HttpFetcher:
+    """
+    Fetches pages over a single keep-alive aiohttp session with at most
+    `workers` requests in flight. The event loop runs on a background thread,
+    so `fetch` can be called from plain synchronous code and from several
+    threads at once.
+
+    With `adaptive` set, each host's request rate and concurrency are tuned
+    by a RateController from 429/5xx responses, empty pages and latency, and
+    failed requests are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, workers=8, timeout=30, headers=None, adaptive=True, max_attempts=5, **limiter_options):
+        self.workers = workers
+        self.timeout = timeout
+        self.headers = headers or DEFAULT_HEADERS
+        self.max_attempts = max_attempts if adaptive else 1
+        self.rate_controller = RateController(workers, **limiter_options) if adaptive else None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._session = self._run(self._open_session())
+
+    async def _open_session(self):
+        self._semaphore = asyncio.Semaphore(self.workers)
+        connector = aiohttp.TCPConnector(limit=self.workers, keepalive_timeout=60)
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _get(self, url):
+        """
+        Returns (status, markup, retry_after); status is None on connection errors.
+        """
+        async with self._semaphore:
+            try:
+                async with self._session.get(url) as response:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if response.status != 200:
+                        return response.status, '', retry_after
+                    return response.status, (await response.text()).strip(), retry_after
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(e, url)
+                return None, '', None
+
+    async def fetch_async(self, url):
+        if self.rate_controller is None:
+            status, markup, _ = await self._get(url)
+            if status is not None and status != 200:
+                print(f'Warning: HTTP {status} for {url}')
+            return markup
+
+        limiter = self.rate_controller.for_url(url)
+        for attempt in range(self.max_attempts):
+            async with limiter:
+                start = time.monotonic()
+                status, markup, retry_after = await self._get(url)
+                latency = time.monotonic() - start
+
+            if status == 200 and markup:
+                limiter.on_success(latency)
+                return markup
+            if status is not None and status != 200 and status not in RETRY_STATUSES:
+                print(f'Warning: HTTP {status} for {url}')
+                return ''
+
+            explicit = status in (None, 429)
+            limiter.on_throttle(explicit=explicit)
+            metrics.inc('http_throttled_total' if explicit else 'http_retries_total')
+            delay = backoff_delay(attempt, retry_after=retry_after)
+            if status is None:
+                reason = 'no response'
+            elif status == 200:
+                reason = 'empty page'
+            else:
+                reason = f'HTTP {status}'
+            print(f'Warning: {reason} for {url}, retrying in {delay:.1f}s')
+            await asyncio.sleep(delay)
+        return ''
+
+    def summary(self):
+        return self.rate_controller.summary() if self.rate_controller is not None else ''
+
+    async def _fetch_all(self, urls):
+        return await asyncio.gather(*(self.fetch_async(url) for url in urls))
+
+    def fetch(self, url):
+        return self._run(self.fetch_async(url))
+
+    def fetch_many(self, urls):
+        """
+        Fetches all `urls` concurrently and returns their markup in the same order.
+        """
+        return self._run(self._fetch_all(list(urls)))
+
+    def close(self):
+        self._run(self._session.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class DriverPool:
+    """
+    Fallback backend for pages that need a real browser: `size` headless
+    Chrome instances shared by the crawl worker threads. A driver is checked
+    before every page and replaced if it stopped responding, and recycled
+    after `recycle_after` pages to keep its memory use bounded. When a
+    replacement fails to start, the pool shrinks by one driver instead.
+    """
+
+    def __init__(self, size=4, recycle_after=200, arguments=CHROME_ARGUMENTS, blocked_resources=BLOCKED_RESOURCES):
+        self.size = size
+        self.recycle_after = recycle_after
+        self.arguments = arguments + ['--headless=new']
+        self.blocked_resources = blocked_resources
+        self.drivers_started = 0
+        self._pages_served = {}
+        self._lock = threading.Lock()
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._start_driver())
+
+    def _start_driver(self):
+        driver = make_chrome_driver(self.arguments, page_load_strategy='eager')
+        if self.blocked_resources:
+            try:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_resources})
+            except Exception:
+                driver.quit()
+                raise
+        with self._lock:
+            self._pages_served[id(driver)] = 0
+            self.drivers_started += 1
+        return driver
+
+    def _stop_driver(self, driver):
+        with self._lock:
+            self._pages_served.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f'Warning: could not quit driver: {e}')
+
+    def _replace(self, driver):
+        """
+        Quits `driver` and returns a fresh one, or None when none could be
+        started and the pool is one driver smaller.
+        """
+        self._stop_driver(driver)
+        try:
+            return self._start_driver()
+        except Exception as e:
+            with self._lock:
+                self.size -= 1
+            print(f'Warning: could not start a replacement driver, {self.size} left: {e}')
+            return None
+
+    @staticmethod
+    def is_healthy(driver):
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def fetch(self, url):
+        driver = self._idle.get()
+        if driver is None:
+            # Every driver is gone; pass the news on to the next waiting thread.
+            self._idle.put(None)
+            raise RuntimeError('No Chrome driver left in the pool')
+        try:
+            if not self.is_healthy(driver):
+                print('Warning: replacing unresponsive driver')
+                driver = self._replace(driver)
+                if driver is None:
+                    return ''
+            try:
+                driver.get(url)
+                markup = driver.page_source.strip()
+            except Exception as e:
+                print(e, url)
+                driver = self._replace(driver)
+                return ''
+            self._pages_served[id(driver)] += 1
+            if self._pages_served[id(driver)] >= self.recycle_after:
+                driver = self._replace(driver)
+            return markup
+        finally:
+            if driver is not None:
+                self._idle.put(driver)
+            elif self.size == 0:
+                self._idle.put(None)
+
+    def fetch_many(self, urls):
+        """
+        Fetches `urls` on all the drivers at once and returns their markup in
+        order.
+        """
+        with ThreadPoolExecutor(max_workers=max(self.size, 1)) as executor:
+            return list(executor.map(self.fetch, urls))
+
+    def close(self):
+        for _ in range(self.size):
+            self._stop_driver(self._idle.get())
+
+
+def make_chrome_driver(arguments=CHROME_ARGUMENTS, page_load_strategy='normal'):
+    from selenium import webdriver
+
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.page_load_strategy = page_load_strategy
+    for argument in arguments:
+        chrome_options.add_argument(argument)
+    return webdriver.Chrome(options=chrome_options)
+
+
+def make_fetcher(backend, workers=8, recycle_after=200, adaptive=True):
+    if backend == 'http':
+        return HttpFetcher(workers=workers, adaptive=adaptive)
+    elif backend == 'selenium':
+        return DriverPool(size=workers, recycle_after=recycle_after)
+    raise ValueError(f"Unknown fetch backend: {backend}")
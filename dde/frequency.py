@@ -0,0 +1,95 @@
+import hashlib
+import os
+import re
+import sys
+import zipfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+_META_BANK = re.compile(r'(?:^|/)term_meta_bank_(\d+)\.json$')
+
+
+def _bank_number(name):
+    return int(_META_BANK.search(name).group(1))
+
+
+def iter_meta_banks(source):
+    """
+    Yields the entries of each term meta bank in `source`, a directory such
+    as freq/corpes/files or a frequency dictionary zip, one bank at a time.
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in sorted((name for name in archive.namelist() if _META_BANK.search(name)), key=_bank_number):
+                yield json_codec.loads(archive.read(name))
+    else:
+        for name in sorted((name for name in os.listdir(source) if _META_BANK.search(name)), key=_bank_number):
+            yield json_codec.load(os.path.join(source, name))
+
+
+def frequency_fingerprint(source):
+    """
+    Identifies a frequency source by the names, sizes and modification times
+    of its banks, so a build manifest can tell when the ranks may have
+    changed.
+    """
+    if source is None:
+        return None
+    if zipfile.is_zipfile(source):
+        stat = os.stat(source)
+        files = [(os.path.basename(source), stat.st_size, stat.st_mtime_ns)]
+    else:
+        files = [(name, os.path.getsize(os.path.join(source, name)), os.stat(os.path.join(source, name)).st_mtime_ns)
+                 for name in sorted(os.listdir(source)) if _META_BANK.search(name)]
+    return hashlib.sha1(repr(files).encode('utf-8')).hexdigest()
+
+
+class FrequencyIndex:
+    """
+    Term -> frequency rank, 1 being the most frequent. Built on the terms of
+    the dictionary being converted rather than on the frequency list, so it
+    stays as small as the dictionary however long the list is.
+    """
+
+    def __init__(self, ranks=None, max_rank=0):
+        self.ranks = ranks if ranks is not None else {}
+        self.max_rank = max_rank
+
+    @classmethod
+    def load(cls, source, terms=None):
+        """
+        Streams the rank-based frequency banks in `source` and keeps the best
+        rank of each of `terms` (all terms when None), also matching a term
+        by its lowercase form.
+        """
+        wanted = None if terms is None else set(terms) | {term.lower() for term in terms}
+        ranks = {}
+        max_rank = 0
+        for bank in iter_meta_banks(source):
+            for term, mode, data in bank:
+                if mode != 'freq':
+                    continue
+                rank = int(data['value'] if isinstance(data, dict) else data)
+                max_rank = max(max_rank, rank)
+                if (wanted is None or term in wanted) and rank < ranks.get(term, rank + 1):
+                    ranks[term] = rank
+        return cls(ranks, max_rank)
+
+    def rank(self, term):
+        rank = self.ranks.get(term)
+        return rank if rank is not None else self.ranks.get(term.lower())
+
+    def score(self, term):
+        """
+        The term bank score for `term`: higher for more frequent terms, from
+        `max_rank` for the most frequent down to 1, and 0 when unranked.
+        """
+        rank = self.rank(term)
+        return self.max_rank + 1 - rank if rank is not None else 0
+
+    def scores(self, terms):
+        """
+        {term: score} for the ranked ones of `terms`.
+        """
+        return {term: score for term in terms if (score := self.score(term))}
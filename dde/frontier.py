@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+
+SEED_LETTERS = list("abcdefghijklmnñopqrstuvwxyz")
+
+
+class Frontier:
+    """
+    Thread-safe FIFO of headwords still to crawl, deduplicated by URL.
+
+    `get` blocks while the queue is empty but other workers are still busy,
+    since their pages may add new words; it returns None once the queue is
+    empty and nothing is in progress, or after `stop`.
+    """
+
+    def __init__(self, base_url, seen_words=()):
+        self.base_url = base_url
+        self._queue = deque()
+        self._seen = {self.url_for(word) for word in seen_words}
+        self._in_progress = set()
+        self._stopped = False
+        self._condition = threading.Condition()
+
+    def url_for(self, word):
+        return f'{self.base_url}{word}'
+
+    def add(self, word):
+        word = word.replace('*', '').strip()
+        if not word:
+            return False
+        url = self.url_for(word)
+        with self._condition:
+            if url in self._seen:
+                return False
+            self._seen.add(url)
+            self._queue.append(word)
+            self._condition.notify()
+        return True
+
+    def extend(self, words):
+        return sum(1 for word in words if self.add(word))
+
+    def get(self):
+        with self._condition:
+            while not self._queue and self._in_progress and not self._stopped:
+                self._condition.wait()
+            if self._stopped or not self._queue:
+                self._condition.notify_all()
+                return None
+            word = self._queue.popleft()
+            self._in_progress.add(word)
+            return word
+
+    def done(self, word):
+        with self._condition:
+            self._in_progress.discard(word)
+            self._condition.notify_all()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def pending(self):
+        """
+        Words queued or in progress, in the order a resumed crawl should take them.
+        """
+        with self._condition:
+            return sorted(self._in_progress) + list(self._queue)
+
+    def __len__(self):
+        with self._condition:
+            return len(self._queue)
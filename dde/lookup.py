@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Looks up terms in built term banks without importing them into Yomitan.
+
+`build` streams the term_bank_*.json files of a directory or release zip,
+one bank at a time, into an SQLite index: one row per term bank entry with
+its term, reading, definition tags, rules, score, sequence and term tags,
+and a reference to its glossary, kept as compact JSON in a separate table
+so the term index stays small. `query` answers
+exact or prefix lookups from the index and returns each entry exactly as the
+converter wrote it.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+import zipfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+SCHEMA = """
+CREATE TABLE glossaries (id INTEGER PRIMARY KEY, content TEXT NOT NULL);
+CREATE TABLE terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL,
+    reading TEXT NOT NULL,
+    definition_tags TEXT NOT NULL,
+    rules TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    sequence INTEGER NOT NULL,
+    term_tags TEXT NOT NULL,
+    glossary_id INTEGER NOT NULL REFERENCES glossaries (id)
+);
+"""
+
+INDEXES = """
+CREATE INDEX terms_by_term ON terms (term);
+"""
+
+_BANK_NAME = re.compile(r'(?:^|/)term_bank_(\d+)\.json$')
+
+
+def _bank_number(name):
+    return int(_BANK_NAME.search(name).group(1))
+
+
+def iter_term_banks(source):
+    """
+    Yields the entries of each term bank in `source`, a directory or a
+    dictionary zip, in bank order. Only one bank is decoded at a time.
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = sorted((name for name in archive.namelist() if _BANK_NAME.search(name)), key=_bank_number)
+            for name in names:
+                yield name, json_codec.loads(archive.read(name))
+    else:
+        names = sorted((name for name in os.listdir(source) if _BANK_NAME.search(name)), key=_bank_number)
+        for name in names:
+            yield name, json_codec.load(os.path.join(source, name))
+
+
+def build_index(source, db_path):
+    """
+    Builds the SQLite index at `db_path` from the term banks in `source`.
+    The index is written to a temporary file and moved into place, so
+    readers never see a half-built index.
+    """
+    tmp_path = f'{db_path}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    connection.execute('PRAGMA journal_mode = OFF')
+    connection.execute('PRAGMA synchronous = OFF')
+    connection.executescript(SCHEMA)
+
+    entries = 0
+    glossary_id = 0
+    with connection:
+        for name, bank in iter_term_banks(source):
+            glossaries = []
+            terms = []
+            for term, reading, definition_tags, rules, score, glossary, sequence, term_tags in bank:
+                glossary_id += 1
+                glossaries.append((glossary_id, json_codec.dumps(glossary).decode('utf-8')))
+                terms.append((term, reading, definition_tags, rules, score, sequence, term_tags, glossary_id))
+            connection.executemany('INSERT INTO glossaries (id, content) VALUES (?, ?)', glossaries)
+            connection.executemany(
+                'INSERT INTO terms (term, reading, definition_tags, rules, score, sequence, term_tags, glossary_id) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', terms)
+            entries += len(terms)
+        connection.executescript(INDEXES)
+    connection.execute('ANALYZE')
+    connection.close()
+    os.replace(tmp_path, db_path)
+    return entries
+
+
+class TermIndex:
+    """
+    Read-only lookups against an index written by `build_index`. Results are
+    term bank entries: [term, reading, definition tags, rules, score,
+    glossary, sequence, term tags].
+    """
+
+    _SELECT = ('SELECT terms.term, reading, definition_tags, rules, score, content, sequence, term_tags '
+               'FROM terms JOIN glossaries ON glossaries.id = terms.glossary_id ')
+
+    def __init__(self, db_path):
+        self.connection = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, check_same_thread=False)
+
+    def _rows(self, query, parameters):
+        return [
+            [term, reading, definition_tags, rules, score, json_codec.loads(content), sequence, term_tags]
+            for term, reading, definition_tags, rules, score, content, sequence, term_tags
+            in self.connection.execute(query, parameters)
+        ]
+
+    def lookup(self, term):
+        """
+        Entries whose term is exactly `term`, in bank order.
+        """
+        return self._rows(self._SELECT + 'WHERE terms.term = ? ORDER BY terms.id', (term,))
+
+    def prefix(self, prefix, limit=20):
+        """
+        Up to `limit` entries whose term starts with `prefix`, sorted by term.
+        """
+        return self._rows(self._SELECT + 'WHERE terms.term >= ? AND terms.term < ? ORDER BY terms.term, terms.id LIMIT ?',
+                          (prefix, prefix + '\U0010ffff', limit))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build and query an SQLite index of Yomitan term banks.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='index the term banks of a directory or dictionary zip')
+    build_parser.add_argument('source', help='directory with term_bank_*.json files, or a dictionary zip')
+    build_parser.add_argument('index', nargs='?', default='terms.sqlite', help='SQLite file to write')
+
+    query_parser = subparsers.add_parser('query', help='look up terms')
+    query_parser.add_argument('terms', nargs='+', help='terms to look up')
+    query_parser.add_argument('--index', default='terms.sqlite', help='SQLite file written by build')
+    query_parser.add_argument('--prefix', action='store_true', help='match terms starting with each query')
+    query_parser.add_argument('--limit', type=int, default=20, help='maximum results per prefix query')
+    query_parser.add_argument('--compact', action='store_true', help='print results without indentation')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        entries = build_index(args.source, args.index)
+        print(f'Indexed {entries} entries from {args.source} into {args.index} in {time.perf_counter() - start:.1f}s')
+    else:
+        with TermIndex(args.index) as index:
+            for term in args.terms:
+                start = time.perf_counter()
+                results = index.prefix(term, args.limit) if args.prefix else index.lookup(term)
+                elapsed = time.perf_counter() - start
+                print(json_codec.dumps(results, None if args.compact else 2).decode('utf-8'))
+                print(f'{len(results)} results for {term!r} in {elapsed * 1000:.2f} ms', file=sys.stderr)
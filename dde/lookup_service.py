@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Local HTTP lookup service over built dictionaries, for tools that need to
+query entries at high request rates.
+
+Each dictionary is a compiled file from binary_dict.py, or a term bank
+directory or dictionary zip, which is compiled into a temporary directory
+at startup. Endpoints:
+
+    GET  /lookup?term=...&dictionary=dde&format=json|html
+    GET  /prefix?term=...&dictionary=dde&limit=20&format=json|html
+    POST /batch   {"terms": [...], "dictionary": "dde", "format": "json"}
+    GET  /stats   request latency p50/p99 and cache counters, as JSON
+    GET  /metrics the same in Prometheus text format
+
+Responses for a term are rendered once, as the JSON fragment of its entries
+(format=json) or of its entries with their structured content turned into
+HTML (format=html), and kept in an LRU cache, so repeated terms are answered
+by joining cached fragments. Lookups themselves are binary searches over a
+memory-mapped file and run on the event loop.
+"""
+
+import argparse
+import asyncio
+import html
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from aiohttp import web
+
+from binary_dict import BinaryDictionary, compile_dictionary
+from metrics import Metrics
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+REQUEST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+FORMATS = ('json', 'html')
+VOID_TAGS = {'br', 'img'}
+
+
+class LRUCache:
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _style(style):
+    return ';'.join(f"{''.join('-' + c.lower() if c.isupper() else c for c in key)}:{value}"
+                    for key, value in style.items())
+
+
+def render_html(content):
+    """
+    Renders Yomitan structured content as HTML.
+    """
+    if content is None:
+        return ''
+    if isinstance(content, str):
+        return html.escape(content, quote=False)
+    if isinstance(content, list):
+        return ''.join(render_html(item) for item in content)
+    if content.get('type') == 'structured-content':
+        return render_html(content.get('content'))
+    if content.get('type') == 'text':
+        return html.escape(content.get('text', ''), quote=False)
+    tag = content.get('tag', 'span')
+    attributes = ''
+    for key, value in content.get('data', {}).items():
+        attributes += f' data-sc-{key}="{html.escape(str(value))}"'
+    if content.get('style'):
+        attributes += f' style="{html.escape(_style(content["style"]))}"'
+    for key in ('href', 'title', 'lang'):
+        if key in content:
+            attributes += f' {key}="{html.escape(str(content[key]))}"'
+    if tag in VOID_TAGS:
+        return f'<{tag}{attributes}>'
+    return f'<{tag}{attributes}>{render_html(content.get("content"))}</{tag}>'
+
+
+def open_dictionary(path, compiled_dir):
+    """
+    Opens a compiled dictionary, compiling term banks into `compiled_dir`
+    first when `path` is a directory or zip.
+    """
+    if os.path.isdir(path) or path.endswith('.zip'):
+        compiled = os.path.join(compiled_dir, f'{os.path.basename(os.path.normpath(path))}.ytbd')
+        compile_dictionary(path, compiled)
+        path = compiled
+    return BinaryDictionary(path)
+
+
+class LookupService:
+    """
+    Renders and caches lookup responses for one or more dictionaries.
+    """
+
+    def __init__(self, dictionaries, cache_size=10000):
+        self.dictionaries = dictionaries
+        self.default = next(iter(dictionaries))
+        self.cache = LRUCache(cache_size)
+        self.metrics = Metrics(prefix='lookup_')
+        self.metrics.gauge('cache_entries', lambda: len(self.cache))
+        self.metrics.gauge('cache_hit_ratio',
+                           lambda: self.cache.hits / (self.cache.hits + self.cache.misses or 1))
+
+    def _dictionary(self, name):
+        name = name or self.default
+        if name not in self.dictionaries:
+            raise web.HTTPNotFound(text=f'Unknown dictionary {name!r}')
+        return name, self.dictionaries[name]
+
+    @staticmethod
+    def _render(entries, fmt):
+        if fmt == 'html':
+            entries = [
+                {'term': term, 'reading': reading, 'definition_tags': definition_tags, 'rules': rules,
+                 'term_tags': term_tags, 'html': render_html(glossary)}
+                for term, reading, definition_tags, rules, _, glossary, _, term_tags in entries
+            ]
+        return json_codec.dumps(entries)
+
+    def render(self, name, term, fmt='json'):
+        """
+        The JSON fragment listing the entries for `term`, from the cache when
+        it has been rendered before.
+        """
+        name, dictionary = self._dictionary(name)
+        key = (name, fmt, term)
+        fragment = self.cache.get(key)
+        if fragment is None:
+            if fmt == 'json':
+                fragment = b'[' + b','.join(dictionary.lookup_raw(term)) + b']'
+            else:
+                fragment = self._render(dictionary.lookup(term), fmt)
+            self.cache.put(key, fragment)
+        return fragment
+
+    def render_batch(self, name, terms, fmt='json'):
+        parts = [json_codec.dumps(term) + b':' + self.render(name, term, fmt) for term in dict.fromkeys(terms)]
+        return b'{"results":{' + b','.join(parts) + b'}}'
+
+    def render_prefix(self, name, prefix, limit, fmt='json'):
+        _, dictionary = self._dictionary(name)
+        return self._render(dictionary.prefix(prefix, limit), fmt)
+
+    @web.middleware
+    async def timing(self, request, handler):
+        start = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            resource = request.match_info.route.resource
+            endpoint = resource.canonical.strip('/') if resource is not None else 'unmatched'
+            self.metrics.observe('request_seconds', elapsed, REQUEST_BUCKETS)
+            self.metrics.observe(f'{endpoint}_request_seconds', elapsed, REQUEST_BUCKETS)
+            self.metrics.inc(f'{endpoint}_requests_total')
+
+    @staticmethod
+    def _format(value):
+        fmt = value or 'json'
+        if fmt not in FORMATS:
+            raise web.HTTPBadRequest(text=f'Unknown format {fmt!r}')
+        return fmt
+
+    async def handle_lookup(self, request):
+        term = request.query.get('term')
+        if term is None:
+            raise web.HTTPBadRequest(text='Missing term')
+        body = self.render(request.query.get('dictionary'), term, self._format(request.query.get('format')))
+        return web.Response(body=body, content_type='application/json')
+
+    async def handle_prefix(self, request):
+        term = request.query.get('term')
+        if term is None:
+            raise web.HTTPBadRequest(text='Missing term')
+        try:
+            limit = int(request.query.get('limit', 20))
+        except ValueError:
+            raise web.HTTPBadRequest(text='Invalid limit')
+        body = self.render_prefix(request.query.get('dictionary'), term, limit,
+                                  self._format(request.query.get('format')))
+        return web.Response(body=body, content_type='application/json')
+
+    async def handle_batch(self, request):
+        try:
+            payload = json_codec.loads(await request.read())
+            terms = payload['terms']
+        except (ValueError, KeyError, TypeError):
+            raise web.HTTPBadRequest(text='Expected {"terms": [...]}')
+        if not isinstance(terms, list) or not all(isinstance(term, str) for term in terms):
+            raise web.HTTPBadRequest(text='terms must be a list of strings')
+        self.metrics.inc('batch_terms_total', len(terms))
+        body = self.render_batch(payload.get('dictionary'), terms, self._format(payload.get('format')))
+        return web.Response(body=body, content_type='application/json')
+
+    def stats(self):
+        data = json_codec.loads(self.metrics.to_json())
+        data['cache'] = {'entries': len(self.cache), 'max_size': self.cache.max_size,
+                         'hits': self.cache.hits, 'misses': self.cache.misses}
+        data['dictionaries'] = {name: len(dictionary) for name, dictionary in self.dictionaries.items()}
+        return data
+
+    async def handle_stats(self, request):
+        return web.Response(body=json_codec.dumps(self.stats()), content_type='application/json')
+
+    async def handle_metrics(self, request):
+        return web.Response(text=self.metrics.to_prometheus(), content_type='text/plain')
+
+    def application(self):
+        app = web.Application(middlewares=[self.timing])
+        app.router.add_get('/lookup', self.handle_lookup)
+        app.router.add_get('/prefix', self.handle_prefix)
+        app.router.add_post('/batch', self.handle_batch)
+        app.router.add_get('/stats', self.handle_stats)
+        app.router.add_get('/metrics', self.handle_metrics)
+        return app
+
+
+class LookupServer:
+    """
+    Runs a LookupService on 127.0.0.1 in a background thread; `port=0` picks
+    a free port.
+    """
+
+    def __init__(self, service, port=0):
+        self.service = service
+        self.port = port
+        self._started = threading.Event()
+
+    async def _serve(self):
+        self._runner = web.AppRunner(self.service.application(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._started.set()
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.port}'
+
+    def __enter__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._serve(), self._loop)
+        self._started.wait()
+        return self
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def parse_dictionaries(values):
+    """
+    Parses NAME=PATH arguments; a bare PATH is named after its file.
+    """
+    dictionaries = {}
+    for value in values:
+        name, _, path = value.rpartition('=')
+        if not name:
+            name = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+        dictionaries[name] = path
+    return dictionaries
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve dictionary lookups over HTTP on localhost.')
+    parser.add_argument('dictionaries', nargs='*', default=['dde=files'],
+                        help='NAME=PATH of a compiled dictionary, term bank directory or dictionary zip '
+                             '(default: dde=files); the first one is the default dictionary')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--cache-size', type=int, default=10000, help='rendered responses kept in the LRU cache')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as compiled_dir:
+        start = time.perf_counter()
+        dictionaries = {name: open_dictionary(path, compiled_dir)
+                        for name, path in parse_dictionaries(args.dictionaries).items()}
+        service = LookupService(dictionaries, args.cache_size)
+        with LookupServer(service, args.port) as server:
+            print(f'Serving {", ".join(f"{name} ({len(d)} entries)" for name, d in dictionaries.items())} '
+                  f'at {server.base_url} (ready in {time.perf_counter() - start:.1f}s, Ctrl-C to stop)', flush=True)
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+            print(service.metrics.summary())
+        for dictionary in dictionaries.values():
+            dictionary.close()
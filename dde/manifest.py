@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+
+def record_digest(entry):
+    """
+    Hashes a scraped JSONL record without its timestamp, so re-scraping an
+    unchanged page gives the same digest. Always serialized with the standard
+    library, so digests do not depend on the JSON backend.
+    """
+    content = {key: value for key, value in entry.items() if key != 'timestamp'}
+    return hashlib.sha1(json.dumps(content, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def combine_digests(previous, digest):
+    return digest if previous is None else hashlib.sha1(f'{previous}{digest}'.encode('ascii')).hexdigest()
+
+
+class BuildManifest:
+    """
+    What the last conversion produced: a digest of the records scraped from
+    each URL, and for every term bank the URLs whose rows it holds, in order,
+    with their row counts. That is enough to rewrite only the banks holding
+    rows of records that changed.
+    """
+
+    def __init__(self, records=None, banks=None, options=None):
+        self.records = records if records is not None else {}
+        self.banks = banks if banks is not None else []
+        self.options = options if options is not None else {}
+
+    def add_record(self, url, digest):
+        self.records[url] = combine_digests(self.records.get(url), digest)
+
+    def recorded(self, records):
+        """
+        Passes converted (url, digest, ...) records through, adding each to
+        the manifest in the order they are converted.
+        """
+        for record in records:
+            self.add_record(record[0], record[1])
+            yield record
+
+    def bank_of(self):
+        """
+        {url: names of the banks holding its rows}, in bank order; a record's
+        rows may be split across consecutive banks.
+        """
+        banks = {}
+        for name, rows in self.banks:
+            for url, _ in rows:
+                names = banks.setdefault(url, [])
+                if not names or names[-1] != name:
+                    names.append(name)
+        return banks
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return None
+        state = json_codec.load(path)
+        return cls(state['records'], state['banks'], state['options'])
+
+    def save(self, path):
+        state = {'options': self.options, 'records': self.records, 'banks': self.banks}
+        tmp_path = f'{path}.tmp'
+        json_codec.dump(state, tmp_path)
+        os.replace(tmp_path, path)
@@ -0,0 +1,211 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, counts, total, count):
+        for i, bucket_count in enumerate(counts):
+            self.counts[i] += bucket_count
+        self.sum += total
+        self.count += count
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the q-th quantile.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class Metrics:
+    """
+    Counters, latency histograms and gauges for a crawl, exportable in
+    Prometheus text format or as JSON. Gauges are callables sampled at export
+    time, e.g. queue depths.
+
+    Metrics recorded in a worker process can be moved to the parent with
+    `take` there and `merge` here.
+    """
+
+    def __init__(self, prefix='dde_'):
+        self.prefix = prefix
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(buckets)
+            self.histograms[name].observe(value)
+
+    @contextmanager
+    def timer(self, name, buckets=LATENCY_BUCKETS):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, buckets)
+
+    def gauge(self, name, callback):
+        self.gauges[name] = callback
+
+    def take(self, names):
+        """
+        Removes and returns the given counters and histograms as plain data.
+        """
+        with self._lock:
+            return {
+                'counters': {name: self.counters.pop(name) for name in names if name in self.counters},
+                'histograms': {
+                    name: (histogram.counts, histogram.sum, histogram.count)
+                    for name, histogram in ((name, self.histograms.pop(name, None)) for name in names)
+                    if histogram is not None
+                },
+            }
+
+    def merge(self, taken):
+        with self._lock:
+            for name, value in taken['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, (counts, total, count) in taken['histograms'].items():
+                if name not in self.histograms:
+                    self.histograms[name] = Histogram()
+                self.histograms[name].merge(counts, total, count)
+
+    def uptime(self):
+        return time.time() - self.started_at
+
+    def _sample_gauges(self):
+        values = {}
+        for name, callback in self.gauges.items():
+            try:
+                values[name] = callback()
+            except Exception:
+                continue
+        values['uptime_seconds'] = self.uptime()
+        return values
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'# TYPE {self.prefix}{name} counter')
+                lines.append(f'{self.prefix}{name} {value}')
+            for name, histogram in sorted(self.histograms.items()):
+                lines.append(f'# TYPE {self.prefix}{name} histogram')
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{self.prefix}{name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{self.prefix}{name}_sum {histogram.sum}')
+                lines.append(f'{self.prefix}{name}_count {histogram.count}')
+        for name, value in sorted(self._sample_gauges().items()):
+            lines.append(f'# TYPE {self.prefix}{name} gauge')
+            lines.append(f'{self.prefix}{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self):
+        with self._lock:
+            data = {
+                'counters': dict(self.counters),
+                'histograms': {
+                    name: {
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'p50': histogram.quantile(0.5),
+                        'p99': histogram.quantile(0.99),
+                        'buckets': dict(zip([str(b) for b in histogram.buckets] + ['+Inf'], histogram.counts)),
+                    }
+                    for name, histogram in self.histograms.items()
+                },
+            }
+        data['gauges'] = self._sample_gauges()
+        return json_codec.dumps(data, 2).decode('utf-8')
+
+    def write(self, path):
+        """
+        Atomically writes the metrics to `path`: JSON if it ends in .json,
+        Prometheus text format otherwise.
+        """
+        content = self.to_json() if path.endswith('.json') else self.to_prometheus()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        uptime = self.uptime()
+        lines = [f'Run time: {uptime:.1f}s']
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'  {name}: {value}' + (f' ({value / uptime:.1f}/sec)' if uptime else ''))
+            for name, histogram in sorted(self.histograms.items()):
+                mean = histogram.sum / histogram.count if histogram.count else 0.0
+                lines.append(f'  {name}: n={histogram.count} mean={mean * 1000:.1f}ms '
+                             f'p50<={histogram.quantile(0.5) * 1000:.0f}ms p99<={histogram.quantile(0.99) * 1000:.0f}ms '
+                             f'total={histogram.sum:.1f}s')
+        return '\n'.join(lines)
+
+
+class MetricsFlusher:
+    """
+    Writes `metrics` to `path` every `interval` seconds from a background
+    thread, and once more when stopped.
+    """
+
+    def __init__(self, metrics, path, interval=10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.metrics.write(self.path)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.metrics.write(self.path)
+
+
+metrics = Metrics()
@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+
+class PageCache:
+    """
+    Persistent store of fetched pages. Markup is gzip-compressed and stored
+    once per content hash under `objects/`; `index.json` maps every URL to
+    the hash of its latest markup, when it was fetched and the cache revision
+    it was fetched under.
+
+    An entry is considered stale (and `get` returns None) when it is older
+    than `ttl` seconds or when it was stored under a different `revision`,
+    so bumping the revision label invalidates the whole cache at once.
+    """
+
+    def __init__(self, directory, ttl=None, revision=None, save_every=500):
+        self.directory = directory
+        self.ttl = ttl
+        self.revision = revision
+        self.save_every = save_every
+        self.index_path = os.path.join(directory, 'index.json')
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        if os.path.exists(self.index_path):
+            self.index = json_codec.load(self.index_path)
+        else:
+            self.index = {}
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.directory, 'objects', content_hash[:2], f'{content_hash}.html.gz')
+
+    def is_fresh(self, record):
+        if self.revision is not None and record.get('revision') != self.revision:
+            return False
+        if self.ttl is not None and time.time() - record['fetched_at'] > self.ttl:
+            return False
+        return True
+
+    def get(self, url):
+        """
+        Returns the cached markup for `url`, or None if it is missing or stale.
+        """
+        record = self.index.get(url)
+        if record is None or not self.is_fresh(record):
+            return None
+        return self.read_object(record['hash'])
+
+    def read_object(self, content_hash):
+        try:
+            with gzip.open(self._object_path(content_hash), 'rt', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url, markup):
+        data = markup.encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._object_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self.index[url] = {
+                'hash': content_hash,
+                'fetched_at': time.time(),
+                'revision': self.revision,
+            }
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save_locked()
+        return content_hash
+
+    def invalidate(self, url=None):
+        """
+        Drops `url` from the index, or every entry when no URL is given.
+        Objects stay on disk and are reused if the same markup comes back.
+        """
+        with self._lock:
+            if url is None:
+                self.index.clear()
+            else:
+                self.index.pop(url, None)
+            self._save_locked()
+
+    def items(self):
+        """
+        Yields (url, markup) for every fresh entry, sorted by URL.
+        """
+        for url in sorted(self.index):
+            record = self.index[url]
+            if self.is_fresh(record):
+                markup = self.read_object(record['hash'])
+                if markup is not None:
+                    yield url, markup
+
+    def _save_locked(self):
+        tmp_path = f'{self.index_path}.tmp'
+        json_codec.dump(self.index, tmp_path)
+        os.replace(tmp_path, self.index_path)
+        self._unsaved = 0
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def __contains__(self, url):
+        record = self.index.get(url)
+        return record is not None and self.is_fresh(record)
+
+    def __len__(self):
+        return len(self.index)
@@ -0,0 +1,177 @@
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from dde_scrape import extract_page, fetch_markup
+from metrics import metrics
+
+_DONE = object()
+
+
+def _ignore_sigint():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class CrawlPipeline:
+    """
+    Runs the crawl as three stages connected by bounded queues:
+
+    - fetch: `fetch_workers` threads take words from the frontier and fetch
+      their markup (I/O bound, so threads share the fetcher's concurrency);
+    - parse: lxml parsing and extraction run in a process pool, so CPU-bound
+      work never holds up the fetchers;
+    - store: a single writer appends each page's entries to the JSONL,
+      merges the tag registries and feeds new words back to the frontier.
+
+    When the parse pool falls behind, the fetch queue fills and the fetchers
+    block instead of piling up markup in memory.
+    """
+
+    def __init__(self, frontier, fetcher, output_file, grammar_tags, usage_tags, geo_tags, not_found_words,
+                 processed_words, cache=None, fetch_workers=8, parse_workers=None, queue_size=64,
+                 on_word_done=None, max_retries=3, report_every=30):
+        self.frontier = frontier
+        self.fetcher = fetcher
+        self.output_file = output_file
+        self.grammar_tags = grammar_tags
+        self.usage_tags = usage_tags
+        self.geo_tags = geo_tags
+        self.not_found_words = not_found_words
+        self.processed_words = processed_words
+        self.cache = cache
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.on_word_done = on_word_done
+        self.max_retries = max_retries
+        self.report_every = report_every
+
+        self.output_lock = threading.Lock()
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.store_queue = queue.Queue()
+        self._parse_slots = threading.BoundedSemaphore(queue_size)
+        self._finished = threading.Event()
+
+        metrics.gauge('frontier_queued', lambda: len(self.frontier))
+        metrics.gauge('parse_queue_depth', self.parse_queue.qsize)
+        metrics.gauge('store_queue_depth', self.store_queue.qsize)
+        metrics.gauge('pages_per_second', lambda: metrics.counters.get('pages_stored_total', 0) / metrics.uptime())
+
+    def _fetch_stage(self):
+        while True:
+            word = self.frontier.get()
+            if word is None:
+                return
+            url = self.frontier.url_for(word)
+            try:
+                markup = fetch_markup(self.fetcher, url, word, self.not_found_words, self.max_retries, self.cache)
+            except Exception as e:
+                print(f"Unexpected error fetching {word}: {e}")
+                metrics.inc('fetch_errors_total')
+                markup = None
+            self.parse_queue.put((word, url, markup))
+
+    def _parse_stage(self):
+        while True:
+            item = self.parse_queue.get()
+            if item is _DONE:
+                return
+            word, url, markup = item
+            if markup is None:
+                self.store_queue.put((word, url, None))
+                continue
+            self._parse_slots.acquire()
+            future = self.pool.submit(extract_page, markup, url, word)
+            future.add_done_callback(lambda f, word=word, url=url: self._parsed(word, url, f))
+
+    def _parsed(self, word, url, future):
+        self._parse_slots.release()
+        self.store_queue.put((word, url, future))
+
+    def _store_stage(self):
+        while True:
+            item = self.store_queue.get()
+            if item is _DONE:
+                return
+            word, url, future = item
+            try:
+                if future is not None:
+                    with metrics.timer('store_seconds'):
+                        self._store_result(word, url, future.result())
+            except Exception as e:
+                print(f"Unexpected error processing {word}: {e}")
+                metrics.inc('extract_errors_total')
+                self.not_found_words.append(url)
+            finally:
+                self.frontier.done(word)
+
+    def _store_result(self, word, url, result):
+        metrics.merge(result['metrics'])
+        metrics.inc('pages_stored_total')
+        for key in result['grammar_tags']:
+            self.grammar_tags[key] = True
+        for key in result['usage_tags']:
+            self.usage_tags[key] = True
+        for key in result['geo_tags']:
+            self.geo_tags[key] = True
+        self.not_found_words.extend(result['not_found_words'])
+        self.frontier.extend(result['links'])
+
+        with self.output_lock:
+            self.output_file.write(result['entries'])
+            self.processed_words.add(word)
+            if self.on_word_done is not None:
+                self.on_word_done()
+
+    def _report_stage(self):
+        while not self._finished.wait(self.report_every):
+            print(self.report())
+
+    def report(self):
+        pages = metrics.counters.get('pages_stored_total', 0)
+        stages = []
+        for stage in ('fetch', 'parse', 'extract', 'store'):
+            histogram = metrics.histograms.get(f'{stage}_seconds')
+            if histogram is not None:
+                stages.append(f'{stage} {histogram.count} ({histogram.sum:.1f}s busy)')
+        return (f'{pages} pages, {pages / metrics.uptime():.1f} pages/sec | ' + ', '.join(stages) +
+                f' | queued: frontier {len(self.frontier)}, parse {self.parse_queue.qsize()}, store {self.store_queue.qsize()}')
+
+    def run(self):
+        """
+        Crawls until the frontier is exhausted or `stop` is called, then drains
+        every stage so that nothing fetched is lost.
+        """
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_ignore_sigint,
+        )
+        fetchers = [threading.Thread(target=self._fetch_stage, daemon=True) for _ in range(self.fetch_workers)]
+        parser = threading.Thread(target=self._parse_stage, daemon=True)
+        writer = threading.Thread(target=self._store_stage, daemon=True)
+        reporter = threading.Thread(target=self._report_stage, daemon=True)
+        for thread in fetchers + [parser, writer, reporter]:
+            thread.start()
+
+        try:
+            for thread in fetchers:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            print("Interrupted, finishing the pages in progress...")
+            self.stop()
+            for thread in fetchers:
+                thread.join()
+
+        self.parse_queue.put(_DONE)
+        parser.join()
+        self.pool.shutdown(wait=True)
+        self.store_queue.put(_DONE)
+        writer.join()
+        self._finished.set()
+
+    def stop(self):
+        self.frontier.stop()
@@ -0,0 +1,171 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0, retry_after=None):
+    """
+    Exponential backoff with full jitter. A server-provided Retry-After
+    (in seconds) is used as a floor.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+def parse_retry_after(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average with bursts of up to
+    `capacity`. Meant to be used from a single event loop.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def set_rate(self, rate):
+        self._refill()
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = min(self.tokens, self.capacity)
+
+
+class HostLimiter:
+    """
+    AIMD control of one host's request rate and concurrency.
+
+    Until the first throttling signal the rate doubles roughly every second
+    (slow start); afterwards it grows by `increase` requests/sec per second.
+    An explicit throttling signal (429 or no response) multiplies the rate
+    and the concurrency by `decrease`; ambiguous ones (5xx, empty page) by
+    the gentler `mild_decrease`, so sporadic server errors do not collapse
+    the rate. Decreases happen at most once per `cooldown` seconds so that a
+    burst of failures from requests already in flight counts as one event.
+    Responses slower than `target_latency` shrink the concurrency only.
+    """
+
+    def __init__(self, max_concurrency, initial_rate=4.0, min_rate=0.5, max_rate=500.0,
+                 target_latency=2.0, increase=5.0, decrease=0.5, mild_decrease=0.9, cooldown=1.0):
+        self.max_concurrency = max_concurrency
+        self.concurrency = min(2.0, max_concurrency)
+        self.bucket = TokenBucket(initial_rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.mild_decrease = mild_decrease
+        self.cooldown = cooldown
+        self.slow_start = True
+        self.in_flight = 0
+        self.throttled = 0
+        self.last_decrease = 0.0
+        self._condition = None
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    async def __aenter__(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            while self.in_flight >= int(self.concurrency):
+                await self._condition.wait()
+            self.in_flight += 1
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            # Cancelled or timed out waiting for a token: __aexit__ will not
+            # run, so give the slot back here.
+            await self._release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._release()
+
+    async def _release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency):
+        rate = self.bucket.rate
+        if self.slow_start:
+            rate += 1.0
+        else:
+            rate += self.increase / rate
+        self.bucket.set_rate(min(self.max_rate, rate))
+
+        if latency > self.target_latency:
+            self._shrink_concurrency()
+        else:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+
+    def on_throttle(self, explicit=True):
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.last_decrease = now
+        self.slow_start = False
+        factor = self.decrease if explicit else self.mild_decrease
+        self.bucket.set_rate(max(self.min_rate, self.bucket.rate * factor))
+        self._shrink_concurrency(factor)
+
+    def _shrink_concurrency(self, factor=None):
+        self.concurrency = max(1.0, self.concurrency * (factor or self.decrease))
+
+
+class RateController:
+    """
+    Hands out one HostLimiter per host, so a slow or throttling host does not
+    hold back requests to others.
+    """
+
+    def __init__(self, max_concurrency, **limiter_options):
+        self.max_concurrency = max_concurrency
+        self.limiter_options = limiter_options
+        self.hosts = {}
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostLimiter(self.max_concurrency, **self.limiter_options)
+        return self.hosts[host]
+
+    def summary(self):
+        return ', '.join(
+            f'{host}: {limiter.rate:.1f} req/s, concurrency {int(limiter.concurrency)}, {limiter.throttled} throttled'
+            for host, limiter in self.hosts.items()
+        )
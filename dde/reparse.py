@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Rebuilds term_bank_0.jsonl and the tag registries from pages saved earlier,
+without fetching anything. Pages can come from the raw HTML cache written by
+dde_scrape.py, a directory of <word>.html files, or a .zip/.tar(.gz) archive
+of such files. Extraction runs in a process pool; output follows the sorted
+page URLs, so two runs over the same pages write the same entries in the
+same order.
+"""
+
+import argparse
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from dde_scrape import extract_page, save_tags_to_file
+from metrics import metrics
+from page_cache import PageCache
+
+BASE_URL = 'https://rae.es/diccionario-estudiante/'
+
+
+def _html_name_to_url(name, base_url):
+    word = os.path.basename(name)[:-len('.html')]
+    return f'{base_url}{word}'
+
+
+def iter_pages(source, base_url=BASE_URL):
+    """
+    Yields (url, markup) pairs from `source`, sorted by URL.
+    """
+    if os.path.isdir(source) and os.path.exists(os.path.join(source, 'index.json')):
+        yield from PageCache(source).items()
+
+    elif os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if name.endswith('.html'))
+        for name in names:
+            with open(os.path.join(source, name), 'r', encoding='utf-8') as f:
+                yield _html_name_to_url(name, base_url), f.read()
+
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = sorted(name for name in archive.namelist() if name.endswith('.html'))
+            for name in names:
+                yield _html_name_to_url(name, base_url), archive.read(name).decode('utf-8')
+
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            members = sorted((m for m in archive.getmembers() if m.isfile() and m.name.endswith('.html')),
+                             key=lambda m: m.name)
+            for member in members:
+                markup = archive.extractfile(member).read().decode('utf-8')
+                yield _html_name_to_url(member.name, base_url), markup
+
+    else:
+        raise ValueError(f"Unsupported page source: {source}")
+
+
+def _silence_output():
+    sys.stdout = open(os.devnull, 'w')
+
+
+def _extract(page):
+    url, markup = page
+    key_word = unquote(url.split('#', 1)[0].rsplit('/', 1)[-1])
+    return extract_page(markup, url, key_word)
+
+
+def reparse(pages, workers=None, window=256):
+    """
+    Extracts `pages` across `workers` processes and yields the results in
+    input order. At most `window` pages are in flight, so memory stays
+    bounded however many pages there are.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_silence_output) as pool:
+        in_flight = deque()
+        for page in pages:
+            in_flight.append(pool.submit(_extract, page))
+            if len(in_flight) >= window:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild term_bank_0.jsonl from saved DDE pages.')
+    parser.add_argument('source', help='page cache directory, directory of .html files, or .zip/.tar archive')
+    parser.add_argument('--output', default='term_bank_0.jsonl', help='JSONL file to write')
+    parser.add_argument('--workers', type=int, default=None, help='extraction processes (default: all cores)')
+    parser.add_argument('--base-url', default=BASE_URL, help='URL prefix for pages named after their word')
+    args = parser.parse_args()
+
+    grammar_tags = {}
+    usage_tags = {}
+    geo_tags = {}
+    not_found_words = []
+    pages = 0
+
+    start = time.perf_counter()
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        for result in reparse(iter_pages(args.source, args.base_url), workers=args.workers):
+            output_file.write(result['entries'])
+            for key in result['grammar_tags']:
+                grammar_tags[key] = True
+            for key in result['usage_tags']:
+                usage_tags[key] = True
+            for key in result['geo_tags']:
+                geo_tags[key] = True
+            not_found_words.extend(result['not_found_words'])
+            metrics.merge(result['metrics'])
+            pages += 1
+    elapsed = time.perf_counter() - start
+
+    save_tags_to_file(grammar_tags, 'grammar_tags.csv')
+    save_tags_to_file(usage_tags, 'usage_tags.csv')
+    save_tags_to_file(geo_tags, 'geo_tags.csv')
+
+    with open('unfound_words.txt', 'w', encoding='utf-8') as f:
+        for unfound_word in sorted(not_found_words):
+            f.write(f"{unfound_word}\n")
+
+    print(f'Reparsed {pages} pages in {elapsed:.1f}s ({pages / elapsed if elapsed else 0:.1f} pages/sec) into {args.output}')
+    print(metrics.summary())
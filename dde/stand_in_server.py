@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for rae.es/diccionario-estudiante used to exercise the
+scraper without touching the network. Every page mimics the markup the
+extraction code expects: an entry headword, a couple of acepciones with tags,
+examples and synonyms, a locution and the term wheel (`ul.rueda`).
+"""
+
+import argparse
+import asyncio
+import html
+import random
+import string
+import threading
+import time
+
+from aiohttp import web
+
+from rate_control import TokenBucket
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>{word} | Diccionario del estudiante</title></head>
+<body>
+<article>
+  <header><span class="entrada">{word}</span></header>
+  <div class="acep" id="{slug}-1">
+    <abbr class="gram primera" title="nombre masculino">m.</abbr>
+    <abbr class="register" title="coloquial">coloq.</abbr>
+    <span class="def">Definición primera de <i>{word}</i>.</span>
+    <span class="ejemplo">Un ejemplo con {word}.</span>
+    <div class="refS">Sin.: <a href="{next_word}">{next_word}*</a></div>
+  </div>
+  <div class="acep" id="{slug}-2">
+    <abbr class="gram" title="adjetivo">adj.</abbr>
+    <abbr class="geo" title="América">Am.</abbr>
+    <span class="def">Definición segunda de {word}.</span>
+    <span class="defP">Nota de uso.</span>
+    <div class="refA">Ant.: <a href="{prev_word}">{prev_word}</a></div>
+  </div>
+  <div class="locs">
+    <div class="fc" id="{slug}-fc1">
+      <span class="headword-fc">a {word}</span>
+      <div class="acep nogr"><abbr class="gram" title="locución adverbial">loc. adv.</abbr>
+        <span class="def">De la manera de {word}.</span>
+        <span class="ejemplo">Lo hizo a {word}.</span>
+      </div>
+    </div>
+  </div>
+</article>
+<ul class="rueda">
+{wheel}
+</ul>
+</body>
+</html>
+"""
+
+DEFAULT_WORDS = ["a"] + [f"{a}{b}" for a in string.ascii_lowercase for b in string.ascii_lowercase]
+
+
+def make_page(word, words, wheel_size=5):
+    """
+    Renders the page for `word`, with the wheel showing its neighbours in `words`.
+    """
+    position = words.index(word) if word in words else 0
+    wheel = []
+    for offset in range(-wheel_size, wheel_size + 1):
+        neighbour = words[(position + offset) % len(words)]
+        if offset == 0:
+            wheel.append(f'<li><b>{html.escape(neighbour)}</b></li>')
+        else:
+            wheel.append(f'<li><a href="{html.escape(neighbour)}">{html.escape(neighbour)}</a></li>')
+    return PAGE_TEMPLATE.format(
+        word=html.escape(word),
+        slug=html.escape(word.replace(' ', '-')),
+        next_word=html.escape(words[(position + 1) % len(words)]),
+        prev_word=html.escape(words[position - 1]),
+        wheel='\n'.join(wheel),
+    )
+
+
+class StandInServer:
+    """
+    Serves generated dictionary pages on 127.0.0.1 from a background thread.
+    Use as a context manager; `base_url` is ready once the block is entered.
+
+    `latency` adds a fixed delay to every response to emulate a remote host.
+    Throttling can be injected: requests above `max_rate` per second get a
+    429 with Retry-After, and a fraction `error_rate` of requests get a 503
+    and `empty_rate` an empty 200 page.
+    """
+
+    def __init__(self, words=None, latency=0.0, port=0, max_rate=None, error_rate=0.0, empty_rate=0.0):
+        self.words = words or DEFAULT_WORDS
+        self.latency = latency
+        self.port = port
+        self.error_rate = error_rate
+        self.empty_rate = empty_rate
+        self.bucket = TokenBucket(max_rate) if max_rate else None
+        self.requests = 0
+        self.throttled = 0
+        self._started = threading.Event()
+
+    async def handle_entry(self, request):
+        self.requests += 1
+        if self.bucket is not None and not self.bucket.try_acquire():
+            self.throttled += 1
+            return web.Response(status=429, headers={'Retry-After': '1'})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self.throttled += 1
+            return web.Response(status=503)
+        if self.empty_rate and random.random() < self.empty_rate:
+            self.throttled += 1
+            return web.Response(text='', content_type='text/html')
+        word = request.match_info['word']
+        if word not in self.words:
+            raise web.HTTPNotFound()
+        return web.Response(text=make_page(word, self.words), content_type='text/html')
+
+    async def _serve(self):
+        app = web.Application()
+        app.router.add_get('/diccionario-estudiante/{word}', self.handle_entry)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._started.set()
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.port}/diccionario-estudiante/'
+
+    def __enter__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._serve(), self._loop)
+        self._started.wait()
+        return self
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve generated DDE pages on localhost.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to wait before each response')
+    parser.add_argument('--max-rate', type=float, default=None, help='answer 429 above this many requests/sec')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--empty-rate', type=float, default=0.0, help='fraction of requests answered with an empty page')
+    args = parser.parse_args()
+
+    with StandInServer(latency=args.latency, port=args.port, max_rate=args.max_rate,
+                       error_rate=args.error_rate, empty_rate=args.empty_rate) as server:
+        print(f'Serving {len(server.words)} entries at {server.base_url} (Ctrl-C to stop)')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
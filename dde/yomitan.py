@@ -1,21 +1,28 @@
-import json
+import argparse
+import cProfile
+import io
 import logging
+import os
+import pstats
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from dictionary_zip import DictionaryZip, add_static_files
+from entries import get_definitions, grammar_rule_mapping
+from frequency import FrequencyIndex, frequency_fingerprint
+from manifest import BuildManifest, record_digest
+from metrics import Metrics
 
-grammar_rule_mapping = {
-    "adj.": "adj",
-    "aux.": "v",
-    "copul.": "v",
-    "intr.": "v",
-    "reg.": "v",
-    "tr.": "v",
-    "v.": "v",
-    "m.": "n",
-    "f.": "n",
-    "n.": "n"
-}
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+import json_codec
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 conjugation_model_mapping = {
     "amar": "1",
@@ -96,245 +103,789 @@ def clean_star_symbols(synonym_or_antonym):
     return synonym_or_antonym.replace('*', '').strip()
 
 
-def read_from_jsonl(file_path):
+def find_shards(file_path, shard_bytes):
+    """
+    Splits the JSONL file into (start, end) byte ranges of about `shard_bytes`
+    each, every one ending on a line boundary.
+    """
+    size = os.path.getsize(file_path)
+    shards = []
+    with open(file_path, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + shard_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def iter_jsonl(file_path):
     """
-    Reads the input JSONL file and returns the entries as a list.
+    Yields the entries of the input JSONL file one at a time, so the whole
+    file is never held in memory.
     """
     logging.info(f"Reading from JSONL file: {file_path}")
-    entries = []
+    count = 0
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(file_path, 'rb') as f:
             for line in f:
-                entries.append(json.loads(line))
-        logging.info(f"Loaded {len(entries)} entries from {file_path}")
+                if line.strip():
+                    count += 1
+                    yield json_codec.loads(line)
+        logging.info(f"Loaded {count} entries from {file_path}")
     except Exception as e:
         logging.error(f"Error reading JSONL file: {e}")
-    return entries
 
 
-def get_definitions(entry_data):
+class ProgressCounter:
     """
-    Extract definitions from entry data, handling both regular and solution entries.
+    Logs how many records have been converted at most every `interval`
+    seconds, instead of a line per record.
+    """
+
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self.count = 0
+        self.started_at = time.monotonic()
+        self._next_report = self.started_at + interval
+
+    def tick(self):
+        self.count += 1
+        if self.count % 256 == 0 and time.monotonic() >= self._next_report:
+            self._next_report = time.monotonic() + self.interval
+            self.report()
+
+    def report(self):
+        elapsed = time.monotonic() - self.started_at
+        logging.info(f"Converted {self.count} records ({self.count / elapsed if elapsed else 0:.0f} records/sec)")
+
+
+class TermBankWriter:
     """
-    if isinstance(entry_data, dict) and 'definitions' in entry_data:
-        return entry_data['definitions']
-    elif isinstance(entry_data, list):
-        return entry_data
-    return []
+    Writes Yomitan entries to numbered term_bank_N.json files in `output_dir`
+    as they arrive. A bank is closed once it holds `max_entries` entries or
+    the next entry would take it past `max_bytes`, so only the entry being
+    written is ever held in memory.
 
+    Leftover term banks numbered above the last one written are removed on
+    close, so a smaller rebuild does not leave stale banks behind.
 
-def convert_to_yomitan_format(db_path, output_path, input_type='jsonl'):
+    With a `sink`, each finished bank is passed to `sink(name, data)` instead
+    of being written to `output_dir`, e.g. straight into a DictionaryZip.
+
+    `bank_urls` lists, for each bank, the source URLs of its rows in order
+    with their row counts, as recorded in the BuildManifest.
     """
-    Converts the JSONL file into the desired Yomitan format.
+
+    def __init__(self, output_dir=None, max_entries=1000, max_bytes=None, indent=2, sink=None):
+        self.output_dir = output_dir
+        self.sink = sink
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.indent = indent
+        self.paths = []
+        self.bank_urls = []
+        self.total_entries = 0
+        self._file = None
+        self._entries = 0
+        self._bytes = 0
+        if sink is None:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def _open_bank(self):
+        path = f'term_bank_{len(self.paths) + 1}.json'
+        if self.sink is None:
+            path = os.path.join(self.output_dir, path)
+            self._file = open(path, 'wb')
+        else:
+            self._file = io.BytesIO()
+        self._file.write(b'[')
+        self._entries = 0
+        self._bytes = 1
+        self.paths.append(path)
+        self.bank_urls.append([])
+
+    def _close_bank(self):
+        self._file.write(b'\n]' if self.indent is not None and self._entries else b']')
+        if self.sink is not None:
+            self.sink(self.paths[-1], self._file.getvalue())
+        self._file.close()
+        logging.info(f"Wrote {self._entries} entries to {self.paths[-1]}")
+        self._file = None
+
+    def write(self, entry):
+        self.write_encoded(encode_entry(entry, self.indent))
+
+    def write_encoded(self, data, url=None):
+        """
+        Writes an entry already serialized by `encode_entry` with this
+        writer's indent. `url` is the source record's URL.
+        """
+        separator = b'\n' if self.indent is not None else b''
+        if self._file is not None:
+            full = self._entries >= self.max_entries
+            too_big = self.max_bytes is not None and self._bytes + len(data) + 4 > self.max_bytes
+            if full or too_big:
+                self._close_bank()
+        if self._file is None:
+            self._open_bank()
+        elif self._entries:
+            separator = b',' + separator
+        self._file.write(separator + data)
+        urls = self.bank_urls[-1]
+        if urls and urls[-1][0] == url:
+            urls[-1][1] += 1
+        else:
+            urls.append([url, 1])
+        self._entries += 1
+        self._bytes += len(separator) + len(data)
+        self.total_entries += 1
+
+    def close(self):
+        if self._file is None and not self.paths:
+            self._open_bank()
+        if self._file is not None:
+            self._close_bank()
+        if self.sink is not None:
+            return
+        index = len(self.paths) + 1
+        while True:
+            stale = os.path.join(self.output_dir, f'term_bank_{index}.json')
+            if not os.path.exists(stale):
+                break
+            os.remove(stale)
+            logging.info(f"Removed stale term bank: {stale}")
+            index += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def encode_entry(entry, indent=2):
     """
-    logging.info("Starting the conversion process.")
+    Serializes one term bank entry exactly as it appears inside a bank.
+    """
+    data = json_codec.dumps(entry, indent)
+    if indent is None:
+        return data
+    padding = b' ' * indent
+    return padding + data.replace(b'\n', b'\n' + padding)
+
 
-    if input_type == 'jsonl':
-        data_source = read_from_jsonl(db_path)
+def write_bank(path, encoded_entries, indent=2):
+    """
+    Atomically writes one term bank from entries serialized by
+    `encode_entry`, in the same layout as TermBankWriter.
+    """
+    if indent is None:
+        data = b'[' + b','.join(encoded_entries) + b']'
+    elif encoded_entries:
+        data = b'[\n' + b',\n'.join(encoded_entries) + b'\n]'
     else:
-        logging.error(f"Unsupported input type: {input_type}")
-        return
-
-    yomitan_entries = []
-
-    for entry in data_source:
-        word = entry['word']
-        entry_type = entry['type']
-        structured_data = entry['data']
-        logging.info(f"Processing word: {word} (type: {entry_type})")
-
-        reading = ""
-        grouped_definitions = {}
-        plural_form = structured_data.get("plural", "")
-        participles = structured_data.get("participios", [])
-        expressions = structured_data.get("expressions", [])
-        term_note = structured_data.get("term_note", "")
-
-        definitions = get_definitions(structured_data)
-        
-        if not definitions:
-            logging.warning(f"No definitions found for word '{word}'")
+        data = b'[]'
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_definitions(entry):
+    """
+    Builds the structured content of each definition of one scraped entry.
+    Returns ((definition tags, rule identifier), structured content) pairs in
+    definition order.
+    """
+    word = entry['word']
+    structured_data = entry['data']
+
+    built = []
+    details = structured_data if isinstance(structured_data, dict) else {}
+    plural_form = details.get("plural", "")
+    participles = details.get("participios", [])
+    expressions = details.get("expressions", [])
+    term_note = details.get("term_note", "")
+
+    definitions = get_definitions(structured_data)
+    
+    if not definitions:
+        logging.warning(f"No definitions found for word '{word}'")
+        return built
+
+    for idx, definition in enumerate(definitions):
+        if not isinstance(definition, dict):
+            logging.warning(f"Skipping definition for word '{word}' because it is not a dictionary.")
             continue
 
-        for idx, definition in enumerate(definitions):
-            if not isinstance(definition, dict):
-                logging.warning(f"Skipping definition for word '{word}' because it is not a dictionary.")
-                continue
-
-            definition_text = definition.get('definition', '')
-            logging.debug(f"Definition found: {definition_text}")
-
-            grammar_tags = [tag['tag'].replace(' ', '-') for tag in definition.get('grammar_tags', [])]
-            usage_tags = [tag['tag'].replace(' ', '-') for tag in definition.get('usage_tags', [])]
-            geo_tags = [tag['tag'].replace(' ', '-') for tag in definition.get('geo_tags', [])]
-            def_notes = definition.get('def_notes', [])
-            definition_tags = ' '.join(grammar_tags + usage_tags + geo_tags)
-            logging.debug(f"Combined definition tags: {definition_tags}")
-
-            rule_identifier = ""
-            for tag in grammar_tags:
-                if tag in grammar_rule_mapping:
-                    rule_identifier = grammar_rule_mapping[tag]
-                    logging.info(f'Rule identifier "{rule_identifier}" assigned for grammar tag "{tag}".')
-                    break
-
-            score = 0
-
-            structured_content = {
-                "type": "structured-content",
-                "content": [definition_text]
-            }
-
-            if idx == 0:
-                if term_note:
-                    structured_content["content"].append({
-                        "tag": "div",
-                        "data": {"content": "term-note"},
-                        "content": term_note
-                    })
-
-                if plural_form:
-                    structured_content["content"].append({
-                        "tag": "div",
-                        "data": {"content": "plural"},
-                        "content": plural_form
-                    })
-
-                participles_content = [
-                    {
-                        "tag": "a",
-                        "content": clean_star_symbols(participle),
-                        "href": f"?query={clean_star_symbols(participle)}&wildcards=off"
-                    } for participle in participles
-                ]
-                for participle in participles_content:
-                    structured_content["content"].append({
-                        "tag": "div",
-                        "data": {"content": "participles"},
-                        "content": [participle]
-                    })
-
-            examples_content = [
-                {
-                    "tag": "div",
-                    "data": {"content": "example-sentence"},
-                    "content": example
-                } for example in definition.get('examples', [])
-            ]
-            if examples_content:
+        definition_text = definition.get('definition', '')
+
+        grammar_tags = [tag['tag'].replace(' ', '-') for tag in definition.get('grammar_tags', [])]
+        usage_tags = [tag['tag'].replace(' ', '-') for tag in definition.get('usage_tags', [])]
+        geo_tags = [tag['tag'].replace(' ', '-') for tag in definition.get('geo_tags', [])]
+        def_notes = definition.get('def_notes', [])
+        definition_tags = ' '.join(grammar_tags + usage_tags + geo_tags)
+
+        rule_identifier = ""
+        for tag in grammar_tags:
+            if tag in grammar_rule_mapping:
+                rule_identifier = grammar_rule_mapping[tag]
+                break
+
+        structured_content = {
+            "type": "structured-content",
+            "content": [definition_text]
+        }
+
+        if idx == 0:
+            if term_note:
                 structured_content["content"].append({
                     "tag": "div",
-                    "data": {"content": "extra-info"},
-                    "content": examples_content
+                    "data": {"content": "term-note"},
+                    "content": term_note
                 })
 
-            def_notes_content = [
-                {
-                    "tag": "div",
-                    "data": {"content": "definition-notes"},
-                    "content": note
-                } for note in def_notes
-            ]
-
-            if def_notes_content:
+            if plural_form:
                 structured_content["content"].append({
                     "tag": "div",
-                    "data": {"content": "extra-info"},
-                    "content": def_notes_content
+                    "data": {"content": "plural"},
+                    "content": plural_form
                 })
 
-            synonyms_content = [
+            participles_content = [
                 {
                     "tag": "a",
-                    "content": clean_star_symbols(synonym),
-                    "href": f"?query={clean_star_symbols(synonym)}&wildcards=off"
-                } for synonym in definition.get('synonyms', [])
+                    "content": clean_star_symbols(participle),
+                    "href": f"?query={clean_star_symbols(participle)}&wildcards=off"
+                } for participle in participles
             ]
-            for synonym in synonyms_content:
+            for participle in participles_content:
                 structured_content["content"].append({
                     "tag": "div",
-                    "data": {"content": "synonyms"},
-                    "content": [synonym]
+                    "data": {"content": "participles"},
+                    "content": [participle]
                 })
 
-            antonyms_content = [
+        examples_content = [
+            {
+                "tag": "div",
+                "data": {"content": "example-sentence"},
+                "content": example
+            } for example in definition.get('examples', [])
+        ]
+        if examples_content:
+            structured_content["content"].append({
+                "tag": "div",
+                "data": {"content": "extra-info"},
+                "content": examples_content
+            })
+
+        def_notes_content = [
+            {
+                "tag": "div",
+                "data": {"content": "definition-notes"},
+                "content": note
+            } for note in def_notes
+        ]
+
+        if def_notes_content:
+            structured_content["content"].append({
+                "tag": "div",
+                "data": {"content": "extra-info"},
+                "content": def_notes_content
+            })
+
+        synonyms_content = [
+            {
+                "tag": "a",
+                "content": clean_star_symbols(synonym),
+                "href": f"?query={clean_star_symbols(synonym)}&wildcards=off"
+            } for synonym in definition.get('synonyms', [])
+        ]
+        for synonym in synonyms_content:
+            structured_content["content"].append({
+                "tag": "div",
+                "data": {"content": "synonyms"},
+                "content": [synonym]
+            })
+
+        antonyms_content = [
+            {
+                "tag": "a",
+                "content": clean_star_symbols(antonym),
+                "href": f"?query={clean_star_symbols(antonym)}&wildcards=off"
+            } for antonym in definition.get('antonyms', [])
+        ]
+        for antonym in antonyms_content:
+            structured_content["content"].append({
+                "tag": "div",
+                "data": {"content": "antonyms"},
+                "content": [antonym]
+            })
+
+        if idx == len(definitions) - 1:
+            structured_content["content"].append({
+                "tag": "div",
+                "data": {"content": "attribution"},
+                "content": [
+                    {
+                        "tag": "a",
+                        "content": "DLE",
+                        "href": f"https://dle.rae.es/{word}"
+                    },
+                    {
+                        "tag": "span",
+                        "content": " | ",
+                    },
+                    {
+                        "tag": "a",
+                        "content": "DLE",
+                        "href": f"https://rae.es/diccionario-estudiante/{word}"
+                    }
+                ]
+            })
+            expressions_content = [
                 {
                     "tag": "a",
-                    "content": clean_star_symbols(antonym),
-                    "href": f"?query={clean_star_symbols(antonym)}&wildcards=off"
-                } for antonym in definition.get('antonyms', [])
+                    "content": clean_star_symbols(expression),
+                    "href": f"?query={clean_star_symbols(expression)}&wildcards=off"
+                } for expression in expressions
             ]
-            for antonym in antonyms_content:
+            for expression in expressions_content:
                 structured_content["content"].append({
                     "tag": "div",
-                    "data": {"content": "antonyms"},
-                    "content": [antonym]
+                    "data": {"content": "expressions"},
+                    "content": [expression]
                 })
 
-            if idx == len(definitions) - 1:
-                structured_content["content"].append({
-                    "tag": "div",
-                    "data": {"content": "attribution"},
-                    "content": [
-                        {
-                            "tag": "a",
-                            "content": "DLE",
-                            "href": f"https://dle.rae.es/{word}"
-                        },
-                        {
-                            "tag": "span",
-                            "content": " | ",
-                        },
-                        {
-                            "tag": "a",
-                            "content": "DLE",
-                            "href": f"https://rae.es/diccionario-estudiante/{word}"
-                        }
-                    ]
-                })
-                expressions_content = [
-                    {
-                        "tag": "a",
-                        "content": clean_star_symbols(expression),
-                        "href": f"?query={clean_star_symbols(expression)}&wildcards=off"
-                    } for expression in expressions
-                ]
-                for expression in expressions_content:
-                    structured_content["content"].append({
-                        "tag": "div",
-                        "data": {"content": "expressions"},
-                        "content": [expression]
-                    })
-
-            key = (definition_tags, rule_identifier)
-            if key not in grouped_definitions:
-                grouped_definitions[key] = []
-            grouped_definitions[key].append(structured_content)
-
-        for (definition_tags, rule_identifier), definitions in grouped_definitions.items():
-            conjugation_model = structured_data.get("conjugation_model") if isinstance(structured_data, dict) else None
-            term_tags = conjugation_model_mapping.get(conjugation_model, "") if conjugation_model else ""
-            sequence_number = 0
-
-            yomitan_entries.append([
-                word,
-                reading,
-                definition_tags,
-                rule_identifier,
-                score,
-                definitions,
-                sequence_number,
-                term_tags
-            ])
-            logging.info(f"Grouped entry for word '{word}' with tags '{definition_tags}' added.")
+        built.append(((definition_tags, rule_identifier), structured_content))
+
+    return built
+
+
+def group_definitions(entry, built, score=0):
+    """
+    Groups built definitions into Yomitan term bank entries, one per distinct
+    combination of definition tags and rule identifier, all with `score`.
+    """
+    word = entry['word']
+    structured_data = entry['data']
+    reading = ""
+
+    grouped_definitions = {}
+    for key, structured_content in built:
+        if key not in grouped_definitions:
+            grouped_definitions[key] = []
+        grouped_definitions[key].append(structured_content)
+
+    for (definition_tags, rule_identifier), definitions in grouped_definitions.items():
+        conjugation_model = structured_data.get("conjugation_model") if isinstance(structured_data, dict) else None
+        term_tags = conjugation_model_mapping.get(conjugation_model, "") if conjugation_model else ""
+        sequence_number = 0
+
+        yield [
+            word,
+            reading,
+            definition_tags,
+            rule_identifier,
+            score,
+            definitions,
+            sequence_number,
+            term_tags
+        ]
+
+
+def convert_entry(entry, score=0):
+    """
+    Converts one scraped entry into its Yomitan term bank entries.
+    """
+    return group_definitions(entry, build_definitions(entry), score)
+
+
+def convert_record(entry, indent=2, scores=None):
+    """
+    Converts one scraped record and returns its URL, its digest, its encoded
+    term bank entries and their score, looked up by headword in `scores`.
+    """
+    score = scores.get(entry['word'], 0) if scores else 0
+    encoded = [encode_entry(yomitan_entry, indent) for yomitan_entry in convert_entry(entry, score)]
+    return entry['url'], record_digest(entry), encoded, score
+
+
+def iter_profiled_records(db_path, indent, profile, scores=None):
+    """
+    Serial equivalent of `convert_record` over the JSONL that times each
+    phase into `profile`.
+    """
+    entries = iter_jsonl(db_path)
+    while True:
+        with profile.timer('read_seconds'):
+            entry = next(entries, None)
+        if entry is None:
+            return
+        with profile.timer('build_seconds'):
+            built = build_definitions(entry)
+        with profile.timer('group_seconds'):
+            score = scores.get(entry['word'], 0) if scores else 0
+            yomitan_entries = list(group_definitions(entry, built, score))
+        with profile.timer('serialize_seconds'):
+            encoded = [encode_entry(yomitan_entry, indent) for yomitan_entry in yomitan_entries]
+            digest = record_digest(entry)
+        yield entry['url'], digest, encoded, score
+
+
+_shard_scores = None
+
+
+def _init_shard_worker(scores):
+    """
+    Hands the headword scores to a conversion process once, instead of with
+    every shard.
+    """
+    global _shard_scores
+    _shard_scores = scores
+
+
+def convert_shard(file_path, start, end, indent=2):
+    """
+    Converts the JSONL lines between byte offsets `start` and `end`, see
+    `convert_record`.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).splitlines()
+    return [convert_record(json_codec.loads(line), indent, _shard_scores) for line in lines if line.strip()]
+
 
+def iter_converted_shards(file_path, indent=2, workers=None, shard_bytes=1 << 20, window=None, scores=None):
+    """
+    Converts the JSONL file shard by shard in a process pool and yields the
+    converted records in file order, so the output matches a serial run. At
+    most `window` shards are in flight at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 2
+    shards = find_shards(file_path, shard_bytes)
+    logging.info(f"Converting {file_path} as {len(shards)} shards across {workers} processes")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker, initargs=(scores,)) as pool:
+        in_flight = deque()
+        for start, end in shards:
+            in_flight.append(pool.submit(convert_shard, file_path, start, end, indent))
+            if len(in_flight) >= window:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def load_headword_scores(db_path, frequency):
+    """
+    Joins the frequency ranks in `frequency` (term meta banks, see
+    FrequencyIndex) to the headwords of the JSONL and returns {headword:
+    score} for the ranked ones.
+    """
+    headwords = {entry['word'] for entry in iter_jsonl(db_path)}
+    scores = FrequencyIndex.load(frequency, headwords).scores(headwords)
+    logging.info(f"Frequency ranks for {len(scores)} of {len(headwords)} headwords "
+                 f"({len(scores) / len(headwords) * 100 if headwords else 0:.1f}%) from {frequency}")
+    return scores
+
+
+def iter_by_frequency(records):
+    """
+    Reorders converted records by descending score, keeping the JSONL order
+    among equal scores, so the most frequent headwords fill the first banks.
+    The encoded entries wait in a temporary file; only their offsets and
+    scores are held in memory.
+    """
+    order = []
+    with tempfile.TemporaryFile() as spool:
+        offset = 0
+        for position, (url, digest, encoded_entries, score) in enumerate(records):
+            lengths = [len(data) for data in encoded_entries]
+            spool.write(b''.join(encoded_entries))
+            order.append((-score, position, offset, lengths, url, digest))
+            offset += sum(lengths)
+        order.sort()
+        for negative_score, _, offset, lengths, url, digest in order:
+            spool.seek(offset)
+            data = spool.read(sum(lengths))
+            encoded_entries = []
+            start = 0
+            for length in lengths:
+                encoded_entries.append(data[start:start + length])
+                start += length
+            yield url, digest, encoded_entries, -negative_score
+
+
+def convert_to_yomitan_format(db_path, output_dir, input_type='jsonl', max_entries=1000, max_bytes=None, indent=2,
+                              sink=None, workers=1, shard_bytes=1 << 20, manifest_path=None, profile=None,
+                              frequency=None, frequency_layout=True):
+    """
+    Converts the JSONL file into the desired Yomitan format, streaming the
+    entries into numbered term banks in `output_dir` (or into `sink`, see
+    TermBankWriter). With more than one worker the JSONL is converted in
+    shards of about `shard_bytes` by a process pool. With `manifest_path`,
+    a BuildManifest is saved there for later incremental rebuilds.
+
+    With `frequency`, the term meta banks of a frequency dictionary, every
+    entry is scored by the frequency rank of its headword and, with
+    `frequency_layout`, the banks are laid out by descending frequency.
+
+    With a `profile` (a Metrics registry) the conversion runs serially and
+    records the time spent in each phase.
+    """
+    logging.info("Starting the conversion process.")
+
+    if input_type != 'jsonl':
+        logging.error(f"Unsupported input type: {input_type}")
+        return []
+
+    scores = load_headword_scores(db_path, frequency) if frequency is not None else None
+    if profile is not None:
+        records = iter_profiled_records(db_path, indent, profile, scores)
+    elif workers == 1:
+        records = (convert_record(entry, indent, scores) for entry in iter_jsonl(db_path))
+    else:
+        records = iter_converted_shards(db_path, indent, workers, shard_bytes, scores=scores)
+
+    manifest = BuildManifest(options={
+        'indent': indent,
+        'max_entries': max_entries,
+        'frequency': frequency_fingerprint(frequency),
+        'frequency_layout': frequency is not None and frequency_layout,
+    })
+    records = manifest.recorded(records)
+    if frequency is not None and frequency_layout:
+        records = iter_by_frequency(records)
+
+    progress = ProgressCounter()
+    ranked_entries = 0
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(yomitan_entries, f, ensure_ascii=False, indent=2)
-        logging.info(f"Output written to file: {output_path}")
+        with TermBankWriter(output_dir, max_entries=max_entries, max_bytes=max_bytes, indent=indent,
+                            sink=sink) as writer:
+            for url, digest, encoded_entries, score in records:
+                if score:
+                    ranked_entries += len(encoded_entries)
+                if profile is None:
+                    for data in encoded_entries:
+                        writer.write_encoded(data, url)
+                else:
+                    with profile.timer('write_seconds'):
+                        for data in encoded_entries:
+                            writer.write_encoded(data, url)
+                progress.tick()
+        progress.report()
+        logging.info(f"Wrote {writer.total_entries} entries to {len(writer.paths)} term banks")
+        if frequency is not None:
+            logging.info(f"Frequency coverage: {ranked_entries} of {writer.total_entries} entries "
+                         f"({ranked_entries / writer.total_entries * 100 if writer.total_entries else 0:.1f}%) "
+                         f"have a score")
+        if manifest_path is not None:
+            manifest.banks = [[os.path.basename(path), urls] for path, urls in zip(writer.paths, writer.bank_urls)]
+            manifest.save(manifest_path)
     except IOError as e:
-        logging.error(f"Error writing to output file: {e}")
+        logging.error(f"Error writing to output directory: {e}")
+        return []
 
     logging.info("Conversion process completed.")
+    return writer.paths
 
-convert_to_yomitan_format('term_bank_0.jsonl', 'term_bank_1.json', input_type='jsonl')
\ No newline at end of file
+
+def profile_conversion(db_path, output_dir, profile_output=None, **options):
+    """
+    Runs a serial conversion and prints the wall time of each phase (read,
+    build structured content, group, serialize, write), the throughput and
+    the peak memory. tracemalloc slows the conversion down, so compare phase
+    shares rather than absolute times with an unprofiled run. With
+    `profile_output`, a cProfile dump is also written there and its hottest
+    functions are printed.
+    """
+    options.pop('workers', None)
+    profile = Metrics(prefix='convert_')
+    profiler = cProfile.Profile() if profile_output else None
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    paths = convert_to_yomitan_format(db_path, output_dir, profile=profile, **options)
+    if profiler is not None:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    records = profile.histograms['build_seconds'].count if 'build_seconds' in profile.histograms else 0
+    print(f"Converted {records} records into {len(paths)} term banks in {elapsed:.2f}s "
+          f"({records / elapsed if elapsed else 0:.0f} records/sec)")
+    for phase in ('read', 'build', 'group', 'serialize', 'write'):
+        histogram = profile.histograms.get(f'{phase}_seconds')
+        if histogram is not None:
+            print(f"  {phase:<10} {histogram.sum:8.2f}s  {histogram.sum / elapsed * 100 if elapsed else 0:5.1f}%")
+    print(f"Peak traced memory: {peak / 2 ** 20:.1f} MiB, "
+          f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+    if profiler is not None:
+        profiler.dump_stats(profile_output)
+        print(f"cProfile stats written to {profile_output}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+    return paths
+
+
+def update_term_banks(db_path, output_dir, manifest_path, max_entries=1000, indent=2, frequency=None,
+                      frequency_layout=True):
+    """
+    Brings the term banks in `output_dir` up to date with the JSONL by
+    reconverting only the records whose content changed since the conversion
+    that wrote `manifest_path`, and rewriting only the banks that hold their
+    rows. Rows of new records fill the last bank, then new ones. Banks may end
+    up a little above `max_entries`, and new rows are not placed by
+    frequency; a full conversion restores the layout.
+
+    Returns the rewritten bank paths, or None when there is no usable
+    manifest and a full conversion is needed, including when the frequency
+    list or layout changed since.
+    """
+    manifest = BuildManifest.load(manifest_path)
+    if (manifest is None or manifest.options.get('indent') != indent
+            or manifest.options.get('frequency') != frequency_fingerprint(frequency)
+            or manifest.options.get('frequency_layout', False) != (frequency is not None and frequency_layout)):
+        logging.info("No compatible build manifest, a full conversion is needed.")
+        return None
+    if not all(os.path.exists(os.path.join(output_dir, name)) for name, _ in manifest.banks):
+        logging.info("Term banks listed in the manifest are missing, a full conversion is needed.")
+        return None
+
+    digests = BuildManifest()
+    for entry in iter_jsonl(db_path):
+        digests.add_record(entry['url'], record_digest(entry))
+    changed = {url for url, digest in digests.records.items() if manifest.records.get(url) != digest}
+    removed = set(manifest.records) - set(digests.records)
+    logging.info(f"{len(changed)} changed or added and {len(removed)} removed of {len(digests.records)} records")
+    if not changed and not removed:
+        return []
+
+    changed_entries = [entry for entry in iter_jsonl(db_path) if entry['url'] in changed]
+    scores = None
+    if frequency is not None:
+        headwords = {entry['word'] for entry in changed_entries}
+        scores = FrequencyIndex.load(frequency, headwords).scores(headwords)
+    new_entries = {url: [] for url in changed}
+    for entry in changed_entries:
+        new_entries[entry['url']].extend(convert_record(entry, indent, scores)[2])
+
+    bank_of = manifest.bank_of()
+    affected = {name for url in changed | removed for name in bank_of.get(url, ())}
+    rewritten = []
+    for bank in manifest.banks:
+        name, urls = bank
+        if name not in affected:
+            continue
+        path = os.path.join(output_dir, name)
+        rows = json_codec.load(path)
+        encoded_entries = []
+        new_urls = []
+        position = 0
+        for url, count in urls:
+            if url in changed:
+                # A record split across banks gets all its new rows where its
+                # first rows were, and none in the later banks.
+                entries = new_entries.pop(url, [])
+            elif url in removed:
+                entries = []
+            else:
+                entries = [encode_entry(row, indent) for row in rows[position:position + count]]
+            position += count
+            if entries:
+                encoded_entries.extend(entries)
+                new_urls.append([url, len(entries)])
+        write_bank(path, encoded_entries, indent)
+        bank[1] = new_urls
+        rewritten.append(path)
+
+    added = [(url, entries) for url, entries in new_entries.items() if entries]
+    while added:
+        if manifest.banks and sum(count for _, count in manifest.banks[-1][1]) < max_entries:
+            name, urls = manifest.banks[-1]
+            encoded_entries = [encode_entry(row, indent) for row in json_codec.load(os.path.join(output_dir, name))]
+        else:
+            name, urls = f'term_bank_{len(manifest.banks) + 1}.json', []
+            manifest.banks.append([name, urls])
+            encoded_entries = []
+        while added and len(encoded_entries) < max_entries:
+            url, entries = added.pop(0)
+            encoded_entries.extend(entries)
+            urls.append([url, len(entries)])
+        path = os.path.join(output_dir, name)
+        write_bank(path, encoded_entries, indent)
+        if path not in rewritten:
+            rewritten.append(path)
+
+    manifest.records = digests.records
+    manifest.save(manifest_path)
+    logging.info(f"Rewrote {len(rewritten)} of {len(manifest.banks)} term banks")
+    return rewritten
+
+
+def build_dictionary_zip(db_path, zip_path, files_dir='files', revision=None, level=9, zip_workers=None, **options):
+    """
+    Builds the release archive in one pass: index.json with a fresh revision,
+    the tag bank and stylesheet from `files_dir`, and the term banks streamed
+    from the converter, compressed in parallel without touching the disk
+    uncompressed.
+    """
+    logging.info(f"Building dictionary archive: {zip_path}")
+    with DictionaryZip(zip_path, level=level, workers=zip_workers) as archive:
+        # index.json keeps the layout of files/index.json unless the banks are compact.
+        add_static_files(archive, files_dir, revision, indent=4 if options.get('indent', 2) is not None else None)
+        if not convert_to_yomitan_format(db_path, None, sink=archive.add, **options):
+            raise RuntimeError(f"Conversion of {db_path} failed, archive not written")
+    logging.info(f"Wrote {len(archive.members)} files to {zip_path}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert the scraped DDE entries into Yomitan term banks.')
+    parser.add_argument('--input', default='term_bank_0.jsonl', help='JSONL file written by dde_scrape.py')
+    parser.add_argument('--output-dir', default='files', help='directory the term_bank_N.json files are written to')
+    parser.add_argument('--max-entries', type=int, default=1000, help='entries per term bank')
+    parser.add_argument('--max-bytes', type=int, default=None, help='start a new term bank before exceeding this size')
+    parser.add_argument('--compact', action='store_true', help='write term banks without indentation')
+    parser.add_argument('--workers', type=int, default=None, help='conversion processes (default: all cores)')
+    parser.add_argument('--shard-size', type=int, default=1 << 20, help='bytes of JSONL per conversion shard')
+    parser.add_argument('--zip', metavar='PATH', help='write a release archive instead, e.g. "Diccionario del estudiante.zip"')
+    parser.add_argument('--files-dir', default='files', help='index.json, tag bank and stylesheet for the archive')
+    parser.add_argument('--revision', default=None, help='archive revision (default: today, YYYY.MM.DD)')
+    parser.add_argument('--compression-level', type=int, default=9, choices=range(0, 10), metavar='0-9',
+                        help='deflate level for the archive')
+    parser.add_argument('--zip-workers', type=int, default=None, help='threads compressing archive members')
+    parser.add_argument('--manifest', default='term_banks.manifest.json',
+                        help='build manifest written with the term banks, used by --incremental')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only reconvert records that changed since the last conversion')
+    parser.add_argument('--frequency', metavar='PATH',
+                        help='term meta banks of a frequency dictionary (e.g. ../freq/corpes/files or its zip) '
+                             'to score entries by the frequency rank of their headword')
+    parser.add_argument('--input-order', action='store_true',
+                        help='with --frequency, keep the JSONL order instead of laying out banks by frequency')
+    parser.add_argument('--profile', action='store_true',
+                        help='convert serially and report per-phase time, throughput and peak memory')
+    parser.add_argument('--profile-output', metavar='PATH', help='with --profile, also write cProfile stats here')
+    args = parser.parse_args()
+    if args.zip and args.incremental:
+        parser.error('--incremental updates the term banks in --output-dir and cannot be combined with --zip')
+
+    options = dict(max_entries=args.max_entries, max_bytes=args.max_bytes, indent=None if args.compact else 2,
+                   workers=args.workers or os.cpu_count() or 1, shard_bytes=args.shard_size,
+                   frequency=args.frequency, frequency_layout=not args.input_order)
+    if args.profile:
+        profile_conversion(args.input, args.output_dir, args.profile_output, manifest_path=args.manifest, **options)
+    elif args.zip:
+        build_dictionary_zip(args.input, args.zip, args.files_dir, revision=args.revision,
+                             level=args.compression_level, zip_workers=args.zip_workers, **options)
+    elif not args.incremental or update_term_banks(args.input, args.output_dir, args.manifest, args.max_entries,
+                                                   options['indent'], args.frequency,
+                                                   options['frequency_layout']) is None:
+        convert_to_yomitan_format(args.input, args.output_dir, manifest_path=args.manifest, **options)
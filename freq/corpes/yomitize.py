@@ -1,31 +1,269 @@
-import json
-
-input_file = "frecuencia_lemas_corpes_1_2.txt"
-output_file = "term_meta_bank_0.json"
-
-punctuation_marks = {",", ".", "¡", "!", "¿", "?", "??", ";", ":", "'", "\"", "‘", "’", "“" "”", "«", "»", "[", "]", "{", "}", "…", "...", "—", "_", "-", "%", "\\", "/"}
-
-output_data = []
-rank = 1 
-with open(input_file, "r", encoding="utf-8") as file:
-    for line in file:
-        parts = line.strip().split("\t")
-        if len(parts) < 1:
-            continue
-        word = parts[0]
-        if word in punctuation_marks:
-            continue
-        output_data.append([
-            word,
-            "freq",
-            {
-                "value": rank,
-                "displayValue": str(rank)
-            }
-        ])
-        rank += 1
-
-with open(output_file, "w", encoding="utf-8") as file:
-    json.dump(output_data, file, indent=2, ensure_ascii=False)
-
-print(f"Conversion complete! Output saved to '{output_file}'")
+#!/usr/bin/env python3
+"""
+Builds the term_meta_bank_N.json files of the CORPES frequency dictionary
+from one or more CORPES/CREA-style frequency lists.
+
+Each input is a tab-separated file with one lemma or form per line, optionally
+preceded by a rank column ("1.") and followed by its absolute and normalized
+(per million) frequencies; thousands separators and decimal commas are
+understood, and a header line is skipped. Every list contributes its
+normalized frequency times its weight (PATH:WEIGHT, default 1) to a word's
+score, and words are ranked by descending score, ties keeping the order in
+which the inputs list them. A list without frequencies scores its words as
+1 000 000 / line rank, so a single list keeps its own order.
+
+Memory stays bounded for lists of millions of lines: rows are sorted into
+runs of --run-size on disk, merged by word to add up the corpora, sorted again
+by score in runs, and the final merge is written out bank by bank.
+"""
+
+import argparse
+import heapq
+import os
+import re
+import sys
+import tempfile
+from itertools import groupby
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'utils'))
+import json_codec
+
+DEFAULT_INPUT = "frecuencia_lemas_corpes_1_2.txt"
+DEFAULT_OUTPUT_DIR = "files"
+
+PUNCTUATION_MARKS = frozenset({",", ".", "¡", "!", "¿", "?", "??", ";", ":", "'", "\"", "‘", "’", "“", "”", "«", "»",
+                               "[", "]", "{", "}", "…", "...", "—", "_", "-", "%", "\\", "/"})
+
+_NUMBER = re.compile(r'^\d[\d.,\s]*$')
+_RANK = re.compile(r'^\d+\.?$')
+_META_BANK = re.compile(r'^term_meta_bank_(\d+)\.json$')
+_POSITION_BITS = 40
+
+
+def parse_count(text):
+    """
+    Parses an absolute frequency, ignoring thousands separators: "1.234.567",
+    "1,234,567", "1 234 567".
+    """
+    return float(re.sub(r'[.,\s]', '', text))
+
+
+def parse_number(text):
+    """
+    Parses a normalized frequency: "65545.55", "65.545,55", "65,545.55" or
+    "12,5". With both separators the last one is the decimal point; a single
+    comma is a decimal comma unless three digits follow it.
+    """
+    text = re.sub(r'\s', '', text)
+    if ',' in text and '.' in text:
+        decimal = ',' if text.rfind(',') > text.rfind('.') else '.'
+        return float(text.replace('.' if decimal == ',' else ',', '').replace(decimal, '.'))
+    if text.count(',') > 1 or text.count('.') > 1 or re.search(r',\d{3}$', text):
+        return float(re.sub(r'[.,]', '', text))
+    return float(text.replace(',', '.'))
+
+
+def _numeric(field):
+    return bool(_NUMBER.match(field.strip()))
+
+
+def detect_columns(fields):
+    """
+    (word column, absolute column, normalized column) of a data line; the
+    frequency columns are None when missing.
+    """
+    word_column = 0
+    while word_column < len(fields) - 1 and _RANK.match(fields[word_column].strip()):
+        word_column += 1
+    numbers = [index for index in range(word_column + 1, len(fields)) if _numeric(fields[index])]
+    return word_column, (numbers[0] if numbers else None), (numbers[1] if len(numbers) > 1 else None)
+
+
+def iter_frequency_list(path):
+    """
+    Yields (word, absolute frequency, normalized frequency) for each line of a
+    frequency list; the frequencies are None when the list has no such
+    column. Punctuation marks are skipped.
+    """
+    columns = None
+    header_checked = False
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            fields = line.strip().split("\t")
+            if not fields[0]:
+                continue
+            if not header_checked:
+                header_checked = True
+                if len(fields) > 1 and not any(_numeric(field) for field in fields):
+                    continue
+            if columns is None:
+                columns = detect_columns(fields)
+            word_column, absolute_column, normalized_column = columns
+            if word_column >= len(fields):
+                continue
+            word = fields[word_column]
+            if word in PUNCTUATION_MARKS:
+                continue
+            try:
+                absolute = parse_count(fields[absolute_column]) if absolute_column is not None else None
+                normalized = parse_number(fields[normalized_column]) if normalized_column is not None else None
+            except (IndexError, ValueError):
+                continue
+            yield word, absolute, normalized
+
+
+def iter_corpus_scores(path, weight, corpus_index):
+    """
+    Yields (word, weighted score, position, rank only) for one corpus, where
+    the position orders ties by corpus and line and `rank only` tells that
+    the list has no frequencies.
+    """
+    total = None
+    has_normalized = None
+    for rank, (word, absolute, normalized) in enumerate(iter_frequency_list(path), 1):
+        if has_normalized is None:
+            has_normalized = normalized is not None
+            if not has_normalized and absolute is not None:
+                total = sum(row[1] for row in iter_frequency_list(path))
+        if has_normalized:
+            score = normalized
+        elif total:
+            score = absolute / total * 1_000_000
+        else:
+            score = 1_000_000 / rank
+        yield word, score * weight, (corpus_index << _POSITION_BITS) | rank, not has_normalized and not total
+
+
+def _write_run(rows, tmp_dir):
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=tmp_dir, suffix='.run', delete=False) as f:
+        for word, score, position in rows:
+            f.write(f'{word}\t{score!r}\t{position}\n')
+    return f.name
+
+
+def _iter_run(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            word, score, position = line.rstrip('\n').split('\t')
+            yield word, float(score), int(position)
+
+
+def _sorted_runs(rows, key, tmp_dir, run_size):
+    """
+    Sorts `rows` into files of at most `run_size` rows and returns their
+    paths.
+    """
+    paths = []
+    run = []
+    for row in rows:
+        run.append(row)
+        if len(run) >= run_size:
+            run.sort(key=key)
+            paths.append(_write_run(run, tmp_dir))
+            run = []
+    if run:
+        run.sort(key=key)
+        paths.append(_write_run(run, tmp_dir))
+    return paths
+
+
+def _by_word(row):
+    return row[0]
+
+
+def _by_score(row):
+    return -row[1], row[2]
+
+
+def iter_ranked_words(inputs, tmp_dir, run_size=500_000):
+    """
+    Merges the frequency lists of `inputs`, (path, weight) pairs, and yields
+    their words by descending combined score. A word listed more than once in
+    a list (once per part of speech) gets the sum of its frequencies, or its
+    best rank in a list without frequencies.
+    """
+    def all_rows():
+        for corpus_index, (path, weight) in enumerate(inputs):
+            for row in iter_corpus_scores(path, weight, corpus_index):
+                if row[3]:
+                    rank_only.add(corpus_index)
+                yield row[:3]
+
+    def combine(word, rows):
+        scores = {}
+        for _, score, position in rows:
+            corpus_index = position >> _POSITION_BITS
+            if corpus_index in rank_only:
+                scores[corpus_index] = max(scores.get(corpus_index, 0.0), score)
+            else:
+                scores[corpus_index] = scores.get(corpus_index, 0.0) + score
+        return word, sum(scores.values()), min(position for _, _, position in rows)
+
+    rank_only = set()
+    word_runs = _sorted_runs(all_rows(), _by_word, tmp_dir, run_size)
+    merged = heapq.merge(*(_iter_run(path) for path in word_runs), key=_by_word)
+    combined = (combine(word, list(rows)) for word, rows in groupby(merged, key=_by_word))
+    score_runs = _sorted_runs(combined, _by_score, tmp_dir, run_size)
+    for path in word_runs:
+        os.remove(path)
+    for word, _, _ in heapq.merge(*(_iter_run(path) for path in score_runs), key=_by_score):
+        yield word
+
+
+def write_meta_banks(words, output_dir, bank_size=20000, indent=2):
+    """
+    Writes ranked `words` to term_meta_bank_1.json, term_meta_bank_2.json, ...
+    holding `bank_size` entries each, and removes banks left over from a
+    longer previous build. Returns the number of words and banks written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    bank = []
+    banks = 0
+    rank = 0
+
+    def flush():
+        nonlocal bank, banks
+        banks += 1
+        json_codec.dump(bank, os.path.join(output_dir, f'term_meta_bank_{banks}.json'), indent=indent)
+        bank = []
+
+    for rank, word in enumerate(words, 1):
+        bank.append([word, "freq", {"value": rank, "displayValue": str(rank)}])
+        if len(bank) >= bank_size:
+            flush()
+    if bank:
+        flush()
+
+    for name in os.listdir(output_dir):
+        match = _META_BANK.match(name)
+        if match and int(match.group(1)) > banks:
+            os.remove(os.path.join(output_dir, name))
+    return rank, banks
+
+
+def parse_input(value):
+    """
+    Splits PATH[:WEIGHT] into the path and its weight.
+    """
+    path, _, weight = value.rpartition(':')
+    if path and re.fullmatch(r'\d+(\.\d+)?', weight):
+        return path, float(weight)
+    return value, 1.0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build Yomitan frequency banks from CORPES/CREA-style frequency lists.')
+    parser.add_argument('inputs', nargs='*', default=[DEFAULT_INPUT],
+                        help=f'frequency lists as PATH or PATH:WEIGHT (default: {DEFAULT_INPUT})')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='directory for the term_meta_bank_N.json files')
+    parser.add_argument('--bank-size', type=int, default=20000, help='entries per term meta bank')
+    parser.add_argument('--run-size', type=int, default=500_000, help='rows sorted in memory at a time')
+    parser.add_argument('--compact', action='store_true', help='write banks without indentation')
+    args = parser.parse_args()
+
+    inputs = [parse_input(value) for value in args.inputs]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        words = iter_ranked_words(inputs, tmp_dir, args.run_size)
+        count, banks = write_meta_banks(words, args.output_dir, args.bank_size, None if args.compact else 2)
+
+    print(f"Conversion complete! Ranked {count} words from {len(inputs)} list(s) into {banks} banks in '{args.output_dir}'")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Compares the json_codec backends on real term banks (by default the DDE
+banks in dde/files): load time, pretty and compact dump time, output size,
+and whether the output is byte-identical to the standard library's.
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import json_codec
+
+DEFAULT_BANKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'dde', 'files', 'term_bank_*.json')
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the JSON codec backends on term banks.')
+    parser.add_argument('--banks', default=DEFAULT_BANKS, help='glob of term bank files')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per measurement')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.banks))
+    raw = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            raw.append(f.read())
+    print(f'{len(paths)} banks, {sum(map(len, raw)) / 2 ** 20:.1f} MiB')
+
+    reference = {}
+    for name in json_codec.BACKENDS:
+        json_codec.set_backend(name)
+        load_time, banks = best_time(lambda: [json_codec.loads(data) for data in raw], args.repeat)
+        results = []
+        for label, indent in (('pretty', 2), ('compact', None)):
+            dump_time, output = best_time(lambda: [json_codec.dumps(bank, indent) for bank in banks], args.repeat)
+            reference.setdefault(label, output)
+            same = 'identical' if output == reference[label] else 'DIFFERS from stdlib'
+            results.append(f'{label} dump {dump_time:.2f}s, {sum(map(len, output)) / 2 ** 20:.1f} MiB, {same}')
+        print(f'{name:>8}: load {load_time:.2f}s | ' + ' | '.join(results))
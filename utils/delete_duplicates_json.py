@@ -1,8 +1,7 @@
-import json
+import json_codec
 
 def find_duplicates(json_path, key_name):
-    with open(json_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
+    data = json_codec.load(json_path)
     
     value_counts = {}
     for entry in data:
@@ -27,8 +26,7 @@ def save_duplicates_to_file(json_path, key_name, duplicates):
         print("No duplicates to save.")
         return
     
-    with open(json_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
+    data = json_codec.load(json_path)
     
     with open("duplicates_report.txt", "w", encoding="utf-8") as file:
         for value in duplicates:
@@ -40,14 +38,13 @@ def save_duplicates_to_file(json_path, key_name, duplicates):
             
             file.write(f"\nDuplicate entries for '{value}':\n")
             for entry in duplicate_entries:
-                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                file.write(json_codec.dumps(entry).decode("utf-8") + "\n")
                 print(f"Written to file: {entry}")
                 
     print("\nDuplicate entries have been saved to 'duplicates_report.txt'. Review them before approving deletion.")
 
 def delete_duplicates(json_path, key_name, duplicates, delete_all):
-    with open(json_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
+    data = json_codec.load(json_path)
     
     values_seen = set()
 
@@ -70,8 +67,7 @@ def delete_duplicates(json_path, key_name, duplicates, delete_all):
                 values_seen.add(value)
         new_data.append(entry)
 
-    with open(json_path, "w", encoding="utf-8") as file:
-        json.dump(new_data, file, ensure_ascii=False, indent=4)
+    json_codec.dump(new_data, json_path, indent=4)
     
     print("\nDuplicate deletion completed.")
 
@@ -0,0 +1,190 @@
+"""
+Shared JSON reading and writing for the conversion scripts.
+
+Uses orjson or msgspec when installed and falls back to the standard library
+otherwise; set YOMITANOL_JSON=stdlib|orjson|msgspec to force a backend. All
+backends produce the same bytes: UTF-8 without escaping non-ASCII text,
+either compact or pretty-printed. orjson and msgspec only pretty-print with
+an indent of 2, so other indents always go through the standard library.
+
+Scripts outside utils/ import this module with:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'utils'))
+    import json_codec
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKENDS = ['stdlib'] + (['orjson'] if orjson else []) + (['msgspec'] if msgspec else [])
+
+
+def _stdlib_loads(data):
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj, indent=None):
+    if indent is None:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=indent).encode('utf-8')
+
+
+def _orjson_dumps(obj, indent=None):
+    if indent is None:
+        return orjson.dumps(obj)
+    if indent == 2:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return _stdlib_dumps(obj, indent)
+
+
+def _msgspec_dumps(obj, indent=None):
+    if indent is None:
+        return msgspec.json.encode(obj)
+    if indent == 2:
+        return msgspec.json.format(msgspec.json.encode(obj), indent=2)
+    return _stdlib_dumps(obj, indent)
+
+
+_IMPLEMENTATIONS = {
+    'stdlib': (_stdlib_loads, _stdlib_dumps),
+    'orjson': (orjson.loads if orjson else None, _orjson_dumps),
+    'msgspec': (msgspec.json.decode if msgspec else None, _msgspec_dumps),
+}
+
+backend = None
+_loads = None
+_dumps = None
+
+
+def set_backend(name=None):
+    """
+    Selects the backend by name, or the fastest one installed.
+    """
+    global backend, _loads, _dumps
+    if name is None:
+        name = 'orjson' if orjson else 'msgspec' if msgspec else 'stdlib'
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend {name!r} is not available (installed: {', '.join(BACKENDS)})")
+    backend = name
+    _loads, _dumps = _IMPLEMENTATIONS[name]
+
+
+def loads(data):
+    return _loads(data)
+
+
+def dumps(obj, indent=None):
+    """
+    Serializes `obj` to UTF-8 bytes: compact when `indent` is None,
+    pretty-printed otherwise.
+    """
+    return _dumps(obj, indent)
+
+
+def load(path):
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+
+def dump(obj, path, indent=None):
+    with open(path, 'wb') as f:
+        f.write(_dumps(obj, indent))
+
+
+def iter_jsonl(path):
+    """
+    Yields the records of a JSON Lines file one at a time, skipping blank
+    lines.
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield _loads(line)
+
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """
+    Yields the elements of a file holding one top-level JSON array one at a
+    time, reading `chunk_size` characters at a time, so the whole array never
+    has to be in memory. Elements are decoded with the standard library.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip('\ufeff \t\r\n')
+        if not buffer.startswith('['):
+            raise ValueError(f"{path} does not hold a JSON array")
+        position = 1
+        first = True
+        eof = False
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position < len(buffer):
+                if buffer[position] == ']' and first:
+                    return
+                try:
+                    element, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    # The element is complete only once the ',' or ']' after it
+                    # has been read: a number may go on in the next chunk.
+                    separator = end
+                    while separator < len(buffer) and buffer[separator] in ' \t\r\n':
+                        separator += 1
+                    if separator < len(buffer) and buffer[separator] in ',]':
+                        yield element
+                        if buffer[separator] == ']':
+                            return
+                        position = separator + 1
+                        first = False
+                        continue
+                    if eof or separator < len(buffer) and buffer[separator] not in '.eE+-0123456789':
+                        raise ValueError(f"Expected ',' or ']' in {path}")
+            if eof:
+                raise ValueError(f"Unterminated JSON array in {path}")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def write_json_array(items, path, indent=None):
+    """
+    Writes `items`, any iterable, as one JSON array without holding the whole
+    list, producing the same bytes as dump(list(items), path, indent).
+    Returns the number of items written.
+    """
+    with open(path, 'wb') as f:
+        f.write(b'[')
+        newline = b'\n' + b' ' * indent if indent is not None else b''
+        count = 0
+        for item in items:
+            encoded = _dumps(item, indent)
+            if indent is not None:
+                # JSON strings cannot hold raw newlines, so every one is indentation.
+                encoded = encoded.replace(b'\n', newline)
+            f.write((newline if count == 0 else b',' + newline) + encoded)
+            count += 1
+        f.write(b']' if count == 0 or indent is None else b'\n]')
+    return count
+
+
+def write_jsonl(records, path):
+    with open(path, 'wb') as f:
+        for record in records:
+            f.write(_dumps(record) + b'\n')
+
+
+set_backend(os.environ.get('YOMITANOL_JSON') or None)